@@ -1,23 +1,27 @@
-"""
-nav_bot
-
-Contains the NavBot class for the webdriver object and
-the relevant methods for filtering and pulling the data
-from the webpage into a pandas DataFrame.
-
-Classes:
-  NavBot: An instance of a webdriver object to call Selenium methods on
-
-Methods:
-  establish_basic_schema (filter) :
-        selects a preset filter type, pulls table headers as dictionary keys
-        and row values as a lists for each column header
-
-    set_detailed_filters(home_away) :
-        in progress...
-
-    scan_remaining_pages(defined_player_stat_dict) :
-        takes in an established data schema from the establish_basic_schema() method,
-        scans remaining pages of data into the dictionary, converts to pandas DataFrame,
-        and saves to a local csv file
+"""
+nav_bot
+
+Contains the NavBot class for the webdriver object and
+the relevant methods for filtering and pulling the data
+from the webpage into a pandas DataFrame.
+
+Classes:
+  NavBot: An instance of a webdriver object to call Selenium methods on
+
+Methods:
+  read_table (header_names_list) :
+        pulls the table markup in a single WebDriver call and parses
+        the column headers and row values locally (see bot.table_parser)
+
+  establish_basic_schema (filter) :
+        selects a preset filter type, pulls table headers as dictionary keys
+        and row values as a lists for each column header
+
+    set_detailed_filters(home_away) :
+        in progress...
+
+    scan_remaining_pages(defined_player_stat_dict, sink, as_dataframe) :
+        takes in an established data schema from the establish_basic_schema() method,
+        scans remaining pages of data into the dictionary, streaming each page into
+        an optional sink (see bot.sinks), and converts to pandas DataFrame
 """
\ No newline at end of file
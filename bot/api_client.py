@@ -0,0 +1,262 @@
+"""
+api_client
+
+Pulls the player statistics table straight from the JSON API that fills the
+table on the webpage, instead of rendering the site in Chrome. Values are
+formatted the way the table displays them ('85%', '7.12', '-'), so API and
+browser scrapes of the same table compare, diff and convert alike.
+
+Classes:
+  ApiClient: a pooled keep-alive HTTP client for the statistics endpoints
+
+Functions:
+  display_value(value, title) :
+        returns an API value as the table shows it
+
+Methods:
+  season_id (league, season) :
+        looks up the API id of a season, e.g. '21/22'
+  fetch_page (league, season, main_filter, page) :
+        fetches one page of the statistics table as JSON
+  fetch_table (league, season, main_filter) :
+        fetches every page of the table concurrently and returns a DataFrame
+        with the same columns as NavBot.scan_remaining_pages()
+"""
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import bot.constants as c
+
+
+def display_value(value, title):
+    """
+    Returns an API value as the table shows it: '-' when missing,
+    percentages rounded half up to whole numbers with a '%' sign, ratings and fractional
+    values with two decimals, and counts as whole numbers.
+
+    Args:
+        value (int, float or None) : value of an API field
+        title (str) : table column title of the field
+    Returns:
+        str: the value as displayed in the table
+    """
+
+    if value is None:
+        return '-'
+    if title.endswith('%'):
+        return f'{math.floor(value + 0.5)}%'
+    if title == 'Rating' or (isinstance(value, float) and not value.is_integer()):
+        return f'{value:.2f}'
+    return str(int(value))
+
+
+class _RateLimiter:
+    """ Spaces out requests shared between threads to a maximum rate """
+
+    def __init__(self, requests_per_second):
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self._next_time = 0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            sleep_time = self._next_time - now
+            self._next_time = max(now, self._next_time) + self.interval
+        if sleep_time > 0:
+            time.sleep(sleep_time)
+
+
+class ApiClient:
+    """
+    A pooled keep-alive HTTP client for the statistics endpoints behind the
+    player statistics table.
+
+    Attributes
+    ----------
+    base_url : str
+        root of the API, e.g. to point the client at a local replay server
+        (default is c.API_BASE_URL)
+    league_urls : dict
+        league name to webpage url mapping, the tournament id is the last
+        part of the url (default is c.LEAGUE_PAGE_URLS)
+    workers : int
+        number of pages fetched concurrently (default is 4)
+
+    Methods
+    -------
+    season_id (league, season) :
+        looks up the API id of a season
+        Args:
+            league (str) : league name, a key of league_urls
+            season (str) : season name, format 'YY/YY'
+        Returns:
+            int: API id of the season
+
+    fetch_page (league, season, main_filter, page) :
+        fetches one page of the statistics table
+        Args:
+            league (str) : league name, a key of league_urls
+            season (str) : season name, format 'YY/YY'
+            main_filter (str) : preset filter ("Summary", "Attack", "Defence",
+                "Passing", "Goalkeeper")
+            page (int) : page number, starting at 1
+        Returns:
+            dict: decoded JSON response
+
+    fetch_table (league, season, main_filter) :
+        fetches every page of the statistics table
+        Args:
+            league (str) : league name, a key of league_urls
+            season (str) : season name, format 'YY/YY'
+            main_filter (str) : preset filter (default is "Summary")
+        Returns:
+            pandas.DataFrame: Team, Name and stat columns, titled and formatted
+            as on the webpage
+    """
+
+    def __init__(self, base_url=c.API_BASE_URL, league_urls=None, workers=4,
+                 requests_per_second=10, timeout=10):
+        """
+        base_url (str) : root of the API (default is c.API_BASE_URL)
+        league_urls (dict) : league name to webpage url mapping (default is c.LEAGUE_PAGE_URLS)
+        workers (int) : number of pages fetched concurrently (default is 4)
+        requests_per_second (float) : rate limit shared by all workers, None for
+            no limit (default is 10)
+        timeout (float) : seconds before a request is abandoned (default is 10)
+        """
+
+        self.base_url = base_url.rstrip('/')
+        self.league_urls = league_urls or c.LEAGUE_PAGE_URLS
+        self.workers = workers
+        self.timeout = timeout
+        self._rate_limiter = _RateLimiter(requests_per_second)
+        self._season_ids = {}
+
+        # One keep-alive connection per worker, with retries on throttling and server errors
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=retries)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'Accept': 'application/json', 'User-Agent': 'Mozilla/5.0'})
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+
+
+    def get_json(self, path, params=None):
+        """ Sends a rate limited GET request to the API and returns the decoded JSON """
+
+        self._rate_limiter.wait()
+        response = self.session.get(f'{self.base_url}/{path}', params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+
+    def tournament_id(self, league):
+        """ Returns the tournament id at the end of the league's webpage url """
+
+        return int(self.league_urls[league].rstrip('/').rsplit('/', 1)[1])
+
+
+
+    def season_id(self, league, season):
+        """
+        Looks up the API id of a season.
+
+        Args:
+            league (str) : league name, a key of league_urls
+            season (str) : season name, format 'YY/YY'
+        Returns:
+            int: API id of the season
+        """
+
+        if league not in self._season_ids:
+            seasons = self.get_json(f'unique-tournament/{self.tournament_id(league)}/seasons')['seasons']
+            self._season_ids[league] = {s['year']: s['id'] for s in seasons}
+        try:
+            return self._season_ids[league][season]
+        except KeyError:
+            raise ValueError(f"Season {season} is not available for {league}") from None
+
+
+
+    def fetch_page(self, league, season, main_filter, page):
+        """
+        Fetches one page of the statistics table.
+
+        Args:
+            league (str) : league name, a key of league_urls
+            season (str) : season name, format 'YY/YY'
+            main_filter (str) : preset filter ("Summary", "Attack", "Defence",
+                "Passing", "Goalkeeper")
+            page (int) : page number, starting at 1
+        Returns:
+            dict: decoded JSON response
+        """
+
+        fields = [field for field, _ in c.API_FILTER_FIELDS[main_filter]]
+        params = {
+            'limit': c.API_PAGE_SIZE,
+            'offset': (page - 1) * c.API_PAGE_SIZE,
+            'order': '-rating',
+            'accumulation': 'total',
+            'group': main_filter.lower(),
+            'fields': ','.join(fields)
+        }
+        path = f'unique-tournament/{self.tournament_id(league)}/season/{self.season_id(league, season)}/statistics'
+        return self.get_json(path, params)
+
+
+
+    def fetch_table(self, league="Premier League", season=c.CURRENT_SEASON, main_filter="Summary"):
+        """
+        Fetches every page of the statistics table, the first page to find the
+        page count and the remaining pages concurrently.
+
+        Args:
+            league (str) : league name, a key of league_urls (default is "Premier League")
+            season (str) : season name, format 'YY/YY' (default is c.CURRENT_SEASON)
+            main_filter (str) : preset filter (default is "Summary")
+        Returns:
+            pandas.DataFrame: Team, Name and stat columns, titled and formatted
+            as on the webpage
+        """
+
+        if main_filter not in c.API_FILTER_FIELDS:
+            raise ValueError(f"API mode supports the preset filters {list(c.API_FILTER_FIELDS)}, not {main_filter}")
+
+        first_page = self.fetch_page(league, season, main_filter, 1)
+        pages = [first_page]
+        page_numbers = range(2, first_page.get('pages', 1) + 1)
+        if page_numbers:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                pages += executor.map(lambda page: self.fetch_page(league, season, main_filter, page), page_numbers)
+
+        player_stat_dict = {'Team': [], 'Name': []}
+        for _, title in c.API_FILTER_FIELDS[main_filter]:
+            player_stat_dict[title] = []
+        for page in pages:
+            for result in page['results']:
+                player_stat_dict['Team'].append(result['team']['name'])
+                player_stat_dict['Name'].append(result['player']['name'])
+                for field, title in c.API_FILTER_FIELDS[main_filter]:
+                    player_stat_dict[title].append(display_value(result.get(field), title))
+
+        return pd.DataFrame(player_stat_dict)
@@ -0,0 +1,274 @@
+"""
+benchmark
+
+End-to-end NavBot benchmarks against the local mock site (bot.mock_site),
+so changes to the scraping path can be timed without the live site. Every
+scenario reports the seconds and WebDriver commands of open_page,
+set_detailed_filters, establish_schema and scan_remaining_pages, with the
+per-page latency, commands per page and rows per second of the scan.
+The preset scenarios are also fetched through the mock statistics API, to
+compare API mode with the browser on the same data and latency.
+
+Later runs are compared against two baselines: the committed
+benchmark_baseline.json of the counts that do not depend on the machine
+(rows, pages, WebDriver commands per phase and API requests), and a
+machine-local benchmark_timings.json of wall-clock seconds per phase, which
+is only gated where it was recorded.
+
+Functions:
+  run_benchmarks(scenarios, latency, **bot_kwargs) :
+        runs every scenario on a headless NavBot against the mock site
+  run_api_benchmarks(scenarios, latency) :
+        fetches every preset scenario with ApiClient from the mock API
+  counts(results) :
+        returns the metrics of a run that do not depend on the machine
+  timings(results) :
+        returns the wall-clock seconds of every phase of a run
+  compare(results, baseline, tolerance) :
+        returns the metrics that regressed against a baseline
+
+Run as a script, e.g. in CI (exits with 1 on a regression, or if there is
+no count baseline to compare against; --save-baseline records both baselines):
+    python -m bot.benchmark [--baseline <file>] [--save-baseline] [--tolerance 0.25] [--api]
+"""
+import json
+import math
+import os
+import sys
+import time
+from collections import namedtuple
+import bot.constants as c
+from bot.nav_bot import NavBot
+from bot.api_client import ApiClient
+from bot.browser_profile import BrowserProfile
+from bot.mock_site import MockSofascore
+
+
+BenchmarkScenario = namedtuple('BenchmarkScenario', ['name', 'league', 'season', 'main_filter', 'detailed_filters'])
+
+SCENARIOS = [
+    BenchmarkScenario('summary', 'Premier League', c.CURRENT_SEASON, 'Summary', None),
+    BenchmarkScenario('summary_past_season', 'Premier League', '21/22', 'Summary', None),
+    BenchmarkScenario('detailed', 'Premier League', '21/22', None,
+                      {'player_position': ['G', 'D', 'M', 'F'], 'filter_cat': 'Passing',
+                       'sub_filter_list': ['Assists', 'Key passes', 'Accurate passes %']}),
+    BenchmarkScenario('ucl_summary', 'UCL', c.CURRENT_SEASON, 'Summary', None)
+]
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+# wall-clock times only compare on the machine they were recorded on, so they are not committed
+TIMINGS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_timings.json')
+
+
+def _timed(bot, phases, phase, method, *args, **kwargs):
+    """ Calls a NavBot method, recording its seconds and WebDriver commands under phase """
+
+    commands = bot.instrumentation.command_count
+    start = time.perf_counter()
+    result = method(*args, **kwargs)
+    phases[phase] = {'seconds': round(time.perf_counter() - start, 4),
+                     'commands': bot.instrumentation.command_count - commands}
+    return result
+
+
+def run_scenario(bot, scenario, rows_per_page):
+    """
+    Runs one scenario phase by phase on an open NavBot.
+
+    Returns:
+        dict: phase timings and commands, rows, pages and scan throughput
+    """
+
+    phases = {}
+    start = time.perf_counter()
+    _timed(bot, phases, 'open_page', bot.open_page, scenario.league, scenario.season)
+    if scenario.detailed_filters is not None:
+        _timed(bot, phases, 'set_detailed_filters', bot.set_detailed_filters,
+               **bot.detailed_filter_args(scenario.detailed_filters))
+        stat_dict = _timed(bot, phases, 'establish_schema', bot.establish_schema)
+    else:
+        stat_dict = _timed(bot, phases, 'establish_schema', bot.establish_schema, scenario.main_filter)
+    stats_df = _timed(bot, phases, 'scan_remaining_pages', bot.scan_remaining_pages, stat_dict)
+    total_seconds = time.perf_counter() - start
+
+    pages = math.ceil(len(stats_df) / rows_per_page)
+    scan = phases['scan_remaining_pages']
+    return {
+        'phases': phases,
+        'rows': len(stats_df),
+        'pages': pages,
+        'seconds_per_page': round(scan['seconds'] / max(pages - 1, 1), 4),
+        'commands_per_page': round(scan['commands'] / max(pages - 1, 1), 2),
+        'rows_per_second': round(len(stats_df) / total_seconds, 1)
+    }
+
+
+def run_benchmarks(scenarios=SCENARIOS, latency=0.05, rows_per_page=c.API_PAGE_SIZE, **bot_kwargs):
+    """
+    Runs every scenario on one headless NavBot against the mock site.
+
+    Args:
+        scenarios (list of BenchmarkScenario) : scenarios to run (default is SCENARIOS)
+        latency (float) : seconds the mock site takes to render a table change
+            (default is 0.05)
+        rows_per_page (int) : table rows per mock page (default is c.API_PAGE_SIZE)
+        bot_kwargs : passed on to the NavBot, e.g. tabs
+    Returns:
+        dict: scenario name to its results, see run_scenario()
+    """
+
+    bot_kwargs.setdefault('profile', BrowserProfile(headless=True, window_size=(1920, 1080)))
+    results = {}
+    with MockSofascore(latency=latency, rows_per_page=rows_per_page) as site:
+        with NavBot(league_urls=site.league_urls, instrument=True, **bot_kwargs) as bot:
+            for scenario in scenarios:
+                results[scenario.name] = run_scenario(bot, scenario, rows_per_page)
+    return results
+
+
+def run_api_benchmarks(scenarios=SCENARIOS, latency=0.05, rows_per_page=c.API_PAGE_SIZE, workers=4):
+    """
+    Fetches every preset scenario with ApiClient from the mock API, which
+    answers each request after the same latency as a page table change.
+
+    Args:
+        scenarios (list of BenchmarkScenario) : scenarios to run, Detailed
+            ones are skipped (default is SCENARIOS)
+        latency (float) : seconds the mock API takes to answer (default is 0.05)
+        rows_per_page (int) : rows per API page (default is c.API_PAGE_SIZE)
+        workers (int) : pages fetched concurrently (default is 4)
+    Returns:
+        dict: scenario name to its seconds, rows, pages, API requests and rows per second
+    """
+
+    results = {}
+    with MockSofascore(latency=latency, rows_per_page=rows_per_page) as site:
+        with ApiClient(base_url=site.api_url, league_urls=site.league_urls, workers=workers,
+                       requests_per_second=None) as client:
+            for scenario in scenarios:
+                if scenario.detailed_filters is not None:
+                    continue
+                requests = site.api_requests
+                start = time.perf_counter()
+                stats_df = client.fetch_table(scenario.league, scenario.season, scenario.main_filter)
+                seconds = time.perf_counter() - start
+                results[scenario.name] = {'seconds': round(seconds, 4), 'rows': len(stats_df),
+                                          'pages': math.ceil(len(stats_df) / rows_per_page),
+                                          'api_requests': site.api_requests - requests,
+                                          'rows_per_second': round(len(stats_df) / seconds, 1)}
+    return results
+
+
+def counts(results):
+    """
+    Returns the metrics of a run that do not depend on the machine it ran on:
+    rows, pages, WebDriver commands per phase and API requests.
+
+    Args:
+        results (dict) : results of run_benchmarks(), with the api_requests
+            of run_api_benchmarks()
+    Returns:
+        dict: scenario name to its counts, a baseline for compare()
+    """
+
+    baseline = {}
+    for name, result in results.items():
+        baseline[name] = {metric: result[metric] for metric in ('rows', 'pages', 'api_requests') if metric in result}
+        if 'phases' in result:
+            baseline[name]['phases'] = {phase: {'commands': measured['commands']}
+                                        for phase, measured in result['phases'].items()}
+    return baseline
+
+
+def timings(results):
+    """
+    Returns the wall-clock seconds of every phase of a run.
+
+    Args:
+        results (dict) : results of run_benchmarks()
+    Returns:
+        dict: scenario name to its phase seconds, a baseline for compare()
+    """
+
+    return {name: {'phases': {phase: {'seconds': measured['seconds']}
+                              for phase, measured in result['phases'].items()}}
+            for name, result in results.items()}
+
+
+def compare(results, baseline, tolerance=0.25):
+    """
+    Returns the metrics that regressed against a baseline: a different number
+    of rows or pages, more API requests or WebDriver commands, or phases more
+    than tolerance slower. Metrics missing from the baseline are not compared.
+
+    Args:
+        results (dict) : results of run_benchmarks(), with the api_requests
+            of run_api_benchmarks()
+        baseline (dict) : counts() or timings() of an earlier run
+        tolerance (float) : allowed relative slowdown (default is 0.25)
+    Returns:
+        list of str: one description per regressed metric
+    """
+
+    regressions = []
+    for name, result in results.items():
+        expected_result = baseline.get(name, {})
+        for metric in ('rows', 'pages'):
+            if metric in expected_result and result[metric] != expected_result[metric]:
+                regressions.append(f"{name}: {result[metric]} {metric}, baseline {expected_result[metric]}")
+        if 'api_requests' in expected_result and result.get('api_requests', 0) > expected_result['api_requests']:
+            regressions.append(f"{name}: {result['api_requests']} API requests, "
+                               f"baseline {expected_result['api_requests']}")
+        for phase, measured in result['phases'].items():
+            expected = expected_result.get('phases', {}).get(phase)
+            if expected is None:
+                continue
+            if 'seconds' in expected and measured['seconds'] > expected['seconds'] * (1 + tolerance):
+                regressions.append(f"{name}.{phase}: {measured['seconds']:.3f} s, "
+                                   f"baseline {expected['seconds']:.3f} s")
+            if 'commands' in expected and measured['commands'] > expected['commands']:
+                regressions.append(f"{name}.{phase}: {measured['commands']} commands, "
+                                   f"baseline {expected['commands']}")
+    return regressions
+
+
+if __name__ == '__main__':
+    baseline_path = sys.argv[sys.argv.index('--baseline') + 1] if '--baseline' in sys.argv else BASELINE_PATH
+    tolerance = float(sys.argv[sys.argv.index('--tolerance') + 1]) if '--tolerance' in sys.argv else 0.25
+
+    results = run_benchmarks()
+    api_results = run_api_benchmarks()
+    for name, api_result in api_results.items():
+        results[name]['api_requests'] = api_result['api_requests']
+    for name, result in results.items():
+        print(f"{name}: {result['rows']} rows, {result['pages']} pages, {result['rows_per_second']} rows/s, "
+              f"{result['seconds_per_page'] * 1000:.0f} ms and {result['commands_per_page']} commands per page")
+        for phase, measured in result['phases'].items():
+            print(f"  {phase}: {measured['seconds']:.3f} s, {measured['commands']} commands")
+    if '--api' in sys.argv:
+        for name, api_result in api_results.items():
+            browser_seconds = sum(measured['seconds'] for measured in results[name]['phases'].values())
+            print(f"{name} via API: {api_result['seconds']:.3f} s, {api_result['api_requests']} requests, "
+                  f"{api_result['rows_per_second']} rows/s, "
+                  f"{browser_seconds / api_result['seconds']:.1f}x faster than the browser")
+
+    if '--save-baseline' in sys.argv:
+        for path, baseline in [(baseline_path, counts(results)), (TIMINGS_PATH, timings(results))]:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(baseline, f, indent=2)
+            print(f"Baseline saved to {path}")
+        sys.exit(0)
+    if not os.path.exists(baseline_path):
+        # a regression gate without a baseline would always pass
+        print(f"No baseline at {baseline_path}, record one with --save-baseline")
+        sys.exit(1)
+    with open(baseline_path, encoding='utf-8') as f:
+        regressions = compare(results, json.load(f), tolerance)
+    if os.path.exists(TIMINGS_PATH):
+        with open(TIMINGS_PATH, encoding='utf-8') as f:
+            regressions += compare(results, json.load(f), tolerance)
+    else:
+        print(f"No timings recorded on this machine at {TIMINGS_PATH}, only counts are compared")
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,165 @@
+"""
+browser_profile
+
+Configurable Chrome profiles for NavBot. The lean profile runs headless in a
+fixed viewport, skips images and web fonts, and blocks ad and tracker
+requests through the Chrome DevTools Protocol, counting what was blocked.
+
+Classes:
+  BrowserProfile: the Chrome options and request blocking of a NavBot
+
+Constants:
+  LEAN_PROFILE: headless, no images or fonts, ads and trackers blocked
+"""
+import json
+from collections import Counter
+from urllib.parse import urlparse
+
+
+AD_TRACKER_URL_PATTERNS = [
+    '*doubleclick.net*', '*googlesyndication.com*', '*googletagmanager.com*',
+    '*google-analytics.com*', '*googletagservices.com*', '*adservice.google.*',
+    '*amazon-adsystem.com*', '*adnxs.com*', '*criteo.com*', '*criteo.net*',
+    '*taboola.com*', '*outbrain.com*', '*scorecardresearch.com*', '*quantserve.com*',
+    '*facebook.net*', '*hotjar.com*', '*chartbeat.com*', '*pubmatic.com*',
+    '*rubiconproject.com*', '*openx.net*', '*teads.tv*', '*onetrust.com*', '*cookielaw.org*'
+]
+
+FONT_URL_PATTERNS = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*fonts.googleapis.com*', '*fonts.gstatic.com*']
+
+IMAGE_URL_PATTERNS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico']
+
+
+class BrowserProfile:
+    """
+    The Chrome options and request blocking of a NavBot.
+
+    Attributes
+    ----------
+    headless : bool
+        runs Chrome without a window
+    window_size : tuple
+        fixed (width, height) viewport, tall enough for the filters that
+        need the window.scrollTo(0,1800) workaround to load, None to maximize
+    disable_images : bool
+        stops Chrome from loading images (team crests, player photos)
+    blocked_url_patterns : list of str
+        URL patterns blocked with the CDP Network.setBlockedURLs command
+    count_blocked : bool
+        records blocked requests through Chrome's performance log
+
+    Methods
+    -------
+    chrome_arguments () :
+        returns the profile's Chrome command line arguments
+    apply (options) :
+        adds the profile's arguments and preferences to Chrome options
+    attach (driver) :
+        enables request blocking on a started driver
+    read_blocked_requests (driver, request_urls) :
+        returns the requests blocked since the last call, counted by host
+    """
+
+    def __init__(self, headless=False, window_size=None, disable_images=False, disable_fonts=False,
+                 block_ads=False, extra_blocked_urls=(), count_blocked=False):
+        """
+        headless (bool) : runs Chrome without a window (default is False)
+        window_size (tuple) : fixed (width, height) viewport, None to maximize (default is None)
+        disable_images (bool) : skips loading images (default is False)
+        disable_fonts (bool) : blocks web font requests (default is False)
+        block_ads (bool) : blocks ad and tracker requests (default is False)
+        extra_blocked_urls (list of str) : more URL patterns to block (default is ())
+        count_blocked (bool) : records blocked requests, see read_blocked_requests()
+            (default is False)
+        """
+
+        self.headless = headless
+        self.window_size = window_size
+        self.disable_images = disable_images
+        self.count_blocked = count_blocked
+        self.blocked_url_patterns = list(extra_blocked_urls)
+        if block_ads:
+            self.blocked_url_patterns += AD_TRACKER_URL_PATTERNS
+        if disable_fonts:
+            self.blocked_url_patterns += FONT_URL_PATTERNS
+        if disable_images:
+            self.blocked_url_patterns += IMAGE_URL_PATTERNS
+
+
+
+    def chrome_arguments(self):
+        """ Returns the profile's Chrome command line arguments """
+
+        arguments = []
+        if self.headless:
+            arguments.append('--headless=new')
+        if self.window_size:
+            arguments.append(f'--window-size={self.window_size[0]},{self.window_size[1]}')
+        if self.disable_images:
+            arguments.append('--blink-settings=imagesEnabled=false')
+        return arguments
+
+
+
+    def apply(self, options):
+        """
+        Adds the profile's arguments and preferences to Chrome options.
+
+        Args:
+            options (selenium.webdriver.chrome.options.Options) : options to extend
+        """
+
+        for argument in self.chrome_arguments():
+            options.add_argument(argument)
+        if self.disable_images:
+            options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+        if self.count_blocked:
+            options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+
+    def attach(self, driver):
+        """
+        Enables request blocking on a started driver.
+
+        Args:
+            driver (selenium.webdriver.Chrome) : driver to block requests on
+        """
+
+        if self.blocked_url_patterns:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': self.blocked_url_patterns})
+
+
+
+    def read_blocked_requests(self, driver, request_urls):
+        """
+        Returns the requests blocked since the last call, counted by host.
+        Reading also drains Chrome's performance log.
+
+        Args:
+            driver (selenium.webdriver.Chrome) : driver started with this profile
+            request_urls (dict) : request id to url of the driver's requests still
+                in flight, updated in place between calls
+        Returns:
+            collections.Counter: number of blocked requests per host
+        """
+
+        blocked = Counter()
+        if not self.count_blocked:
+            return blocked
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            params = message.get('params', {})
+            if message.get('method') == 'Network.requestWillBeSent':
+                request_urls[params['requestId']] = params['request']['url']
+            elif message.get('method') == 'Network.loadingFailed' and params.get('blockedReason'):
+                url = request_urls.pop(params['requestId'], '')
+                blocked[urlparse(url).netloc or url] += 1
+            elif message.get('method') == 'Network.loadingFinished':
+                request_urls.pop(params.get('requestId'), None)
+        return blocked
+
+
+LEAN_PROFILE = BrowserProfile(headless=True, window_size=(1920, 1080), disable_images=True,
+                              disable_fonts=True, block_ads=True, count_blocked=True)
@@ -0,0 +1,119 @@
+"""
+checkpoint
+
+Page-by-page checkpoints of a scrape, so that a scrape interrupted by a
+crashed browser or a timed out lookup can restart where it stopped rather
+than from the first page.
+
+Classes:
+  ScrapeCheckpoint: an append-only JSON lines checkpoint of one table scrape
+"""
+import hashlib
+import json
+import os
+
+
+class ScrapeCheckpoint:
+    """
+    An append-only JSON lines checkpoint of one table scrape. The first line
+    records the table (league url, season and filter state), and each
+    following line the rows of one scraped page.
+
+    Attributes
+    ----------
+    path : str
+        location of the checkpoint file
+
+    Methods
+    -------
+    load (header_names_list) :
+        returns the rows of every checkpointed page, keyed on page number
+    save_page (page, rows) :
+        appends the rows of a scraped page to the checkpoint
+    clear () :
+        removes the checkpoint once the scrape has completed
+    """
+
+    def __init__(self, directory, league_url, season, signature):
+        """
+        directory (str) : directory the checkpoint files are kept in
+        league_url (str) : webpage url of the league
+        season (str) : season name, format 'YY/YY'
+        signature (str) : filter signature from bot.page_cache.filter_signature()
+        """
+
+        self.table = {'league_url': league_url, 'season': season, 'signature': signature}
+        digest = hashlib.sha1(json.dumps(self.table, sort_keys=True).encode()).hexdigest()
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{digest}.jsonl')
+        self._header_names_list = None
+
+
+
+    def load(self, header_names_list):
+        """
+        Returns the rows of every checkpointed page. A checkpoint of a table
+        with different columns is discarded.
+
+        Args:
+            header_names_list (list) : column titles of the table being scraped
+        Returns:
+            dict: page number to list of row value lists
+        """
+
+        self._header_names_list = list(header_names_list)
+        pages = {}
+        if not os.path.exists(self.path):
+            return pages
+
+        with open(self.path, encoding='utf-8') as f:
+            content = f.read()
+        lines = content.splitlines()
+        try:
+            table = json.loads(lines[0])
+        except (IndexError, ValueError):
+            table = {}
+        if table.get('headers') != self._header_names_list:
+            # a checkpoint of a different table schema restarts the scrape
+            self.clear()
+            return pages
+
+        valid_lines = 1
+        for line in lines[1:]:
+            try:
+                page = json.loads(line)
+            except ValueError:
+                break # the last page was only half written
+            pages[page['page']] = page['rows']
+            valid_lines += 1
+        if valid_lines < len(lines) or not content.endswith('\n'):
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines[:valid_lines]) + '\n')
+        return pages
+
+
+
+    def save_page(self, page, rows):
+        """
+        Appends the rows of a scraped page to the checkpoint.
+
+        Args:
+            page (int) : page number, starting at 1
+            rows (list) : row value lists of the page
+        """
+
+        if not os.path.exists(self.path):
+            with open(self.path, 'w', encoding='utf-8') as f:
+                f.write(json.dumps({**self.table, 'headers': self._header_names_list}) + '\n')
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'page': page, 'rows': rows}) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+
+
+    def clear(self):
+        """ Removes the checkpoint file """
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
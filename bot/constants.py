@@ -1,9 +1,72 @@
-# Constants contained in the project
-
-PL_PAGE_URL = 'https://www.sofascore.com/tournament/football/england/premier-league/17'
-LALIGA_PAGE_URL = 'https://www.sofascore.com/tournament/football/spain/laliga/8'
-BUNDESLIGA_PAGE_URL = 'https://www.sofascore.com/tournament/football/germany/bundesliga/35'
-SERIE_A_PAGE_URL = 'https://www.sofascore.com/tournament/football/italy/serie-a/23'
-UCL_PAGE_URL = 'https://www.sofascore.com/tournament/football/europe/uefa-champions-league/7'
-
-CURRENT_SEASON = '22/23'
\ No newline at end of file
+# Constants contained in the project
+
+PL_PAGE_URL = 'https://www.sofascore.com/tournament/football/england/premier-league/17'
+LALIGA_PAGE_URL = 'https://www.sofascore.com/tournament/football/spain/laliga/8'
+BUNDESLIGA_PAGE_URL = 'https://www.sofascore.com/tournament/football/germany/bundesliga/35'
+SERIE_A_PAGE_URL = 'https://www.sofascore.com/tournament/football/italy/serie-a/23'
+UCL_PAGE_URL = 'https://www.sofascore.com/tournament/football/europe/uefa-champions-league/7'
+
+CURRENT_SEASON = '22/23'
+
+LEAGUE_PAGE_URLS = {
+    "Premier League": PL_PAGE_URL,
+    "LaLiga": LALIGA_PAGE_URL,
+    "Bundesliga": BUNDESLIGA_PAGE_URL,
+    "Serie A": SERIE_A_PAGE_URL,
+    "UCL": UCL_PAGE_URL
+}
+
+PRESET_FILTERS = ['Summary', 'Attack', 'Defence', 'Passing', 'Goalkeeper']
+
+# JSON API behind the player statistics table
+API_BASE_URL = 'https://api.sofascore.com/api/v1'
+API_PAGE_SIZE = 20
+
+# (API field, table column title) pairs for each preset filter, in table order
+API_FILTER_FIELDS = {
+    'Summary': [('goals', 'Goals'), ('expectedGoals', 'Expected goals (xG)'),
+                ('successfulDribbles', 'Successful dribbles'), ('tackles', 'Tackles'),
+                ('assists', 'Assists'), ('accuratePassesPercentage', 'Accurate passes %'),
+                ('rating', 'Rating')],
+    'Attack': [('goals', 'Goals'), ('expectedGoals', 'Expected goals (xG)'),
+               ('bigChancesMissed', 'Big chances missed'),
+               ('successfulDribbles', 'Successful dribbles'),
+               ('successfulDribblesPercentage', 'Successful dribbles %'),
+               ('totalShots', 'Total shots'), ('goalConversionPercentage', 'Goal conversion %'),
+               ('rating', 'Rating')],
+    'Defence': [('tackles', 'Tackles'), ('interceptions', 'Interceptions'),
+                ('clearances', 'Clearances'), ('errorLeadToGoal', 'Error led to goal'),
+                ('rating', 'Rating')],
+    'Passing': [('bigChancesCreated', 'Big chances created'), ('assists', 'Assists'),
+                ('accuratePasses', 'Accurate passes'),
+                ('accuratePassesPercentage', 'Accurate passes %'), ('keyPasses', 'Key passes'),
+                ('rating', 'Rating')],
+    'Goalkeeper': [('saves', 'Saves'), ('cleanSheet', 'Clean sheets'),
+                   ('penaltySave', 'Penalties saved'),
+                   ('savedShotsFromInsideTheBox', 'Saves from inside box'),
+                   ('runsOut', 'Runs out'), ('rating', 'Rating')]
+}
+
+# Sub filters of the Detailed panel for each filter category (see NavBot.set_detailed_filters)
+DETAILED_SUB_FILTERS = {
+    'Attack': ['Goals', 'Expected goals (xG)', 'Big chances missed', 'Succ. dribbles',
+               'Successful dribbles %', 'Total shots', 'Shots on target', 'Shots off target',
+               'Blocked shots', 'Goal conversion %', 'Penalties won', 'Penalty goals',
+               'Free kick goals', 'Goals from inside the box', 'Goals from outside the box',
+               'Headed goals', 'Left foot goals', 'Right foot goals', 'Hit woodwork', 'Offsides'],
+    'Defence': ['Tackles', 'Interceptions', 'Clearances', 'Error led to goal', 'Error led to shot',
+                'Penalty committed', 'Dribbled past', 'Clean sheets', 'Own goals'],
+    'Passing': ['Big chances created', 'Assists', 'Accurate passes', 'Accurate passes %',
+                'Key passes', 'Accurate long balls', 'Accurate long balls %', 'Accurate crosses',
+                'Accurate crosses %', 'Accurate own half passes', 'Accurate opposition half passes'],
+    'Goalkeeper': ['Saves', 'Clean sheets', 'Penalties saved', 'Saves from inside box', 'Runs out',
+                   'Successful runs out', 'High claims', 'Punches', 'Goals conceded'],
+    'Other': ['Rating', 'Minutes played', 'Appearances', 'Started', 'Yellow cards', 'Red cards',
+              'Fouls', 'Was fouled', 'Possession lost', 'Aerial duels won', 'Ground duels won',
+              'Total duels won', 'Total duels won %']
+}
+
+DETAILED_FILTER_LIMIT = 5 # sub filters that can be ticked per Detailed table
+
+# Detailed sub filters whose table column is titled differently in the preset tables
+DETAILED_COLUMN_TITLES = {'Succ. dribbles': 'Successful dribbles'}
@@ -0,0 +1,282 @@
+"""
+instrumentation
+
+Opt-in timing of NavBot's hot path. Every WebDriver command is counted and
+timed by phase (the innermost instrumented NavBot method running) and by
+table page. Time lost to implicit waits (failing element lookups) and to
+explicit WebDriverWait waits is recorded separately. The measurements can be
+written as JSON or as a Prometheus text-format file.
+
+When a NavBot is created without instrument=True, its instrumentation is
+None and the wrappers below cost one attribute check per call.
+
+Classes:
+  Histogram: latency histogram with Prometheus-style buckets
+  Instrumentation: command, phase, wait and page measurements of one NavBot
+  TimedWait: WebDriverWait recording its time as an explicit wait
+
+Functions:
+  instrumented(method) :
+        decorator timing a NavBot method as a phase
+"""
+import functools
+import json
+import time
+from contextlib import contextmanager
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.remote.command import Command
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+FIND_COMMANDS = {Command.FIND_ELEMENT, Command.FIND_ELEMENTS,
+                 Command.FIND_CHILD_ELEMENT, Command.FIND_CHILD_ELEMENTS}
+
+METRIC_PREFIX = 'stats_bot'
+
+
+class Histogram:
+    """
+    Latency histogram with Prometheus-style upper bucket bounds.
+
+    Attributes
+    ----------
+    bucket_counts : list of int
+        observations per bucket (not cumulative), the last bucket is +Inf
+    count : int
+        number of observations
+    sum : float
+        sum of the observed seconds
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        ind = 0
+        while ind < len(self.buckets) and seconds > self.buckets[ind]:
+            ind += 1
+        self.bucket_counts[ind] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def to_dict(self):
+        return {'count': self.count, 'sum': round(self.sum, 6),
+                'buckets': dict(zip([str(bound) for bound in self.buckets] + ['+Inf'], self.bucket_counts))}
+
+    def prometheus_lines(self, name, labels):
+        """ Returns the _bucket, _sum and _count sample lines of the histogram """
+
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(list(self.buckets) + ['+Inf'], self.bucket_counts):
+            cumulative += bucket_count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+
+class Instrumentation:
+    """
+    Command, phase, wait and page measurements of one NavBot.
+
+    Attributes
+    ----------
+    commands : dict
+        (phase, WebDriver command) to Histogram of command seconds
+    phases : dict
+        phase to Histogram of the seconds of each call of the phase's method
+    waits : dict
+        (phase, 'implicit' or 'explicit') to seconds spent waiting
+    pages : dict
+        table page to {'commands', 'seconds'} of the commands sent for it
+    page : int
+        page the commands are currently sent for, None outside page scans
+
+    Methods
+    -------
+    track_phase (phase) :
+        context manager timing a phase
+    track_wait () :
+        context manager timing an explicit wait
+    time_command (execute, command, params) :
+        runs and records one WebDriver command
+    summary () :
+        returns a readable run summary
+    write_json (path) :
+        writes the measurements as JSON
+    write_prometheus (path) :
+        writes the measurements in the Prometheus text format
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.phases = {}
+        self.waits = {}
+        self.pages = {}
+        self.page = None
+        self._phase_stack = []
+        self._wait_depth = 0
+
+    @property
+    def phase(self):
+        return self._phase_stack[-1] if self._phase_stack else 'other'
+
+    @property
+    def command_count(self):
+        """ Number of WebDriver commands sent so far """
+
+        return sum(histogram.count for histogram in self.commands.values())
+
+    @contextmanager
+    def track_phase(self, phase):
+        self._phase_stack.append(phase)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phase_stack.pop()
+            self.phases.setdefault(phase, Histogram()).observe(time.perf_counter() - start)
+
+    @contextmanager
+    def track_wait(self):
+        self._wait_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._wait_depth -= 1
+            self._add_wait('explicit', time.perf_counter() - start)
+
+    def _add_wait(self, kind, seconds):
+        key = (self.phase, kind)
+        self.waits[key] = self.waits.get(key, 0.0) + seconds
+
+    def time_command(self, execute, command, params):
+        """
+        Runs one WebDriver command and records it. A failing element lookup
+        outside an explicit wait is counted as implicit wait time, as it only
+        returns once the implicit wait runs out.
+        """
+
+        failed_find = False
+        start = time.perf_counter()
+        try:
+            response = execute(command, params)
+            failed_find = command in FIND_COMMANDS and not response.get('value')
+            return response
+        except NoSuchElementException:
+            failed_find = True
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.commands.setdefault((self.phase, command), Histogram()).observe(seconds)
+            if failed_find and not self._wait_depth:
+                self._add_wait('implicit', seconds)
+            if self.page is not None:
+                page_stats = self.pages.setdefault(self.page, {'commands': 0, 'seconds': 0.0})
+                page_stats['commands'] += 1
+                page_stats['seconds'] += seconds
+
+    def phase_totals(self):
+        """ Returns calls, seconds, commands, command seconds and waits per phase """
+
+        totals = {phase: {'calls': histogram.count, 'seconds': histogram.sum, 'commands': 0,
+                          'command_seconds': 0.0, 'implicit_wait_seconds': 0.0, 'explicit_wait_seconds': 0.0}
+                  for phase, histogram in self.phases.items()}
+        empty = {'calls': 0, 'seconds': 0.0, 'commands': 0, 'command_seconds': 0.0,
+                 'implicit_wait_seconds': 0.0, 'explicit_wait_seconds': 0.0}
+        for (phase, _), histogram in self.commands.items():
+            phase_totals = totals.setdefault(phase, dict(empty))
+            phase_totals['commands'] += histogram.count
+            phase_totals['command_seconds'] += histogram.sum
+        for (phase, kind), seconds in self.waits.items():
+            totals.setdefault(phase, dict(empty))[f'{kind}_wait_seconds'] += seconds
+        return totals
+
+    def to_dict(self):
+        return {
+            'phases': {phase: {key: round(value, 6) for key, value in totals.items()}
+                       for phase, totals in self.phase_totals().items()},
+            'phase_seconds': {phase: histogram.to_dict() for phase, histogram in self.phases.items()},
+            'command_seconds': {f'{phase}/{command}': histogram.to_dict()
+                                for (phase, command), histogram in self.commands.items()},
+            'pages': {str(page): {'commands': stats['commands'], 'seconds': round(stats['seconds'], 6)}
+                      for page, stats in sorted(self.pages.items())}
+        }
+
+    def write_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_prometheus(self, path):
+        """ Writes the measurements in the Prometheus text exposition format """
+
+        lines = [f'# HELP {METRIC_PREFIX}_webdriver_command_seconds WebDriver command latency',
+                 f'# TYPE {METRIC_PREFIX}_webdriver_command_seconds histogram']
+        for (phase, command), histogram in sorted(self.commands.items()):
+            lines += histogram.prometheus_lines(f'{METRIC_PREFIX}_webdriver_command_seconds',
+                                                f'phase="{phase}",command="{command}"')
+        lines += [f'# HELP {METRIC_PREFIX}_phase_seconds Duration of NavBot method calls',
+                  f'# TYPE {METRIC_PREFIX}_phase_seconds histogram']
+        for phase, histogram in sorted(self.phases.items()):
+            lines += histogram.prometheus_lines(f'{METRIC_PREFIX}_phase_seconds', f'phase="{phase}"')
+        lines += [f'# HELP {METRIC_PREFIX}_wait_seconds_total Time spent in implicit and explicit waits',
+                  f'# TYPE {METRIC_PREFIX}_wait_seconds_total counter']
+        for (phase, kind), seconds in sorted(self.waits.items()):
+            lines.append(f'{METRIC_PREFIX}_wait_seconds_total{{phase="{phase}",kind="{kind}"}} {seconds:.6f}')
+        lines += [f'# HELP {METRIC_PREFIX}_page_commands_total WebDriver commands sent per table page',
+                  f'# TYPE {METRIC_PREFIX}_page_commands_total counter']
+        for page, stats in sorted(self.pages.items()):
+            lines.append(f'{METRIC_PREFIX}_page_commands_total{{page="{page}"}} {stats["commands"]}')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def summary(self):
+        """ Returns a readable summary of where the run's time went """
+
+        totals = self.phase_totals()
+        command_seconds = sum(histogram.sum for histogram in self.commands.values())
+        implicit = sum(seconds for (_, kind), seconds in self.waits.items() if kind == 'implicit')
+        explicit = sum(seconds for (_, kind), seconds in self.waits.items() if kind == 'explicit')
+        lines = [f"WebDriver commands: {self.command_count} in {command_seconds:.2f} s "
+                 f"(implicit waits {implicit:.2f} s, explicit waits {explicit:.2f} s)"]
+        for phase, phase_totals in sorted(totals.items(), key=lambda item: -item[1]['seconds']):
+            lines.append(f"  {phase}: {phase_totals['calls']} calls, {phase_totals['seconds']:.2f} s, "
+                         f"{phase_totals['commands']} commands, "
+                         f"{phase_totals['implicit_wait_seconds']:.2f} s implicit / "
+                         f"{phase_totals['explicit_wait_seconds']:.2f} s explicit waits")
+        if self.pages:
+            page_seconds = [stats['seconds'] for stats in self.pages.values()]
+            page_commands = [stats['commands'] for stats in self.pages.values()]
+            lines.append(f"  pages: {len(self.pages)}, {sum(page_seconds) / len(page_seconds):.3f} s and "
+                         f"{sum(page_commands) / len(page_commands):.1f} commands per page")
+        return '\n'.join(lines)
+
+
+class TimedWait(WebDriverWait):
+    """ WebDriverWait recording the time until() takes as an explicit wait of the driver's phase """
+
+    def until(self, method, message=''):
+        instrumentation = getattr(self._driver, 'instrumentation', None)
+        if instrumentation is None:
+            return super(TimedWait, self).until(method, message)
+        with instrumentation.track_wait():
+            return super(TimedWait, self).until(method, message)
+
+
+def instrumented(method):
+    """ Times a NavBot method as a phase when the bot is instrumented """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.instrumentation is None:
+            return method(self, *args, **kwargs)
+        with self.instrumentation.track_phase(method.__name__):
+            return method(self, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,120 @@
+"""
+locators
+
+Registry of the XPaths NavBot finds sofascore elements with. The generated
+sc-* class names change whenever the site is rebuilt, so this is the only
+place that needs updating when they do.
+
+Elements that may legitimately be missing are probed with a single
+execute_script call instead of find_element, which would block for the
+full implicit wait before failing.
+
+Functions:
+  xpath(name, **params) :
+        returns the XPath of a registered element
+  locator(name, **params) :
+        returns the (By.XPATH, xpath) tuple of a registered element, for
+        find_element() and expected conditions
+  count(driver, name, **params) :
+        returns the number of matching elements, without waiting
+  click_all(driver, name, **params) :
+        clicks every matching element in one call, returns the number clicked
+  page_count(driver) :
+        returns the number of table pages shown by the pagination
+"""
+from selenium.webdriver.common.by import By
+
+
+PAGINATION = '//div[@class="sc-hLBbgP sc-eDvSVe NWuJg hryjgv"]'
+
+LOCATORS = {
+    # season dropdown
+    'season_label': '//span[text()="{season}"]',
+    'season_option': '//li[text()="{season}"]',
+    # preset filter tabs
+    'preset_tab': '//div[@class="sc-hLBbgP Hbif"]/button[@data-tabid="{tabid}"]',
+    'detailed_tab': '//div[@class="sc-hLBbgP Hbif"]/button[text()="Detailed"]',
+    # Detailed filter panel
+    'venue_button': '//div[@class="sc-dkrFOg goGQQW"]/button/span[text()="{home_away}"]',
+    'age_dropdown': '//div[@class="sc-hLBbgP hQYrtA"]/div[3]/div/div/button',
+    'age_option': '//ul[@class="sc-hLBbgP dRtNhU"]/li[text()="{age_filter_type}"]',
+    'age_input': '//input[@class="sc-hLBbgP liJFaS"]',
+    'position_checkbox': '//label[@for="checkbox-{position}-undefined"]',
+    'filter_chip': '//button[@class="sc-bcXHqe gJZAMC"]',
+    'filter_category': '//button[@class="sc-bcXHqe lfmpW"][{index}]',
+    'sub_filter': '//div[@class="sc-hLBbgP sc-eDvSVe gjJmZQ jaJHeQ"]/label/div/div/span[text()="{sub_filter}"]',
+    'apply_filters': '//button[@class="sc-bcXHqe ewHKoF"]',
+    # table and pagination
+    'table_row': '//tbody/tr',
+    'page_buttons': PAGINATION + '/div/button',
+    'previous_page': PAGINATION + '/button[1]',
+    'next_page': PAGINATION + '/button[2]'
+}
+
+COUNT_SCRIPT = """
+return document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+"""
+
+# Clicks the first match until none is left, re-querying after every click
+# because the page re-renders; a node already clicked is never clicked again.
+CLICK_ALL_SCRIPT = """
+const clicked = [];
+for (let ind = 0; ind < 100; ind++) {
+  const node = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+  if (!node || clicked.includes(node)) break;
+  node.click();
+  clicked.push(node);
+}
+return clicked.length;
+"""
+
+PAGE_COUNT_SCRIPT = """
+const buttons = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+let pages = 0;
+for (let ind = 0; ind < buttons.snapshotLength; ind++) {
+  const page = parseInt(buttons.snapshotItem(ind).innerText, 10);
+  if (page > pages) pages = page;
+}
+return pages;
+"""
+
+
+def xpath(name, **params):
+    """
+    Returns the XPath of a registered element.
+
+    Args:
+        name (str) : key of LOCATORS
+        params : values of the XPath's placeholders, e.g. season='21/22'
+    Returns:
+        str: the XPath
+    """
+
+    return LOCATORS[name].format(**params)
+
+
+def locator(name, **params):
+    """ Returns the (By.XPATH, xpath) tuple of a registered element """
+
+    return By.XPATH, xpath(name, **params)
+
+
+def count(driver, name, **params):
+    """ Returns the number of elements matching a registered XPath, without waiting """
+
+    return driver.execute_script(COUNT_SCRIPT, xpath(name, **params))
+
+
+def click_all(driver, name, **params):
+    """ Clicks every element matching a registered XPath in one call, returns the number clicked """
+
+    return driver.execute_script(CLICK_ALL_SCRIPT, xpath(name, **params))
+
+
+def page_count(driver):
+    """
+    Returns the number of table pages, the highest numbered pagination
+    button, or 1 if the table has no pagination.
+    """
+
+    return max(driver.execute_script(PAGE_COUNT_SCRIPT, xpath('page_buttons')), 1)
@@ -0,0 +1,405 @@
+"""
+mock_site
+
+A local stand-in for the sofascore league pages, so NavBot can be run and
+timed without the live site. Every page reproduces the markup NavBot relies
+on: the season dropdown, the data-tabid filter buttons, the Detailed filter
+panel, the thead th[title] / tbody table and the pagination buttons. Player
+rows are generated deterministically, and every table change is rendered
+after an artificial latency, like the API round trip of the real site. The
+same rows are served by a mock of the JSON statistics API under /api/v1, so
+bot.api_client.ApiClient can be timed against the same data.
+
+Classes:
+  MockSofascore: HTTP server of mock league pages, with league_urls for NavBot
+
+Usage:
+    with MockSofascore(latency=0.05) as site:
+        with NavBot(headless=True, league_urls=site.league_urls) as bot:
+            bot.scrape('Premier League', '21/22', 'Summary')
+        with ApiClient(base_url=site.api_url, league_urls=site.league_urls) as client:
+            client.fetch_table('Premier League', '21/22', 'Summary')
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from string import Template
+from urllib.parse import parse_qs, urlparse
+import bot.constants as c
+
+
+MOCK_SEASONS = [c.CURRENT_SEASON, '21/22', '20/21', '19/20', '18/19']
+
+MOCK_PLAYERS = {
+    'Premier League': 400,
+    'LaLiga': 400,
+    'Bundesliga': 360,
+    'Serie A': 400,
+    'UCL': 650
+}
+
+PAGE_TEMPLATE = Template("""<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>$league</title></head>
+<body>
+<div style="height:1200px">$league</div>
+<div id="season-select">
+  <span id="season-label"></span>
+  <ul id="season-list" style="display:none"></ul>
+</div>
+<div class="sc-hLBbgP Hbif" id="filter-tabs"></div>
+<div id="detailed-panel" style="display:none">
+  <div class="sc-dkrFOg goGQQW">
+    <button><span>Overall</span></button><button><span>Home</span></button><button><span>Away</span></button>
+  </div>
+  <div class="sc-hLBbgP hQYrtA">
+    <div></div><div></div>
+    <div><div><div><button id="age-toggle">Age</button></div></div></div>
+  </div>
+  <ul class="sc-hLBbgP dRtNhU" id="age-list" style="display:none">
+    <li>All</li><li>More than</li><li>Equals</li><li>Less than</li>
+  </ul>
+  <input class="sc-hLBbgP liJFaS" id="age-input">
+  <div id="positions"></div>
+  <div id="chips"></div>
+  <div id="categories"></div>
+  <div class="sc-hLBbgP sc-eDvSVe gjJmZQ jaJHeQ" id="sub-filters"></div>
+  <button class="sc-bcXHqe ewHKoF" id="apply">Apply</button>
+</div>
+<table><thead></thead><tbody></tbody></table>
+<div class="sc-hLBbgP sc-eDvSVe NWuJg hryjgv" id="pagination"></div>
+<script>
+const config = $config;
+const positions = ['G', 'D', 'M', 'F'];
+const players = [];
+for (let i = 0; i < config.players; i++) {
+  players.push({team: 'Team ' + (i % config.teams + 1), name: 'Player ' + (i + 1), position: positions[i % 4]});
+}
+const state = {season: config.seasons[0], venue: 'Overall', columns: config.presets.summary,
+               positions: positions.slice(), page: 1};
+const panel = {venue: 'Overall', ageType: 'All', positions: positions.slice(), chips: config.default_chips.slice()};
+
+function hash(text) {
+  let h = 2166136261;
+  for (let i = 0; i < text.length; i++) { h ^= text.charCodeAt(i); h = Math.imul(h, 16777619); }
+  return h >>> 0;
+}
+function statValue(player, column) {
+  const h = hash([config.league, state.season, state.venue, player.name, column].join('|'));
+  if (column === 'Rating') return (6 + (h % 300) / 100).toFixed(2);
+  if (column.endsWith('%')) return Math.round(h % 1000 / 10) + '%';
+  return String(h % 40);
+}
+function visiblePlayers() { return players.filter(p => state.positions.includes(p.position)); }
+function pageCount() { return Math.max(1, Math.ceil(visiblePlayers().length / config.rows_per_page)); }
+function button(label, onclick, className) {
+  const btn = document.createElement('button');
+  btn.innerHTML = label;
+  if (className) btn.className = className;
+  btn.onclick = onclick;
+  return btn;
+}
+// Table changes are rendered after the configured latency, the old table stays until then
+function update(change) { setTimeout(() => { change(); render(); }, config.latency_ms); }
+
+function render() {
+  document.querySelector('thead').innerHTML = '<tr><th>#</th><th>Team</th><th>Name</th>' +
+    state.columns.map(col => '<th title="' + col + '">' + col.slice(0, 6) + '</th>').join('') + '</tr>';
+  const start = (state.page - 1) * config.rows_per_page;
+  document.querySelector('tbody').innerHTML = visiblePlayers().slice(start, start + config.rows_per_page).map((p, ind) =>
+    '<tr><td>' + (start + ind + 1) + '</td><td title="' + p.team + '"><img alt=""></td><td title="' + p.name + '">' +
+    p.name + '</td>' + state.columns.map(col => col === 'Rating' ? '<td><span>' + statValue(p, col) + '</span></td>'
+                                                                  : '<td>' + statValue(p, col) + '</td>').join('') + '</tr>'
+  ).join('');
+
+  // previous and next buttons, then the first, current and last page buttons
+  const pagination = document.getElementById('pagination');
+  const count = pageCount();
+  pagination.innerHTML = '';
+  pagination.appendChild(button('&lt;', () => { if (state.page > 1) update(() => state.page--); }));
+  pagination.appendChild(button('&gt;', () => { if (state.page < count) update(() => state.page++); }));
+  const pages = document.createElement('div');
+  let shown = [];
+  for (let page = 1; page <= count; page++) shown.push(page);
+  if (count > 3) shown = [1, Math.min(Math.max(state.page, 2), count - 1), count];
+  shown.forEach(page => pages.appendChild(button('<span>' + page + '</span>', () => update(() => state.page = page))));
+  pagination.appendChild(pages);
+}
+
+function renderChips() {
+  const chips = document.getElementById('chips');
+  chips.innerHTML = '';
+  panel.chips.forEach(chip => chips.appendChild(button(chip, () => {
+    panel.chips = panel.chips.filter(other => other !== chip);
+    renderChips();
+  }, 'sc-bcXHqe gJZAMC')));
+}
+
+function renderSubFilters(category) {
+  const list = document.getElementById('sub-filters');
+  list.innerHTML = config.sub_filters[category].map(name =>
+    '<label><div><div><span>' + name + '</span></div></div></label>').join('');
+  list.querySelectorAll('span').forEach(span => span.onclick = () => {
+    if (!panel.chips.includes(span.innerText) && panel.chips.length < config.filter_limit) {
+      panel.chips.push(span.innerText);
+      renderChips();
+    }
+  });
+}
+
+const seasonLabel = document.getElementById('season-label');
+const seasonList = document.getElementById('season-list');
+seasonLabel.innerText = state.season;
+seasonLabel.onclick = () => { seasonList.style.display = 'block'; };
+config.seasons.forEach(season => {
+  const item = document.createElement('li');
+  item.innerText = season;
+  item.onclick = () => {
+    seasonList.style.display = 'none';
+    seasonLabel.innerText = season;
+    update(() => { state.season = season; state.page = 1; });
+  };
+  seasonList.appendChild(item);
+});
+
+const tabs = document.getElementById('filter-tabs');
+Object.keys(config.presets).forEach(tabid => {
+  const tab = button(config.preset_names[tabid], () => update(() => {
+    state.columns = config.presets[tabid]; state.venue = 'Overall'; state.positions = positions.slice(); state.page = 1;
+  }));
+  tab.setAttribute('data-tabid', tabid);
+  tabs.appendChild(tab);
+});
+const detailedTab = button('Detailed', () => { document.getElementById('detailed-panel').style.display = 'block'; });
+detailedTab.setAttribute('data-tabid', 'detailed');
+tabs.appendChild(detailedTab);
+
+document.querySelectorAll('.goGQQW button').forEach(btn => btn.onclick = () => { panel.venue = btn.innerText; });
+document.getElementById('age-toggle').onclick = () => { document.getElementById('age-list').style.display = 'block'; };
+document.querySelectorAll('#age-list li').forEach(item => item.onclick = () => {
+  panel.ageType = item.innerText;
+  document.getElementById('age-list').style.display = 'none';
+});
+positions.forEach(position => {
+  const label = document.createElement('label');
+  label.setAttribute('for', 'checkbox-' + position + '-undefined');
+  label.innerHTML = '<div>' + position + '</div>';
+  label.onclick = () => {
+    panel.positions = panel.positions.includes(position) ? panel.positions.filter(p => p !== position)
+                                                         : panel.positions.concat([position]);
+  };
+  document.getElementById('positions').appendChild(label);
+});
+Object.keys(config.sub_filters).forEach(category =>
+  document.getElementById('categories').appendChild(button(category, () => renderSubFilters(category), 'sc-bcXHqe lfmpW')));
+document.getElementById('apply').onclick = () => update(() => {
+  state.columns = panel.chips.slice(); state.venue = panel.venue; state.positions = panel.positions.slice(); state.page = 1;
+});
+
+renderChips();
+render(); // the first table is part of the page load
+</script>
+</body>
+</html>
+""")
+
+
+def _hash(text):
+    """ The FNV-1a hash of the page script, so the mock API serves the values the page renders """
+
+    h = 2166136261
+    for char in text:
+        h = ((h ^ ord(char)) * 16777619) & 0xFFFFFFFF
+    return h
+
+
+def _api_value(league, season, player_name, title):
+    """ The API value of a stat the page script renders with statValue() for the Overall venue """
+
+    h = _hash('|'.join([league, season, 'Overall', player_name, title]))
+    if title == 'Rating':
+        return 6 + (h % 300) / 100
+    if title.endswith('%'):
+        return h % 1000 / 10
+    return h % 40
+
+
+class MockSofascore:
+    """
+    HTTP server of mock sofascore league pages, run in a background thread.
+
+    Attributes
+    ----------
+    players : dict
+        league name to number of players in its table
+    rows_per_page : int
+        table rows shown per page
+    latency : float
+        seconds before a season, filter or page change is rendered
+    page_latency : float
+        seconds before a league page is served
+    league_urls : dict
+        league name to mock page url, for NavBot(league_urls=...) and
+        ApiClient(league_urls=...)
+    api_url : str
+        root of the mock statistics API, for ApiClient(base_url=...)
+    api_requests : int
+        statistics API requests answered since the server started
+
+    Methods
+    -------
+    start () :
+        starts serving on a free local port
+    stop () :
+        stops the server
+    """
+
+    def __init__(self, players=None, rows_per_page=c.API_PAGE_SIZE, latency=0.1, page_latency=0.0,
+                 seasons=MOCK_SEASONS, teams=20, port=0):
+        """
+        players (dict) : league name to number of players (default is MOCK_PLAYERS)
+        rows_per_page (int) : table rows per page (default is c.API_PAGE_SIZE)
+        latency (float) : seconds before a table change is rendered (default is 0.1)
+        page_latency (float) : seconds before a league page is served (default is 0.0)
+        seasons (list of str) : seasons in the dropdown, current season first
+            (default is MOCK_SEASONS)
+        teams (int) : teams the players are spread over (default is 20)
+        port (int) : port to serve on (default is 0 - any free port)
+        """
+
+        self.players = players or MOCK_PLAYERS
+        self.rows_per_page = rows_per_page
+        self.latency = latency
+        self.page_latency = page_latency
+        self.seasons = seasons
+        self.teams = teams
+        self.port = port
+        self.api_requests = 0
+        self._server = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @property
+    def league_urls(self):
+        return {league: f"http://127.0.0.1:{self.port}{self._path(league)}" for league in self.players}
+
+    @property
+    def api_url(self):
+        return f"http://127.0.0.1:{self.port}/api/v1"
+
+    @staticmethod
+    def _tournament_id(league):
+        return int(c.LEAGUE_PAGE_URLS[league].rsplit('/', 1)[1])
+
+    def _path(self, league):
+        # ends with the tournament id, like the live urls
+        return f"/tournament/{self._slug(league)}/{self._tournament_id(league)}"
+
+    @staticmethod
+    def _slug(league):
+        return league.lower().replace(' ', '-')
+
+    def page_html(self, league):
+        """ Returns the mock page of a league """
+
+        config = {
+            'league': league,
+            'players': self.players[league],
+            'teams': self.teams,
+            'rows_per_page': self.rows_per_page,
+            'latency_ms': int(self.latency * 1000),
+            'seasons': self.seasons,
+            'presets': {main_filter.lower(): [title for _, title in fields]
+                        for main_filter, fields in c.API_FILTER_FIELDS.items()},
+            'preset_names': {main_filter.lower(): main_filter for main_filter in c.API_FILTER_FIELDS},
+            'sub_filters': c.DETAILED_SUB_FILTERS,
+            'default_chips': c.DETAILED_SUB_FILTERS['Attack'][:3],
+            'filter_limit': c.DETAILED_FILTER_LIMIT
+        }
+        return PAGE_TEMPLATE.substitute(league=league, config=json.dumps(config))
+
+    def api_response(self, path, query):
+        """
+        Returns the mock API response of a seasons or statistics request,
+        None for an unknown path.
+        """
+
+        leagues_by_id = {self._tournament_id(league): league for league in self.players}
+        parts = path.strip('/').split('/')
+        if len(parts) < 2 or parts[0] != 'unique-tournament' or int(parts[1]) not in leagues_by_id:
+            return None
+        league = leagues_by_id[int(parts[1])]
+        if parts[2:] == ['seasons']:
+            return {'seasons': [{'year': season, 'id': ind + 1} for ind, season in enumerate(self.seasons)]}
+        if len(parts) != 5 or parts[2] != 'season' or parts[4] != 'statistics':
+            return None
+
+        season = self.seasons[int(parts[3]) - 1]
+        group = query['group'][0].capitalize()
+        titles = dict(c.API_FILTER_FIELDS[group])
+        fields = query['fields'][0].split(',')
+        limit, offset = int(query['limit'][0]), int(query['offset'][0])
+        num_players = self.players[league]
+        results = []
+        for ind in range(offset, min(offset + limit, num_players)):
+            player_name = f'Player {ind + 1}'
+            result = {'player': {'name': player_name}, 'team': {'name': f'Team {ind % self.teams + 1}'}}
+            result.update({field: _api_value(league, season, player_name, titles[field]) for field in fields})
+            results.append(result)
+        return {'results': results, 'page': offset // limit + 1, 'pages': -(-num_players // limit)}
+
+    def start(self):
+        """ Starts serving the league pages on a local port """
+
+        site = self
+        pages_by_path = {self._path(league): league for league in self.players}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path.startswith('/api/v1/'):
+                    response = site.api_response(url.path[len('/api/v1'):], parse_qs(url.query))
+                    if response is None:
+                        self.send_error(404)
+                        return
+                    with site._lock:
+                        site.api_requests += 1
+                    # an API round trip takes as long as the page takes to render a table change
+                    time.sleep(site.latency)
+                    body, content_type = json.dumps(response).encode('utf-8'), 'application/json'
+                elif url.path in pages_by_path:
+                    time.sleep(site.page_latency)
+                    body = site.page_html(pages_by_path[url.path]).encode('utf-8')
+                    content_type = 'text/html; charset=utf-8'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # keeps benchmark output clean
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', self.port), Handler)
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """ Stops the server """
+
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
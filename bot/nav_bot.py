@@ -1,332 +1,847 @@
-import os
-import time
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service 
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.common.keys import Keys
-import bot.constants as c
-from selenium.common.exceptions import NoSuchElementException
-from selenium.common.exceptions import StaleElementReferenceException
-import pandas as pd
-
-
-class NavBot(webdriver.Chrome):
-    """
-    An instance of a webdriver object to call Selenium methods on.
-
-    Attributes
-    ----------
-    driver_path : str
-        path to local driver instance
-
-    Methods
-    -------
-    open_page () :
-        opens a connection to the league's webpage, and selects
-        the season of interest
-        Args:
-            league (str) : the league for which the data is to be retrieved
-                (default is c.PL_PAGE_URL)
-            season (str) : the season for which the data is to be retrieved
-                (default is '21/22')
-
-    establish_basic_schema (filter) :
-        selects a preset filter type, pulls table headers as dictionary keys
-        and row values as a lists for each column header
-        Args:
-            filter (str) : preset filter type for the table ("Summary", "Attack",
-                "Defence", "Passing", "Goalkeeper") (default is None - constructs
-                table schema based on columns already present)
-        Returns:
-            dict: dictionary of column headers as keys and row data as values
-
-    set_detailed_filters(home_away) :
-        selects a preset filter, pulls column headers of that data tables
-        as dictionary keys, and stores row values in lists.    
-        Args:
-            home_away (str) : selects the home or away games, or both for the
-                filter ("Overall", "Home", "Away") (default is "Overall")
-            age_filter_type (str) : selects the age filter type ("All",
-                "More than", "Equals", "Less than") (default is "All")
-            player_age (int) : if age_filter_type is not None, then a player
-                age must be specified (default is None)
-            player_position (list of str) : list of desired positions to filter for
-                (['G','D','M','F']) (default is ['G','D','M','F'])
-            filter_cat (str) : broad category for subfilter selection 
-                ("Attack", "Defence", "Passing", "Goalkeeper", "Other")
-            sub_filter_list (list) : selects subfilters for each column of the table,
-                limit 5 (for list of available subfilters see README)
-                (default is ['Goals', 'Shots on target', 'Total shots', 'Rating'])
-
-    scan_remaining_pages(defined_player_stat_dict) :
-        takes in an established data schema from the establish_basic_schema() method,
-        scans remaining pages of data into the dictionary, converts to pandas DataFrame,
-        and saves to a local csv file
-        Args:
-            defined_player_stat_dict (dict) : dictionary which establishes the data
-                schema for the remaining data to be pull from all pages
-        Returns:
-            pandas.DataFrame: DataFrame of column headers and row values from the
-            scanned pages
-    """
-
-    def __init__(self, driver_path=r';B:\Code\Projects\Driver\chromedriver_win32'):
-        """ driver_path (raw_string) : path to local webdriver """
-
-        self.driver_path = driver_path
-        os.environ['PATH'] += self.driver_path
-        options = Options()
-        options.add_argument('--ignore-certificate-errors')
-        super(NavBot, self).__init__(service=Service(ChromeDriverManager().install()), options=options) # instantiates the webdriver.Chrome object
-        self.implicitly_wait(5)
-        self.maximize_window()
-    
-
-
-    def open_page(self, league="Premier League", season='21/22'):
-        """ 
-        Opens a connection to the league's webpage, and selects
-        the season of interest
-
-        Args:
-            league (str) : the league for which the data is to be retrieved
-            (default is c.PL_PAGE_URL)
-            season (str) : the season for which the data is to be retrieved
-            (default is '21/22')
-        """
-
-        league_dict = {
-            "Premier League": c.PL_PAGE_URL,
-            "LaLiga": c.LALIGA_PAGE_URL,
-            "Bundesliga": c.BUNDESLIGA_PAGE_URL,
-            "Serie A": c.SERIE_A_PAGE_URL,
-            "UCL": c.UCL_PAGE_URL
-        }
-        self.get(league_dict[league])
-        self.find_element(By.XPATH, f'//span[text()="{c.CURRENT_SEASON}"]').click()
-        WebDriverWait(self, 20).until(EC.presence_of_element_located((By.XPATH, f'//li[text()="{season}"]')))
-        self.find_element(By.XPATH, f'//li[text()="{season}"]').click()
-        time.sleep(3)
-
-
-
-    def establish_schema(self, main_filter=None):
-        """
-        Selects a preset filter, pulls column headers of that data tables
-        as dictionary keys, and stores row values in lists.
-        
-        Args:
-            main_filter (str) : preset filter type for the table ("Summary", "Attack",
-                "Defence", "Passing", "Goalkeeper") (default is None - constructs
-                table schema based on columns already present)
-
-        Returns:
-            dict: dictionary of column headers as keys and row data as values
-        """
-
-        # Selects relevant filter
-        ignored_exceptions=(NoSuchElementException,StaleElementReferenceException,)
-        self.execute_script("window.scrollTo(0,1800)") # Serie A & LaLiga webpages are tempermental
-        # and don't load the filters, even though they are on the page, a work around I found
-        # is to scroll to the location of the filters
-        if main_filter:
-            WebDriverWait(self, 30).until(EC.presence_of_element_located((By.XPATH, f'//div[@class="sc-hLBbgP Hbif"]/button[@data-tabid="{main_filter.lower()}"]')))
-            filter_btn = self.find_element(By.XPATH, f'//div[@class="sc-hLBbgP Hbif"]/button[@data-tabid="{main_filter.lower()}"]')
-            filter_btn.click()
-
-        # Pulls column headers into a list
-        status = True
-        header_ind = 4 # Team values start in the 4th table column
-        header_names_list = []
-        while status: # try to loop through to the next column of data
-            try:
-                get_header_name_el_id = f'//thead/tr/th[{str(header_ind)}]'
-                get_header_name = self.find_element(By.XPATH, get_header_name_el_id).get_attribute('title')
-                if get_header_name:
-                    header_names_list.append(get_header_name)
-                    header_ind += 1
-            except:
-                status = False
-
-        header_names_list = ['Team', 'Name'] + header_names_list
-        player_stat_dict = {}
-
-        # Pulls row data as a list into a dictionary
-        table_elements = self.find_element(By.XPATH, '//tbody').get_attribute('innerHTML')
-        table_elements_count = table_elements.count('<tr>')
-        num_table_elements = table_elements_count + 1
-        for col_ind, col_name in enumerate(header_names_list):
-            col_ind += 2 
-            column_values = []
-            if col_ind == 2 or col_ind == 3:
-                for row_num in range(1, num_table_elements):
-                    el_id = f'//tbody/tr[{str(row_num)}]/td[{str(col_ind)}]'
-                    el = WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.presence_of_element_located((By.XPATH, el_id)))
-                    col_val = self.find_element(By.XPATH, el_id).get_attribute('title')
-                    column_values.append(col_val)
-                    player_stat_dict[col_name] = column_values
-            elif col_name == 'Rating':
-                for row_num in range(1, num_table_elements):
-                    el_id = f'//tbody/tr[{str(row_num)}]/td[{str(col_ind)}]/span'
-                    el = WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.presence_of_element_located((By.XPATH, el_id)))
-                    col_val = self.find_element(By.XPATH, el_id).get_attribute('innerHTML')
-                    column_values.append(col_val)
-                    player_stat_dict[col_name] = column_values
-            else:
-                for row_num in range(1, num_table_elements):
-                    el_id = f'//tbody/tr[{str(row_num)}]/td[{str(col_ind)}]'
-                    el = WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.presence_of_element_located((By.XPATH, el_id)))
-                    col_val = self.find_element(By.XPATH, el_id).get_attribute('innerHTML')
-                    column_values.append(col_val)
-                    player_stat_dict[col_name] = column_values
-
-        return player_stat_dict
-    
-
-
-    def set_detailed_filters(self, home_away='Overall', age_filter_type='All',
-                            player_age=None, player_position=['D','M','F'],
-                            filter_cat='Attack', sub_filter_list=['Goals', 'Big chances missed', 'Succ. dribbles', 'Successful dribbles %', 'Offsides']):
-        """
-        Selects a preset filter, pulls column headers of that data tables
-        as dictionary keys, and stores row values in lists.
-        
-        Args:
-            home_away (str) : selects the home or away games, or both for the
-                filter ("Overall", "Home", "Away") (default is "Overall")
-            age_filter_type (str) : selects the age filter type ("All",
-                "More than", "Equals", "Less than") (default is "All")
-            player_age (int) : if age_filter_type is not None, then a player
-                age must be specified (default is None)
-            player_position (list of str) : list of desired positions to filter for
-                (['G','D','M','F']) (default is ['G','D','M','F'])
-            filter_cat (str) : broad category for subfilter selection 
-                ("Attack", "Defence", "Passing", "Goalkeeper", "Other")
-            sub_filter_list (list) : selects subfilters for each column of the table,
-                limit 5 (for list of available subfilters see README)
-                (default is ['Goals', 'Shots on target', 'Total shots', 'Rating'])
-
-        """
-
-        self.execute_script("window.scrollTo(0,1800)") # Serie A & LaLiga webpages are tempermental
-        # and don't load the filters, even though they are on the page, a work around I found
-        # is to scroll to the location of the filters
-        WebDriverWait(self, 45).until(EC.presence_of_element_located((By.XPATH, f'//div[@class="sc-hLBbgP Hbif"]/button[text()="Detailed"]')))
-        self.find_element(By.XPATH, f'//button[text()="Detailed"]').click()
-        # Select home_away filter
-        WebDriverWait(self, 30).until(EC.presence_of_element_located((By.XPATH, f'//div[@class="sc-dkrFOg goGQQW"]/button/span[text()="{home_away}"]')))
-        home_away_btn = self.find_element(By.XPATH, f'//div[@class="sc-dkrFOg goGQQW"]/button/span[text()="{home_away}"]')
-        home_away_btn.click()
-        # Select age filter
-        if age_filter_type != 'All':
-            age_filter_type_el_id = f'//ul[@class="sc-hLBbgP dRtNhU"]/li[text()="{age_filter_type}"]'
-            age_filter_dropdown = self.find_element(By.XPATH, '//div[@class="sc-hLBbgP hQYrtA"]/div[3]/div/div/button').click()
-            WebDriverWait(self, 10).until(EC.presence_of_element_located((By.XPATH, age_filter_type_el_id)))
-            age_dropdown_option = self.find_element(By.XPATH, age_filter_type_el_id).click()
-            age_input_field = self.find_element(By.XPATH, '//input[@class="sc-hLBbgP liJFaS"]')       
-            age_input_field.send_keys(player_age)
-        
-        # Select player positions
-        positions = ['G','D','M','F']
-        for position in positions:
-            if position not in player_position:
-                # WebDriverWait(self, 10).until(EC.visibility_of_element_located((By.XPATH, f'//div[text()="{position}"]')))
-                self.find_element(By.XPATH, f'//label[@for="checkbox-{position}-undefined"]').click()
-
-        # Uncheck all existing filters
-        filter_exists = True
-        while filter_exists:
-            try:
-                self.find_element(By.XPATH, '//button[@class="sc-bcXHqe gJZAMC"]').click()
-            except:
-                filter_exists = False
-        
-        # Selecting filters
-        filter_dict = {
-            "Attack": 1,
-            "Defence": 2,
-            "Passing": 3,
-            "Goalkeeper": 4,
-            "Other": 5
-        }
-        self.find_element(By.XPATH, f'//button[@class="sc-bcXHqe lfmpW"][{filter_dict[filter_cat]}]').click()
-
-        for sub_filter in sub_filter_list:
-            self.find_element(By.XPATH, f'//div[@class="sc-hLBbgP sc-eDvSVe gjJmZQ jaJHeQ"]/label/div/div/span[text()="{sub_filter}"]').click()
-
-        # Apply filters
-        self.find_element(By.XPATH, '//button[@class="sc-bcXHqe ewHKoF"]').click()
-
-
-
-    def scan_remaining_pages(self, defined_player_stat_dict):
-        """
-        Takes in an established data schema from the establish_basic_schema() method,
-        scans remaining pages of data into the dictionary, converts to pandas DataFrame,
-        and saves to a local csv file.
-        
-        Args:
-            defined_player_stat_dict (dict) : dictionary which establishes the data
-                schema for the remaining data to be pull from all pages
-        Returns:
-            pandas.DataFrame: DataFrame of column headers and row values from the
-            scanned pages
-        """
-
-        ignored_exceptions=(NoSuchElementException,StaleElementReferenceException,)
-        try:
-            # element selector for a page with > 3 pages
-            total_page_count = int(self.find_element(By.XPATH, '//div[@class="sc-hLBbgP sc-eDvSVe NWuJg hryjgv"]/div/button[3]/span').get_attribute('innerHTML'))
-        except:
-            try:
-                # element selector for a page with <= 2 pages
-                total_page_count = int(self.find_element(By.XPATH, '//div[@class="sc-hLBbgP sc-eDvSVe NWuJg hryjgv"]/div/button[2]/span').get_attribute('innerHTML'))
-            except:
-                player_stats = pd.DataFrame(defined_player_stat_dict)
-                save_time = time.strftime("%m-%d_%H%M")
-                player_stats.to_csv(f"player_stats - {save_time}.csv")
-                return player_stats
-
-        next_page_btn = self.find_element(By.XPATH, '//div[@class="sc-hLBbgP sc-eDvSVe NWuJg hryjgv"]/button[2]')
-        next_page_btn.click()
-        time.sleep(5)
-
-        # Loops over each page of data, appending row values to lists
-        for page in range(total_page_count - 1):
-            table_elements = self.find_element(By.XPATH, '//tbody').get_attribute('innerHTML')
-            table_elements_count = table_elements.count('<tr>')
-            num_table_elements = table_elements_count + 1
-            for col_ind, col_name in enumerate(defined_player_stat_dict.keys()):
-                col_ind += 2
-                if col_ind == 2 or col_ind == 3:
-                    for row_num in range(1, num_table_elements):
-                        el_id = f'//tbody/tr[{str(row_num)}]/td[{str(col_ind)}]'
-                        el = WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.presence_of_element_located((By.XPATH, el_id)))
-                        col_val = self.find_element(By.XPATH, el_id).get_attribute('title')
-                        defined_player_stat_dict[col_name].append(col_val)
-                elif col_name == 'Rating':
-                    for row_num in range(1, num_table_elements):
-                        el_id = f'//tbody/tr[{str(row_num)}]/td[{str(col_ind)}]/span'
-                        el = WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.presence_of_element_located((By.XPATH, el_id)))
-                        col_val = self.find_element(By.XPATH, el_id).get_attribute('innerHTML')
-                        defined_player_stat_dict[col_name].append(col_val)
-                else:
-                    for row_num in range(1, num_table_elements):
-                        el_id = f'//tbody/tr[{str(row_num)}]/td[{str(col_ind)}]'
-                        el = WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.presence_of_element_located((By.XPATH, el_id)))
-                        col_val = self.find_element(By.XPATH, el_id).get_attribute('innerHTML')
-                        defined_player_stat_dict[col_name].append(col_val)
-            
-            next_page_btn = self.find_element(By.XPATH, '//div[@class="sc-hLBbgP sc-eDvSVe NWuJg hryjgv"]/button[2]')
-            try:
-                WebDriverWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.element_to_be_clickable(next_page_btn))
-                next_page_btn.click()
-            except:
-                continue
-        
-        player_stats = pd.DataFrame(defined_player_stat_dict)
-        return player_stats
+import os
+import time
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service 
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+import bot.constants as c
+from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+from selenium.common.exceptions import SessionNotCreatedException
+import inspect
+import json
+import pandas as pd
+from bot.table_parser import parse_headers, parse_rows
+from bot.page_cache import filter_signature
+from bot.checkpoint import ScrapeCheckpoint
+from bot.browser_profile import BrowserProfile
+from bot.session import resolve_driver, find_session, launch_session
+from bot.instrumentation import Instrumentation, TimedWait, instrumented
+import bot.locators as locators
+from collections import Counter
+
+
+TABLE_MARKUP_SCRIPT = """
+const thead = document.evaluate('//thead', document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const tbody = document.evaluate('//tbody', document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+return [thead ? thead.innerHTML : '', tbody ? tbody.innerHTML : ''];
+"""
+
+TABLE_FINGERPRINT_SCRIPT = """
+const tbody = document.querySelector('tbody');
+if (!tbody || !tbody.rows.length) return null;
+const titles = Array.from(document.querySelectorAll('thead th')).map(th => th.title).join('|');
+return titles + '#' + tbody.rows.length + '#' + tbody.rows[0].innerText;
+"""
+
+TAB_MIN_PAGES = 5 # fewer pages per tab than this are not worth another tab's page load
+
+
+class NavBot(webdriver.Chrome):
+    """
+    An instance of a webdriver object to call Selenium methods on.
+
+    Attributes
+    ----------
+    driver_path : str
+        directory of a local chromedriver added to the PATH, or None
+    league_urls : dict
+        league name to webpage url mapping used by open_page()
+    cache : bot.page_cache.PageCache
+        cache the scraped pages are stored in and scrape() reads from
+        (default is None - no caching)
+    profile : bot.browser_profile.BrowserProfile
+        Chrome options and request blocking of the browser
+    blocked_requests : collections.Counter
+        requests blocked by the profile per host, see update_blocked_requests()
+    instrumentation : bot.instrumentation.Instrumentation
+        WebDriver command, phase, wait and page measurements, None unless
+        the bot was created with instrument=True
+    tabs : int
+        browser tabs scan_remaining_pages() splits a table's pages across
+        (default is 1 - pages are clicked through in one tab)
+    startup_seconds : float
+        seconds taken to start the driver and browser
+    startup_mode : str
+        'warm' if the bot attached to a running long-lived Chrome, else 'cold'
+    reuse_session : bool
+        whether the bot is attached to the long-lived Chrome, which quit()
+        leaves running
+    checkpoint_dir : str
+        directory scan_remaining_pages() checkpoints every page to, so an
+        interrupted scrape resumes at the next unscraped page
+        (default is None - no checkpoints)
+
+    Methods
+    -------
+    quit () :
+        stops the chromedriver, and closes the browser unless it is the
+        long-lived Chrome of reuse_session
+
+    scrape (league, season, main_filter, detailed_filters) :
+        returns the full table for a league, season and filter, from the
+        page cache if every page is cached and fresh, otherwise by opening
+        the page, applying the filters and scanning every page
+        Args:
+            league (str) : the league for which the data is to be retrieved
+            season (str) : the season for which the data is to be retrieved
+            main_filter (str) : preset filter type for the table (default is None)
+            detailed_filters (dict) : keyword arguments for set_detailed_filters(),
+                used instead of main_filter (default is None)
+            sink (bot.sinks.PageSink) : sink every page is streamed into (default is None)
+            as_dataframe (bool) : returns the table as a DataFrame (default is True)
+        Returns:
+            pandas.DataFrame: DataFrame of column headers and row values
+
+    update_blocked_requests () :
+        adds the requests blocked by the browser profile since the last call
+        to blocked_requests
+        Returns:
+            collections.Counter: number of requests blocked per host since the last call
+
+    open_page () :
+        opens a connection to the league's webpage, and selects
+        the season of interest
+        Args:
+            league (str) : the league for which the data is to be retrieved
+                (default is c.PL_PAGE_URL)
+            season (str) : the season for which the data is to be retrieved
+                (default is '21/22')
+
+    table_fingerprint () :
+        returns a short signature of the table currently on the page
+        Returns:
+            str: fingerprint, or None if no rows are rendered
+
+    wait_for_table_change (fingerprint) :
+        waits until the table no longer matches a fingerprint, instead of
+        sleeping a fixed time after a season, filter or page change
+        Args:
+            fingerprint (str) : table fingerprint taken before the page action
+            timeout (int) : seconds to wait for the change (default is 20)
+            required (bool) : raises a TimeoutException if the table does not
+                change, otherwise returns False (default is True)
+        Returns:
+            bool: True if the table changed
+
+    read_table (header_names_list) :
+        pulls the table markup in a single WebDriver call and parses
+        the column headers and row values locally
+        Args:
+            header_names_list (list) : column titles to read the rows with
+                (default is None - column titles are parsed from the <thead>)
+        Returns:
+            tuple: (list of column titles, list of row value lists)
+
+    establish_basic_schema (filter) :
+        selects a preset filter type, pulls table headers as dictionary keys
+        and row values as a lists for each column header
+        Args:
+            filter (str) : preset filter type for the table ("Summary", "Attack",
+                "Defence", "Passing", "Goalkeeper") (default is None - constructs
+                table schema based on columns already present)
+        Returns:
+            dict: dictionary of column headers as keys and row data as values
+
+    set_detailed_filters(home_away) :
+        selects a preset filter, pulls column headers of that data tables
+        as dictionary keys, and stores row values in lists.    
+        Args:
+            home_away (str) : selects the home or away games, or both for the
+                filter ("Overall", "Home", "Away") (default is "Overall")
+            age_filter_type (str) : selects the age filter type ("All",
+                "More than", "Equals", "Less than") (default is "All")
+            player_age (int) : if age_filter_type is not None, then a player
+                age must be specified (default is None)
+            player_position (list of str) : list of desired positions to filter for
+                (['G','D','M','F']) (default is ['G','D','M','F'])
+            filter_cat (str) : broad category for subfilter selection 
+                ("Attack", "Defence", "Passing", "Goalkeeper", "Other")
+            sub_filter_list (list) : selects subfilters for each column of the table,
+                limit 5 (for list of available subfilters see README)
+                (default is ['Goals', 'Shots on target', 'Total shots', 'Rating'])
+
+    scan_remaining_pages(defined_player_stat_dict) :
+        takes in an established data schema from the establish_basic_schema() method,
+        scans remaining pages of data into the dictionary, converts to pandas DataFrame,
+        and streams every page to the sink, if one is given. With tabs > 1, the pages are split into
+        ranges scanned round robin in that many tabs of the browser
+        Args:
+            defined_player_stat_dict (dict) : dictionary which establishes the data
+                schema for the remaining data to be pull from all pages
+            sink (bot.sinks.PageSink) : sink every page is streamed into as soon
+                as it is extracted (default is None)
+            as_dataframe (bool) : accumulates the pages into a DataFrame
+                (default is True)
+        Returns:
+            pandas.DataFrame: DataFrame of column headers and row values from the
+            scanned pages, or None if as_dataframe is False
+    """
+
+    def __init__(self, driver_path=None, headless=False, league_urls=None, cache=None,
+                 checkpoint_dir=None, profile=None, offline=False, refresh_driver=False, reuse_session=False,
+                 tabs=1, instrument=False):
+        """
+        driver_path (str) : directory of a local chromedriver to add to the PATH
+            (default is None - the driver is resolved by bot.session.resolve_driver())
+        headless (bool) : runs Chrome without a window (default is False)
+        league_urls (dict) : league name to webpage url mapping, e.g. to point
+            the bot at a local copy of the stats pages (default is c.LEAGUE_PAGE_URLS)
+        cache (bot.page_cache.PageCache) : page cache for scraped tables (default is None)
+        checkpoint_dir (str) : directory for per-page scrape checkpoints (default is None)
+        profile (bot.browser_profile.BrowserProfile) : Chrome options and request
+            blocking, e.g. LEAN_PROFILE (default is None - a plain profile, headless
+            in a fixed viewport if headless is set)
+        offline (bool) : only uses a cached or local chromedriver, never the network
+            (default is False)
+        refresh_driver (bool) : resolves the chromedriver again instead of using
+            the cached path (default is False)
+        reuse_session (bool) : attaches to the long-lived Chrome of an earlier run,
+            launching one if none is running (default is False)
+        tabs (int) : browser tabs to scan the pages of a table in, see
+            scan_remaining_pages() (default is 1)
+        instrument (bool) : records WebDriver command counts, latencies and waits
+            by phase and page in instrumentation (default is False)
+        """
+
+        started = time.perf_counter()
+        self.instrumentation = Instrumentation() if instrument else None
+        self.driver_path = driver_path
+        self.league_urls = league_urls or c.LEAGUE_PAGE_URLS
+        self.cache = cache
+        self.checkpoint_dir = checkpoint_dir
+        self.tabs = tabs
+        self.reuse_session = reuse_session
+        self.league = None
+        self.league_url = None
+        self.season = None
+        self.detailed_filters = None
+        self.table_signature = filter_signature()
+        if self.driver_path:
+            os.environ['PATH'] += os.pathsep + self.driver_path.lstrip(';')
+        self.profile = profile or BrowserProfile(headless=headless, window_size=(1920, 1080) if headless else None)
+        self.blocked_requests = Counter()
+        self._request_urls = {}
+
+        options = Options()
+        session = find_session() if reuse_session else None
+        self.startup_mode = 'warm' if session else 'cold'
+        if reuse_session:
+            session = session or launch_session(self.profile)
+            options.debugger_address = f"127.0.0.1:{session['port']}"
+            if self.profile.count_blocked:
+                options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        else:
+            options.add_argument('--ignore-certificate-errors')
+            self.profile.apply(options)
+        try:
+            service = Service(resolve_driver(offline, refresh_driver))
+            super(NavBot, self).__init__(service=service, options=options) # instantiates the webdriver.Chrome object
+        except SessionNotCreatedException:
+            if offline or refresh_driver:
+                raise
+            # the cached driver no longer matches the installed Chrome
+            service = Service(resolve_driver(refresh=True))
+            super(NavBot, self).__init__(service=service, options=options)
+        self.profile.attach(self)
+        self.implicitly_wait(5)
+        if not self.profile.window_size and session is None:
+            self.maximize_window()
+        self.startup_seconds = time.perf_counter() - started
+    
+
+
+    def quit(self):
+        """
+        Stops the chromedriver and closes the browser. A long-lived Chrome the
+        bot attached to is left running for later runs, so only the driver
+        connection is ended. Also called when a with block exits.
+        """
+
+        if self.reuse_session:
+            self.service.stop()
+        else:
+            super(NavBot, self).quit()
+
+
+
+    def execute(self, driver_command, params=None):
+        """ Sends a WebDriver command, timing it if the bot is instrumented """
+
+        if self.instrumentation is None:
+            return super(NavBot, self).execute(driver_command, params)
+        return self.instrumentation.time_command(super(NavBot, self).execute, driver_command, params)
+
+
+
+    @instrumented
+    def scrape(self, league="Premier League", season='21/22', main_filter=None, detailed_filters=None,
+               sink=None, as_dataframe=True):
+        """
+        Returns the full table for a league, season and filter. If a page cache
+        is set and holds every page of the table, no browser time is spent,
+        see also scrape_from_cache() to skip starting the browser altogether.
+
+        Args:
+            league (str) : the league for which the data is to be retrieved
+                (default is "Premier League")
+            season (str) : the season for which the data is to be retrieved
+                (default is '21/22')
+            main_filter (str) : preset filter type for the table ("Summary", "Attack",
+                "Defence", "Passing", "Goalkeeper") (default is None)
+            detailed_filters (dict) : keyword arguments for set_detailed_filters(),
+                used instead of main_filter (default is None)
+            sink (bot.sinks.PageSink) : sink every page is streamed into (default is None)
+            as_dataframe (bool) : returns the table as a DataFrame (default is True)
+        Returns:
+            pandas.DataFrame: DataFrame of column headers and row values, or None
+            if as_dataframe is False
+        """
+
+        if self.cache:
+            cached, stats_df = scrape_from_cache(self.cache, league, season, main_filter, detailed_filters,
+                                                 sink=sink, as_dataframe=as_dataframe, league_urls=self.league_urls)
+            if cached:
+                return stats_df
+
+        if detailed_filters is not None:
+            detailed_filters = self.detailed_filter_args(detailed_filters)
+        self.open_page(league, season)
+        if detailed_filters is not None:
+            self.set_detailed_filters(**detailed_filters)
+            stat_dict = self.establish_schema()
+        else:
+            stat_dict = self.establish_schema(main_filter)
+        return self.scan_remaining_pages(stat_dict, sink=sink, as_dataframe=as_dataframe)
+
+
+
+    @classmethod
+    def detailed_filter_args(cls, detailed_filters):
+        """ Fills in the set_detailed_filters() defaults missing from a dict of its arguments """
+
+        bound_args = inspect.signature(cls.set_detailed_filters).bind(None, **detailed_filters)
+        bound_args.apply_defaults()
+        return {name: value for name, value in bound_args.arguments.items() if name != 'self'}
+
+
+
+    def update_blocked_requests(self):
+        """
+        Adds the requests blocked by the profile since the last call to
+        blocked_requests, and returns them.
+
+        Returns:
+            collections.Counter: number of requests blocked per host since the last call
+        """
+
+        blocked = self.profile.read_blocked_requests(self, self._request_urls)
+        self.blocked_requests.update(blocked)
+        return blocked
+
+
+
+    @instrumented
+    def open_page(self, league="Premier League", season='21/22'):
+        """ 
+        Opens a connection to the league's webpage, and selects
+        the season of interest
+
+        Args:
+            league (str) : the league for which the data is to be retrieved
+            (default is c.PL_PAGE_URL)
+            season (str) : the season for which the data is to be retrieved
+            (default is '21/22')
+        """
+
+        self.update_blocked_requests() # drains the previous page's performance log
+        self.league = league
+        self.league_url = self.league_urls[league]
+        self.season = season
+        self.detailed_filters = None
+        self.table_signature = filter_signature()
+        self.get(self.league_url)
+        self.find_element(*locators.locator('season_label', season=c.CURRENT_SEASON)).click()
+        season_option = TimedWait(self, 20).until(EC.presence_of_element_located(locators.locator('season_option', season=season)))
+        fingerprint = self.table_fingerprint()
+        season_option.click()
+        if season != c.CURRENT_SEASON and fingerprint is not None:
+            # the current season's table was already rendered, wait for it to be replaced
+            self.wait_for_table_change(fingerprint)
+        else:
+            TimedWait(self, 20).until(EC.presence_of_element_located(locators.locator('season_label', season=season)))
+
+
+
+    def table_fingerprint(self):
+        """
+        Returns a short signature of the table currently on the page (column
+        titles, row count and first row text), or None if no rows are rendered.
+        """
+
+        return self.execute_script(TABLE_FINGERPRINT_SCRIPT)
+
+
+
+    @instrumented
+    def wait_for_table_change(self, fingerprint, timeout=20, required=True):
+        """
+        Waits until the table on the page no longer matches a fingerprint taken
+        with table_fingerprint(), i.e. until a new season, filter or page has
+        actually been rendered.
+
+        Args:
+            fingerprint (str) : table fingerprint taken before the page action
+            timeout (int) : seconds to wait for the change (default is 20)
+            required (bool) : raises a TimeoutException if the table does not
+                change, otherwise returns False (default is True)
+        Returns:
+            bool: True if the table changed
+        """
+
+        def table_changed(driver):
+            new_fingerprint = driver.table_fingerprint()
+            return new_fingerprint is not None and new_fingerprint != fingerprint
+
+        try:
+            TimedWait(self, timeout, poll_frequency=0.1).until(table_changed)
+        except TimeoutException:
+            if required:
+                raise
+            return False
+        return True
+
+
+
+    @instrumented
+    def read_table(self, header_names_list=None):
+        """
+        Pulls the <thead> and <tbody> markup of the table in a single WebDriver
+        call and parses the headers and rows locally.
+
+        Args:
+            header_names_list (list) : column titles to read the rows with
+                (default is None - column titles are parsed from the <thead>)
+        Returns:
+            tuple: (list of column titles, list of row value lists)
+        """
+
+        TimedWait(self, 15).until(EC.presence_of_element_located(locators.locator('table_row')))
+        thead_html, tbody_html = self.execute_script(TABLE_MARKUP_SCRIPT)
+        if header_names_list is None:
+            header_names_list = parse_headers(thead_html)
+        return header_names_list, parse_rows(tbody_html, header_names_list)
+
+
+
+    @instrumented
+    def establish_schema(self, main_filter=None):
+        """
+        Selects a preset filter, pulls column headers of that data tables
+        as dictionary keys, and stores row values in lists.
+        
+        Args:
+            main_filter (str) : preset filter type for the table ("Summary", "Attack",
+                "Defence", "Passing", "Goalkeeper") (default is None - constructs
+                table schema based on columns already present)
+
+        Returns:
+            dict: dictionary of column headers as keys and row data as values
+        """
+
+        # Selects relevant filter
+        self.execute_script("window.scrollTo(0,1800)") # Serie A & LaLiga webpages are tempermental
+        # and don't load the filters, even though they are on the page, a work around I found
+        # is to scroll to the location of the filters
+        if main_filter:
+            filter_btn = TimedWait(self, 30).until(EC.presence_of_element_located(
+                locators.locator('preset_tab', tabid=main_filter.lower())))
+            fingerprint = self.table_fingerprint()
+            filter_btn.click()
+            if fingerprint is not None:
+                # the filter may already be selected, in which case nothing changes
+                self.wait_for_table_change(fingerprint, timeout=5, required=False)
+            self.detailed_filters = None
+        if main_filter or self.detailed_filters is None:
+            self.table_signature = filter_signature(main_filter)
+        else:
+            self.table_signature = filter_signature('Detailed', self.detailed_filters)
+
+        # Pulls the table markup in one call and parses headers and rows locally
+        header_names_list, rows = self.read_table()
+        self.cache_page(1, header_names_list, rows)
+        player_stat_dict = {col_name: [] for col_name in header_names_list}
+        for row in rows:
+            for col_name, col_val in zip(header_names_list, row):
+                player_stat_dict[col_name].append(col_val)
+
+        return player_stat_dict
+    
+
+
+    @instrumented
+    def set_detailed_filters(self, home_away='Overall', age_filter_type='All',
+                            player_age=None, player_position=['D','M','F'],
+                            filter_cat='Attack', sub_filter_list=['Goals', 'Big chances missed', 'Succ. dribbles', 'Successful dribbles %', 'Offsides']):
+        """
+        Selects a preset filter, pulls column headers of that data tables
+        as dictionary keys, and stores row values in lists.
+        
+        Args:
+            home_away (str) : selects the home or away games, or both for the
+                filter ("Overall", "Home", "Away") (default is "Overall")
+            age_filter_type (str) : selects the age filter type ("All",
+                "More than", "Equals", "Less than") (default is "All")
+            player_age (int) : if age_filter_type is not None, then a player
+                age must be specified (default is None)
+            player_position (list of str) : list of desired positions to filter for
+                (['G','D','M','F']) (default is ['G','D','M','F'])
+            filter_cat (str) : broad category for subfilter selection 
+                ("Attack", "Defence", "Passing", "Goalkeeper", "Other")
+            sub_filter_list (list) : selects subfilters for each column of the table,
+                limit 5 (for list of available subfilters see README)
+                (default is ['Goals', 'Shots on target', 'Total shots', 'Rating'])
+
+        """
+
+        self.execute_script("window.scrollTo(0,1800)") # Serie A & LaLiga webpages are tempermental
+        # and don't load the filters, even though they are on the page, a work around I found
+        # is to scroll to the location of the filters
+        TimedWait(self, 45).until(EC.presence_of_element_located(locators.locator('detailed_tab'))).click()
+        # Select home_away filter
+        home_away_btn = TimedWait(self, 30).until(EC.presence_of_element_located(
+            locators.locator('venue_button', home_away=home_away)))
+        home_away_btn.click()
+        # Select age filter
+        if age_filter_type != 'All':
+            self.find_element(*locators.locator('age_dropdown')).click()
+            TimedWait(self, 10).until(EC.presence_of_element_located(
+                locators.locator('age_option', age_filter_type=age_filter_type))).click()
+            age_input_field = self.find_element(*locators.locator('age_input'))
+            age_input_field.send_keys(player_age)
+        
+        # Select player positions
+        positions = ['G','D','M','F']
+        for position in positions:
+            if position not in player_position:
+                # WebDriverWait(self, 10).until(EC.visibility_of_element_located((By.XPATH, f'//div[text()="{position}"]')))
+                self.find_element(*locators.locator('position_checkbox', position=position)).click()
+
+        # Uncheck all existing filters, counted in page rather than probing with find_element
+        # until it fails, which would wait out the implicit wait. After each round of clicks the
+        # chips left are only clicked again once the page has re-rendered with fewer of them
+        chips_left = locators.count(self, 'filter_chip')
+        for _ in range(10):
+            if not chips_left:
+                break
+            locators.click_all(self, 'filter_chip')
+            try:
+                TimedWait(self, 5, poll_frequency=0.1).until(
+                    lambda driver: locators.count(driver, 'filter_chip') < chips_left)
+            except TimeoutException:
+                pass
+            chips_left = locators.count(self, 'filter_chip')
+        
+        # Selecting filters
+        filter_dict = {
+            "Attack": 1,
+            "Defence": 2,
+            "Passing": 3,
+            "Goalkeeper": 4,
+            "Other": 5
+        }
+        self.find_element(*locators.locator('filter_category', index=filter_dict[filter_cat])).click()
+
+        for sub_filter in sub_filter_list:
+            self.find_element(*locators.locator('sub_filter', sub_filter=sub_filter)).click()
+
+        # Apply filters
+        fingerprint = self.table_fingerprint()
+        self.find_element(*locators.locator('apply_filters')).click()
+        if fingerprint is not None:
+            self.wait_for_table_change(fingerprint, required=False)
+        self.detailed_filters = {
+            'home_away': home_away, 'age_filter_type': age_filter_type,
+            'player_age': player_age, 'player_position': list(player_position),
+            'filter_cat': filter_cat, 'sub_filter_list': list(sub_filter_list)
+        }
+
+
+
+    def cache_page(self, page, header_names_list, rows):
+        """ Stores a scraped page in the page cache, if one is set """
+
+        if self.cache and self.league_url:
+            self.cache.put_page(self.league_url, self.season, self.table_signature,
+                                page, header_names_list, rows)
+
+
+
+    @instrumented
+    def scan_remaining_pages(self, defined_player_stat_dict, sink=None, as_dataframe=True):
+        """
+        Takes in an established data schema from the establish_basic_schema() method,
+        scans remaining pages of data into the dictionary, converts to pandas DataFrame,
+        and streams every page to the sink, if one is given.
+
+        With tabs > 1 and at least TAB_MIN_PAGES pages per tab, the same season
+        and filters are applied in extra tabs of the browser, each tab scans a
+        range of the pages, and the pages are merged back in page order
+        without repeated (Team, Name) rows.
+        
+        Args:
+            defined_player_stat_dict (dict) : dictionary which establishes the data
+                schema for the remaining data to be pull from all pages
+            sink (bot.sinks.PageSink) : sink every page is streamed into as soon
+                as it is extracted (default is None)
+            as_dataframe (bool) : accumulates the pages into a DataFrame, set to
+                False with a sink to keep memory constant per page (default is True)
+        Returns:
+            pandas.DataFrame: DataFrame of column headers and row values from the
+            scanned pages, or None if as_dataframe is False
+        """
+
+        header_names_list = list(defined_player_stat_dict.keys())
+        if sink:
+            sink.open(header_names_list)
+        try:
+            if sink:
+                sink.write_page(1, [list(row) for row in zip(*defined_player_stat_dict.values())])
+            return self._scan_pages(defined_player_stat_dict, header_names_list, sink, as_dataframe)
+        finally:
+            if sink:
+                sink.close()
+
+
+
+    def _scan_pages(self, defined_player_stat_dict, header_names_list, sink, as_dataframe):
+        """ Clicks through and extracts every page after the first, see scan_remaining_pages() """
+
+        ignored_exceptions=(NoSuchElementException,StaleElementReferenceException,)
+        # one call, a table without pagination does not wait out the implicit wait
+        total_page_count = locators.page_count(self)
+        if total_page_count == 1:
+            # the only page was already cached by establish_schema() and written to the sink
+            if self.cache and self.league_url:
+                self.cache.complete_table(self.league_url, self.season, self.table_signature, 1)
+            return pd.DataFrame(defined_player_stat_dict) if as_dataframe else None
+
+        # Picks up the pages checkpointed by an earlier, interrupted run of the same scrape
+        checkpoint = None
+        checkpointed_pages = {}
+        if self.checkpoint_dir and self.league_url:
+            checkpoint = ScrapeCheckpoint(self.checkpoint_dir, self.league_url, self.season, self.table_signature)
+            checkpointed_pages = checkpoint.load(header_names_list)
+
+        def store_page(page, rows):
+            self.cache_page(page, header_names_list, rows)
+            if sink:
+                sink.write_page(page, rows)
+            if as_dataframe:
+                for row in rows:
+                    for col_name, col_val in zip(header_names_list, row):
+                        defined_player_stat_dict[col_name].append(col_val)
+
+        num_tabs = max(1, min(self.tabs, (total_page_count - 1) // TAB_MIN_PAGES))
+        if num_tabs > 1:
+            first_page_keys = set(zip(defined_player_stat_dict.get('Team', []), defined_player_stat_dict.get('Name', [])))
+            self._scan_pages_in_tabs(total_page_count, num_tabs, header_names_list,
+                                     checkpointed_pages, checkpoint, store_page, first_page_keys)
+        else:
+            # Loops over each remaining page of data, streaming rows to the sink and appending them to lists
+            for page in range(total_page_count - 1):
+                self._track_page(page + 2)
+                fingerprint = self.table_fingerprint()
+                next_page_btn = self.find_element(*locators.locator('next_page'))
+                TimedWait(self, 15, ignored_exceptions=ignored_exceptions).until(EC.element_to_be_clickable(next_page_btn))
+                next_page_btn.click()
+                self.wait_for_table_change(fingerprint) # raises rather than re-reading the same page
+
+                if page + 2 in checkpointed_pages:
+                    # already scraped, only click forward past it
+                    rows = checkpointed_pages[page + 2]
+                else:
+                    _, rows = self.read_table(header_names_list)
+                    if checkpoint:
+                        checkpoint.save_page(page + 2, rows)
+                store_page(page + 2, rows)
+            self._track_page(None)
+
+        if self.cache and self.league_url:
+            self.cache.complete_table(self.league_url, self.season, self.table_signature, total_page_count)
+        if checkpoint:
+            checkpoint.clear()
+        if not as_dataframe:
+            return None
+        player_stats = pd.DataFrame(defined_player_stat_dict)
+        return player_stats
+
+
+
+    def _scan_pages_in_tabs(self, total_page_count, num_tabs, header_names_list,
+                            checkpointed_pages, checkpoint, store_page, seen_keys):
+        """
+        Scans pages 2 to total_page_count split into contiguous ranges, one per
+        tab. Every extra tab is opened with the same league, season and filters,
+        and the tabs are served round robin: after a tab's page button is
+        clicked the driver moves on to the next tab while the page renders.
+        Pages are handed to store_page in page order, without repeated
+        (Team, Name) rows.
+
+        The first tab walks its range forward from page 1 and the last tab
+        walks its range backward from the last page, both reached in one
+        click. Tabs in between reach their range through the nearest numbered
+        page button, so they gain the most where the pagination shows buttons
+        close to their range.
+        """
+
+        pages = list(range(2, total_page_count + 1))
+        chunk_size, extra = divmod(len(pages), num_tabs)
+        ranges = []
+        for tab_ind in range(num_tabs):
+            start = tab_ind * chunk_size + min(tab_ind, extra)
+            ranges.append(pages[start:start + chunk_size + (tab_ind < extra)])
+        ranges[-1].reverse()
+
+        # replays the season and filters of the table in every extra tab
+        league, season = self.league, self.season
+        main_filter = json.loads(self.table_signature)['main_filter']
+        detailed_filters = self.detailed_filters
+        main_handle = self.current_window_handle
+        walkers = [(main_handle, self._walk_pages(1, ranges[0], header_names_list, checkpointed_pages))]
+        extra_handles = []
+        key_cols = [header_names_list.index(col) for col in ('Team', 'Name') if col in header_names_list]
+        scanned_pages = {}
+        next_page = 2
+        try:
+            for page_range in ranges[1:]:
+                self.switch_to.new_window('tab')
+                extra_handles.append(self.current_window_handle)
+                self.open_page(league, season)
+                if detailed_filters is not None:
+                    self.set_detailed_filters(**detailed_filters)
+                    self.establish_schema()
+                else:
+                    self.establish_schema(main_filter)
+                walkers.append((self.current_window_handle,
+                                self._walk_pages(1, page_range, header_names_list, checkpointed_pages)))
+
+            while walkers:
+                for walker in list(walkers):
+                    handle, pages_walked = walker
+                    self.switch_to.window(handle)
+                    try:
+                        scanned = next(pages_walked)
+                    except StopIteration:
+                        walkers.remove(walker)
+                        continue
+                    if scanned is None:
+                        continue # a page button was clicked, the page renders while other tabs run
+                    page, rows, from_checkpoint = scanned
+                    if checkpoint and not from_checkpoint:
+                        checkpoint.save_page(page, rows)
+                    scanned_pages[page] = rows
+
+                    # merges the contiguous pages scanned so far back in page order
+                    while next_page in scanned_pages:
+                        page_rows = scanned_pages.pop(next_page)
+                        if len(key_cols) == 2:
+                            keys = [(row[key_cols[0]], row[key_cols[1]]) for row in page_rows]
+                            page_rows = [row for row, key in zip(page_rows, keys)
+                                         if not (key in seen_keys or seen_keys.add(key))]
+                        store_page(next_page, page_rows)
+                        next_page += 1
+        finally:
+            self._track_page(None)
+            for handle in extra_handles:
+                self.switch_to.window(handle)
+                self.close()
+            self.switch_to.window(main_handle)
+
+
+
+    def _walk_pages(self, current_page, pages, header_names_list, checkpointed_pages):
+        """
+        Generator walking one tab through a list of pages. Yields None right
+        after clicking a page button, so another tab can be served while the
+        page renders, and (page, rows, from_checkpoint) for every page in pages.
+        """
+
+        for page in pages:
+            self._track_page(page)
+            while current_page != page:
+                fingerprint = self.table_fingerprint()
+                button, current_page = self._page_button_towards(current_page, page)
+                button.click()
+                yield None
+                self._track_page(page) # other tabs ran in between
+                self.wait_for_table_change(fingerprint)
+            if page in checkpointed_pages:
+                yield page, checkpointed_pages[page], True
+            else:
+                yield page, self.read_table(header_names_list)[1], False
+
+
+
+    def _page_button_towards(self, current_page, target_page):
+        """
+        Returns the pagination button that gets closest to target_page, and the
+        page it leads to: a numbered page button, or the previous/next button.
+        """
+
+        page_buttons = self.find_elements(*locators.locator('page_buttons'))
+        labels = self.execute_script("return arguments[0].map(btn => btn.innerText.trim());", page_buttons)
+        step = 1 if target_page > current_page else -1
+        best_page, best_button = current_page + step, None
+        for button, label in zip(page_buttons, labels):
+            if label.isdigit() and abs(int(label) - target_page) < abs(best_page - target_page):
+                best_page, best_button = int(label), button
+        if best_button is None:
+            best_button = self.find_element(*locators.locator('next_page' if step > 0 else 'previous_page'))
+        return best_button, best_page
+
+
+
+    def _track_page(self, page):
+        """ Attributes the following WebDriver commands to a table page, if the bot is instrumented """
+
+        if self.instrumentation is not None:
+            self.instrumentation.page = page
+
+
+
+def scrape_from_cache(cache, league, season, main_filter=None, detailed_filters=None, sink=None,
+                      as_dataframe=True, league_urls=None):
+    """
+    Returns a table from a page cache without a browser, so a run whose table
+    is fully cached and fresh can skip starting Chrome altogether.
+
+    Args:
+        cache (bot.page_cache.PageCache) : cache the table was scraped into
+        league (str) : the league of the table
+        season (str) : the season of the table
+        main_filter (str) : preset filter type of the table (default is None)
+        detailed_filters (dict) : keyword arguments for NavBot.set_detailed_filters(),
+            used instead of main_filter (default is None)
+        sink (bot.sinks.PageSink) : sink the cached table is written to (default is None)
+        as_dataframe (bool) : returns the table as a DataFrame (default is True)
+        league_urls (dict) : league name to webpage url mapping the table was
+            scraped with (default is c.LEAGUE_PAGE_URLS)
+    Returns:
+        tuple: (True if every page of the table was cached, the table as a
+        pandas.DataFrame or None if it was not cached or as_dataframe is False)
+    """
+
+    if detailed_filters is not None:
+        signature = filter_signature('Detailed', NavBot.detailed_filter_args(detailed_filters))
+    else:
+        signature = filter_signature(main_filter)
+    cached_table = cache.get_table((league_urls or c.LEAGUE_PAGE_URLS)[league], season, signature)
+    if cached_table is None:
+        return False, None
+
+    header_names_list, rows = cached_table
+    if sink:
+        sink.write_table(header_names_list, rows)
+    return True, pd.DataFrame(rows, columns=header_names_list) if as_dataframe else None
@@ -0,0 +1,287 @@
+"""
+page_cache
+
+A persistent on-disk cache of scraped table pages, so that seasons which can
+no longer change are only ever scraped once, and the current season is only
+re-scraped when its pages go stale.
+
+Classes:
+  PageCache: an SQLite backed page cache with per-season TTLs and LRU eviction
+
+Functions:
+  filter_signature(main_filter, detailed_filters) :
+        returns a stable string describing the filters applied to a table
+  table_filter(main_filter, detailed_filters) :
+        returns the filter name stored tables are keyed on
+  filter_file_name(table_filter) :
+        returns a table_filter() short enough for a file or directory name
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import bot.constants as c
+
+
+MANIFEST_PAGE = 0 # page number under which a completed table's page count is stored
+
+
+def filter_signature(main_filter=None, detailed_filters=None):
+    """
+    Returns a stable string describing the filters applied to a table.
+
+    Args:
+        main_filter (str) : preset filter, or "Detailed" (default is None)
+        detailed_filters (dict) : keyword arguments of NavBot.set_detailed_filters()
+            (default is None)
+    Returns:
+        str: JSON signature of the filters
+    """
+
+    return json.dumps({'main_filter': main_filter, 'detailed_filters': detailed_filters or {}},
+                      sort_keys=True)
+
+
+def table_filter(main_filter=None, detailed_filters=None):
+    """
+    Returns the filter a stored table is keyed on: the preset filter name, or
+    the filter_signature() of a Detailed table, so Detailed tables scraped
+    with different venue, age, position or sub filters are kept apart.
+
+    Args:
+        main_filter (str) : preset filter (default is None)
+        detailed_filters (dict) : keyword arguments of NavBot.set_detailed_filters(),
+            used instead of main_filter (default is None)
+    Returns:
+        str: the preset filter, or the JSON signature of the Detailed filters
+    """
+
+    if detailed_filters is None:
+        return main_filter
+    return filter_signature('Detailed', detailed_filters)
+
+
+def filter_file_name(stored_filter):
+    """
+    Returns a table_filter() short enough for a file or directory name: a
+    preset filter name as it is, a Detailed filter signature as 'Detailed-'
+    and a hash of the signature.
+
+    Args:
+        stored_filter (str) : filter from table_filter()
+    Returns:
+        str: the file name part of the filter
+    """
+
+    if not str(stored_filter).startswith('{'):
+        return str(stored_filter)
+    return f"Detailed-{hashlib.sha1(stored_filter.encode('utf-8')).hexdigest()[:16]}"
+
+
+class PageCache:
+    """
+    An SQLite backed cache of parsed table pages keyed on (league url, season,
+    filter signature, page number).
+
+    Pages of the current season (c.CURRENT_SEASON) expire after current_ttl
+    seconds, pages of historical seasons after historical_ttl seconds (None
+    means never). Once the stored pages exceed max_bytes, the least recently
+    used pages are evicted.
+
+    Attributes
+    ----------
+    path : str
+        location of the SQLite cache file
+    stats : dict
+        counts of cache 'hits', 'misses', 'expired' pages and 'evictions'
+
+    Methods
+    -------
+    get_page (league_url, season, signature, page) :
+        returns the (headers, rows) stored for a page, or None
+    put_page (league_url, season, signature, page, headers, rows) :
+        stores the headers and rows of a page
+    get_table (league_url, season, signature) :
+        returns the headers and rows of a completed table, or None
+    complete_table (league_url, season, signature, total_page_count) :
+        marks every page of a table as scraped
+    clear () :
+        removes every page from the cache
+    """
+
+    def __init__(self, path=os.path.join('.stats_cache', 'pages.sqlite'),
+                 current_ttl=6 * 60 * 60, historical_ttl=None, max_bytes=256 * 1024 * 1024):
+        """
+        path (str) : location of the SQLite cache file (default is .stats_cache/pages.sqlite)
+        current_ttl (float) : seconds before current season pages expire (default is 6 hours)
+        historical_ttl (float) : seconds before historical season pages expire,
+            None for never (default is None)
+        max_bytes (int) : size of stored pages above which LRU pages are evicted
+            (default is 256 MiB)
+        """
+
+        self.path = path
+        self.current_ttl = current_ttl
+        self.historical_ttl = historical_ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                league_url TEXT, season TEXT, signature TEXT, page INTEGER,
+                payload TEXT, size INTEGER, created REAL, accessed REAL,
+                PRIMARY KEY (league_url, season, signature, page))""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)")
+        self._conn.commit()
+        # running size of the stored pages, so puts never scan the table
+        self._total_size = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+
+
+    def ttl(self, season):
+        """ Returns the time to live of a season's pages in seconds, None for never """
+
+        return self.current_ttl if season == c.CURRENT_SEASON else self.historical_ttl
+
+
+
+    def _get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, size, created FROM pages WHERE league_url=? AND season=? AND signature=? AND page=?",
+                key).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            payload, size, created = row
+            ttl = self.ttl(key[1])
+            if ttl is not None and time.time() - created > ttl:
+                self._conn.execute(
+                    "DELETE FROM pages WHERE league_url=? AND season=? AND signature=? AND page=?", key)
+                self._conn.commit()
+                self._total_size -= size
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._conn.execute(
+                "UPDATE pages SET accessed=? WHERE league_url=? AND season=? AND signature=? AND page=?",
+                (time.time(),) + key)
+            self._conn.commit()
+            self.stats['hits'] += 1
+            return json.loads(payload)
+
+
+
+    def _put(self, key, value):
+        payload = json.dumps(value)
+        now = time.time()
+        with self._lock:
+            replaced = self._conn.execute(
+                "SELECT size FROM pages WHERE league_url=? AND season=? AND signature=? AND page=?", key).fetchone()
+            self._conn.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                               key + (payload, len(payload), now, now))
+            self._total_size += len(payload) - (replaced[0] if replaced else 0)
+            self._evict()
+            self._conn.commit()
+
+
+
+    def _evict(self):
+        """ Drops least recently used pages until the cache fits in max_bytes """
+
+        while self._total_size > self.max_bytes:
+            rowid, size = self._conn.execute("SELECT rowid, size FROM pages ORDER BY accessed LIMIT 1").fetchone()
+            self._conn.execute("DELETE FROM pages WHERE rowid=?", (rowid,))
+            self._total_size -= size
+            self.stats['evictions'] += 1
+
+
+
+    def get_page(self, league_url, season, signature, page):
+        """
+        Returns the headers and rows stored for a page.
+
+        Args:
+            league_url (str) : webpage url of the league
+            season (str) : season name, format 'YY/YY'
+            signature (str) : filter signature from filter_signature()
+            page (int) : page number, starting at 1
+        Returns:
+            tuple: (list of column titles, list of row value lists), or None
+            if the page is not cached or has expired
+        """
+
+        value = self._get((league_url, season, signature, page))
+        if value is None:
+            return None
+        return value['headers'], value['rows']
+
+
+
+    def put_page(self, league_url, season, signature, page, headers, rows):
+        """
+        Stores the headers and rows of a page.
+
+        Args:
+            league_url (str) : webpage url of the league
+            season (str) : season name, format 'YY/YY'
+            signature (str) : filter signature from filter_signature()
+            page (int) : page number, starting at 1
+            headers (list) : column titles of the page
+            rows (list) : row value lists of the page
+        """
+
+        self._put((league_url, season, signature, page), {'headers': headers, 'rows': rows})
+
+
+
+    def complete_table(self, league_url, season, signature, total_page_count):
+        """ Marks every page of a table as scraped, see get_table() """
+
+        self._put((league_url, season, signature, MANIFEST_PAGE), {'pages': total_page_count})
+
+
+
+    def get_table(self, league_url, season, signature):
+        """
+        Returns the headers and rows of a completed table, if all of its
+        pages are cached and fresh.
+
+        Args:
+            league_url (str) : webpage url of the league
+            season (str) : season name, format 'YY/YY'
+            signature (str) : filter signature from filter_signature()
+        Returns:
+            tuple: (list of column titles, list of row value lists), or None
+        """
+
+        manifest = self._get((league_url, season, signature, MANIFEST_PAGE))
+        if manifest is None:
+            return None
+        headers, rows = None, []
+        for page in range(1, manifest['pages'] + 1):
+            cached_page = self.get_page(league_url, season, signature, page)
+            if cached_page is None:
+                return None
+            headers = cached_page[0]
+            rows += cached_page[1]
+        return headers, rows
+
+
+
+    def clear(self):
+        """ Removes every page from the cache """
+
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+            self._total_size = 0
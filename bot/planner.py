@@ -0,0 +1,255 @@
+"""
+planner
+
+Plans and runs the browser passes needed to scrape an arbitrary list of
+stats. When the venue, age and position filters are left unset, stats shown
+by a preset filter table are taken from that preset, as preset tables show
+every player. The rest, or every stat of a filtered scrape, are split into
+the fewest Detailed tables of at most five sub filters from one filter
+category, and every pass runs in the same open NavBot. The tables are then
+joined on (Team, Name) into one wide table, with columns titled as in the
+preset tables.
+
+Classes:
+  ScrapePass: one preset filter or Detailed table to scrape
+  ScrapePlan: the passes for a list of stats, and how many passes they saved
+
+Functions:
+  plan_stats(wanted_stats, detailed_filters) :
+        returns the ScrapePlan with the fewest browser passes for a list of stats
+  run_plan(bot, plan, league, season, detailed_filters) :
+        scrapes every pass of a plan on one NavBot and joins the tables
+  cached_plan(cache, plan, league, season, detailed_filters) :
+        joins the tables of a plan from the page cache, without a browser
+"""
+import itertools
+from collections import namedtuple
+import pandas as pd
+import bot.constants as c
+from bot.nav_bot import NavBot, scrape_from_cache
+
+
+ScrapePass = namedtuple('ScrapePass', ['main_filter', 'filter_cat', 'sub_filter_list'])
+
+# venue, age and position filters selecting every player, as a preset table does
+UNFILTERED = {'home_away': 'Overall', 'age_filter_type': 'All', 'player_age': None,
+                  'player_position': ['G', 'D', 'M', 'F']}
+
+
+class ScrapePlan(namedtuple('ScrapePlan', ['passes', 'naive_passes', 'unknown_stats'])):
+    """
+    The passes for a list of stats.
+
+    Attributes
+    ----------
+    passes : list of ScrapePass
+        preset filter passes first, then Detailed passes
+    naive_passes : int
+        Detailed tables needed for every stat, one browser launch each, as
+        done by hand with run.py
+    unknown_stats : list of str
+        stats that are neither a preset column nor a Detailed sub filter
+    """
+
+    @property
+    def passes_saved(self):
+        """ Browser passes saved compared to the naive Detailed-only plan """
+
+        return self.naive_passes - len(self.passes)
+
+    @property
+    def launches_saved(self):
+        """ Chrome launches saved by running every pass in one session """
+
+        return self.naive_passes - 1 if self.passes else 0
+
+
+def _preset_columns():
+    """ Column titles shown by each preset filter table """
+
+    return {main_filter: {title for _, title in fields}
+            for main_filter, fields in c.API_FILTER_FIELDS.items()}
+
+
+def _column_title(stat):
+    """ Returns the preset table title of a stat, also for a Detailed sub filter name """
+
+    return c.DETAILED_COLUMN_TITLES.get(stat, stat)
+
+
+def _sub_filter(stat):
+    """ Returns the Detailed sub filter name of a stat, also for a preset table title """
+
+    return {title: sub_filter for sub_filter, title in c.DETAILED_COLUMN_TITLES.items()}.get(stat, stat)
+
+
+def _detailed_categories(stat):
+    """ Returns every filter category listing a stat as a sub filter, empty for preset-only stats """
+
+    return [filter_cat for filter_cat, sub_filters in c.DETAILED_SUB_FILTERS.items()
+            if _sub_filter(stat) in sub_filters]
+
+
+def _is_unfiltered(detailed_filters):
+    """ Whether venue, age and position filters select every player, as preset tables do """
+
+    if detailed_filters is None:
+        return True
+    shared_filters = NavBot.detailed_filter_args(detailed_filters)
+    return (shared_filters['home_away'] == UNFILTERED['home_away']
+            and shared_filters['age_filter_type'] == UNFILTERED['age_filter_type']
+            and set(shared_filters['player_position']) == set(UNFILTERED['player_position']))
+
+
+def _group_by_category(stats):
+    """
+    Groups stats by Detailed filter category, None for preset-only stats. A
+    stat listed by several categories (e.g. Clean sheets) goes to the one
+    that needs the fewest passes for every stat together; each choice is
+    tried, as only a few stats are listed twice.
+    """
+
+    best_passes, best_groups = None, None
+    for categories in itertools.product(*[_detailed_categories(stat) or [None] for stat in stats]):
+        by_category = {}
+        for stat, filter_cat in zip(stats, categories):
+            by_category.setdefault(filter_cat, []).append(stat)
+        num_passes = sum(-(-len(cat_stats) // c.DETAILED_FILTER_LIMIT)
+                         for filter_cat, cat_stats in by_category.items() if filter_cat is not None)
+        if best_passes is None or num_passes < best_passes:
+            best_passes, best_groups = num_passes, by_category
+    return best_groups
+
+
+def _detailed_passes(stats):
+    """ Splits stats into Detailed passes of up to five sub filters from one category """
+
+    passes = []
+    for filter_cat, cat_stats in _group_by_category(stats).items():
+        for ind in range(0, len(cat_stats), c.DETAILED_FILTER_LIMIT):
+            passes.append(ScrapePass('Detailed', filter_cat,
+                                     [_sub_filter(stat) for stat in cat_stats[ind:ind + c.DETAILED_FILTER_LIMIT]]))
+    return passes
+
+
+def plan_stats(wanted_stats, detailed_filters=None):
+    """
+    Returns the plan with the fewest browser passes for a list of stats. When
+    the filters select every player, every combination of preset filters is
+    tried, and the stats they do not cover are packed into Detailed passes
+    per filter category. Otherwise every stat comes from a Detailed pass, as
+    preset tables ignore venue, age and position filters.
+
+    Args:
+        wanted_stats (list of str) : column titles or Detailed sub filter names
+        detailed_filters (dict) : venue, age and position arguments for
+            set_detailed_filters() the stats are scraped with (default is None)
+    Returns:
+        ScrapePlan: the passes, the naive pass count and any unknown stats
+    """
+
+    wanted_stats = list(dict.fromkeys(_column_title(stat) for stat in wanted_stats))
+    preset_columns = _preset_columns() if _is_unfiltered(detailed_filters) else {}
+    unknown_stats = [stat for stat in wanted_stats
+                     if not _detailed_categories(stat)
+                     and not any(stat in cols for cols in preset_columns.values())]
+    known_stats = [stat for stat in wanted_stats if stat not in unknown_stats]
+
+    best_passes = None
+    for num_presets in range(len(preset_columns) + 1):
+        for presets in itertools.combinations(preset_columns, num_presets):
+            covered = set().union(*[preset_columns[preset] for preset in presets])
+            # stats no chosen preset covers must come from a Detailed table
+            remaining = [stat for stat in known_stats if stat not in covered]
+            if not all(_detailed_categories(stat) for stat in remaining):
+                continue
+            passes = [ScrapePass(preset, None, None) for preset in presets] + _detailed_passes(remaining)
+            if best_passes is None or len(passes) < len(best_passes):
+                best_passes = passes
+
+    # every known stat is also a Detailed sub filter, so the naive plan is Detailed only
+    naive_passes = len(_detailed_passes([stat for stat in known_stats if _detailed_categories(stat)]))
+    return ScrapePlan(best_passes, naive_passes, unknown_stats)
+
+
+def _pass_args(scrape_pass, detailed_filters):
+    """ Returns the NavBot.scrape() filter arguments of a pass """
+
+    if scrape_pass.main_filter == 'Detailed':
+        return {'detailed_filters': {**(UNFILTERED if detailed_filters is None else detailed_filters),
+                                     'filter_cat': scrape_pass.filter_cat,
+                                     'sub_filter_list': scrape_pass.sub_filter_list}}
+    if not _is_unfiltered(detailed_filters):
+        raise ValueError(f"The {scrape_pass.main_filter} preset table can not be filtered by venue, "
+                         f"age or position, plan the stats with plan_stats(wanted_stats, detailed_filters)")
+    return {'main_filter': scrape_pass.main_filter}
+
+
+def _join_tables(pass_dfs):
+    """ Joins the tables of a plan's passes on (Team, Name), see run_plan() """
+
+    wide_df = None
+    for pass_df in pass_dfs:
+        pass_df = pass_df.drop_duplicates(['Team', 'Name']).rename(columns=c.DETAILED_COLUMN_TITLES)
+        if wide_df is None:
+            wide_df = pass_df
+            continue
+        new_cols = ['Team', 'Name'] + [col for col in pass_df.columns if col not in wide_df.columns]
+        # every pass is scraped with the same filters, so only players in every table are kept
+        wide_df = wide_df.merge(pass_df[new_cols], on=['Team', 'Name'], how='inner')
+
+    return wide_df if wide_df is not None else pd.DataFrame(columns=['Team', 'Name'])
+
+
+def run_plan(bot, plan, league="Premier League", season=c.CURRENT_SEASON, detailed_filters=None):
+    """
+    Scrapes every pass of a plan in one open NavBot session and joins the
+    tables on (Team, Name), keeping the players found in every table. A
+    column found in more than one table (e.g. Rating) is taken from the
+    first table it appears in.
+
+    Args:
+        bot (NavBot) : open browser to run every pass in
+        plan (ScrapePlan) : plan from plan_stats()
+        league (str) : the league for which the data is to be retrieved
+            (default is "Premier League")
+        season (str) : the season for which the data is to be retrieved
+            (default is c.CURRENT_SEASON)
+        detailed_filters (dict) : venue, age and position arguments for
+            set_detailed_filters() shared by every Detailed pass, the same the
+            plan was made with (default is None, every player)
+    Returns:
+        pandas.DataFrame: one wide table with a row per (Team, Name)
+    """
+
+    pass_args = [_pass_args(scrape_pass, detailed_filters) for scrape_pass in plan.passes]
+    return _join_tables(bot.scrape(league, season, **scrape_args) for scrape_args in pass_args)
+
+
+def cached_plan(cache, plan, league="Premier League", season=c.CURRENT_SEASON, detailed_filters=None,
+                league_urls=None):
+    """
+    Joins the tables of every pass of a plan from the page cache, like
+    run_plan() but without starting a browser.
+
+    Args:
+        cache (bot.page_cache.PageCache) : cache the passes were scraped into
+        plan (ScrapePlan) : plan from plan_stats()
+        league (str) : the league of the tables (default is "Premier League")
+        season (str) : the season of the tables (default is c.CURRENT_SEASON)
+        detailed_filters (dict) : venue, age and position arguments shared by
+            every Detailed pass, the same the plan was made with (default is None)
+        league_urls (dict) : league name to webpage url mapping the passes were
+            scraped with (default is c.LEAGUE_PAGE_URLS)
+    Returns:
+        pandas.DataFrame: one wide table with a row per (Team, Name), or None
+        unless every pass is cached and fresh
+    """
+
+    pass_dfs = []
+    for scrape_args in [_pass_args(scrape_pass, detailed_filters) for scrape_pass in plan.passes]:
+        cached, pass_df = scrape_from_cache(cache, league, season, league_urls=league_urls, **scrape_args)
+        if not cached:
+            return None
+        pass_dfs.append(pass_df)
+    return _join_tables(pass_dfs)
@@ -0,0 +1,188 @@
+"""
+session
+
+Faster NavBot startup: the chromedriver path is resolved once and cached on
+disk (with an offline mode that never touches the network), and a long-lived
+Chrome can be kept running on a remote debugging port for later runs to
+reattach to, skipping the browser cold start.
+
+Functions:
+  resolve_driver(offline, refresh) :
+        returns the chromedriver path, from the local cache when possible
+  find_session() :
+        returns the registered long-lived Chrome session if it is still running
+  launch_session(profile, port) :
+        starts a long-lived Chrome on a remote debugging port and registers it
+  stop_session() :
+        stops the registered long-lived Chrome
+  measure_startup(runs, **bot_kwargs) :
+        times cold and warm NavBot startups
+
+Run as a script to print cold and warm startup times:
+    python -m bot.session
+"""
+import json
+import os
+import shutil
+import signal
+import socket
+import subprocess
+import tempfile
+import time
+
+
+STATE_DIR = '.stats_cache'
+DRIVER_CACHE_PATH = os.path.join(STATE_DIR, 'driver.json')
+SESSION_REGISTRY_PATH = os.path.join(STATE_DIR, 'session.json')
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome',
+                   r'C:\Program Files\Google\Chrome\Application\chrome.exe']
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, value):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+
+
+def resolve_driver(offline=False, refresh=False):
+    """
+    Returns the chromedriver path. A previously resolved path is reused while
+    the file exists; otherwise webdriver_manager resolves it, unless offline,
+    in which case chromedriver must already be on the PATH.
+
+    Args:
+        offline (bool) : never resolves the driver over the network (default is False)
+        refresh (bool) : ignores the cached path, e.g. after Chrome was updated
+            (default is False)
+    Returns:
+        str: path of the chromedriver executable
+    """
+
+    cached = None if refresh else _read_json(DRIVER_CACHE_PATH)
+    if cached and os.path.exists(cached.get('path', '')):
+        return cached['path']
+
+    if offline:
+        path = shutil.which('chromedriver')
+        if path is None:
+            raise FileNotFoundError("No cached chromedriver and none on the PATH, run once without offline mode")
+    else:
+        from webdriver_manager.chrome import ChromeDriverManager
+        path = ChromeDriverManager().install()
+    _write_json(DRIVER_CACHE_PATH, {'path': path, 'resolved_at': time.time()})
+    return path
+
+
+def _port_open(port, host='127.0.0.1'):
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.settimeout(0.5)
+        return sock.connect_ex((host, port)) == 0
+
+
+def find_session():
+    """
+    Returns the registered long-lived Chrome session if it is still running.
+
+    Returns:
+        dict: 'port', 'pid' and 'user_data_dir' of the session, or None
+    """
+
+    session = _read_json(SESSION_REGISTRY_PATH)
+    if session and _port_open(session['port']):
+        return session
+    return None
+
+
+def launch_session(profile=None, port=9222, chrome_binary=None, timeout=20):
+    """
+    Starts a long-lived Chrome on a remote debugging port and registers it
+    so later NavBots can reattach to it. The browser outlives this process.
+
+    Args:
+        profile (bot.browser_profile.BrowserProfile) : profile whose Chrome
+            arguments are used (default is None)
+        port (int) : remote debugging port (default is 9222)
+        chrome_binary (str) : Chrome executable (default is None - searched on the PATH)
+        timeout (float) : seconds to wait for Chrome to listen (default is 20)
+    Returns:
+        dict: 'port', 'pid' and 'user_data_dir' of the session
+    """
+
+    chrome_binary = chrome_binary or next(
+        (path for path in map(shutil.which, CHROME_BINARIES) if path), None)
+    if chrome_binary is None:
+        raise FileNotFoundError("Chrome executable not found, pass chrome_binary")
+
+    user_data_dir = tempfile.mkdtemp(prefix='stats_bot_chrome_')
+    arguments = [chrome_binary, f'--remote-debugging-port={port}', f'--user-data-dir={user_data_dir}',
+                 '--ignore-certificate-errors', '--no-first-run', '--no-default-browser-check']
+    if profile:
+        arguments += profile.chrome_arguments()
+    process = subprocess.Popen(arguments, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                               start_new_session=True)
+
+    deadline = time.monotonic() + timeout
+    while not _port_open(port):
+        if time.monotonic() > deadline or process.poll() is not None:
+            process.kill()
+            raise TimeoutError(f"Chrome did not start listening on port {port}")
+        time.sleep(0.1)
+
+    session = {'port': port, 'pid': process.pid, 'user_data_dir': user_data_dir}
+    _write_json(SESSION_REGISTRY_PATH, session)
+    return session
+
+
+def stop_session():
+    """ Stops the registered long-lived Chrome and removes it from the registry """
+
+    session = _read_json(SESSION_REGISTRY_PATH)
+    if session:
+        try:
+            os.kill(session['pid'], signal.SIGTERM)
+        except OSError:
+            pass
+        shutil.rmtree(session['user_data_dir'], ignore_errors=True)
+        os.remove(SESSION_REGISTRY_PATH)
+
+
+def measure_startup(runs=3, **bot_kwargs):
+    """
+    Times NavBot startups: cold (fresh driver resolution and Chrome launch)
+    against warm (cached driver path, reattaching to a long-lived Chrome).
+
+    Args:
+        runs (int) : startups timed for each mode (default is 3)
+        bot_kwargs : passed on to every NavBot
+    Returns:
+        dict: 'cold' and 'warm' lists of startup seconds
+    """
+
+    from bot.nav_bot import NavBot
+
+    timings = {'cold': [], 'warm': []}
+    for _ in range(runs):
+        bot = NavBot(refresh_driver=True, **bot_kwargs)
+        timings['cold'].append(bot.startup_seconds)
+        bot.quit()
+    NavBot(reuse_session=True, **bot_kwargs).quit() # launches the long-lived Chrome
+    for _ in range(runs):
+        bot = NavBot(reuse_session=True, **bot_kwargs)
+        timings['warm'].append(bot.startup_seconds)
+        bot.quit()
+    stop_session()
+    return timings
+
+
+if __name__ == '__main__':
+    results = measure_startup(headless=True)
+    for mode, seconds in results.items():
+        print(f"{mode.capitalize()} startup: {min(seconds):.2f} s best, {sum(seconds) / len(seconds):.2f} s mean")
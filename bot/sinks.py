@@ -0,0 +1,153 @@
+"""
+sinks
+
+Page sinks that scan_remaining_pages() streams each scraped page into as soon
+as it is extracted, so results are on disk while a scrape is still running
+and memory use stays constant per page.
+
+Classes:
+  PageSink: base class of the sinks, also usable as a context manager
+  CsvSink: appends every page to a CSV file
+  JsonLinesSink: appends every row to a JSON lines file as a header: value object
+  ParquetSink: writes every page as a row group of a Parquet file (requires pyarrow)
+  DataFrameSink: collects the pages into a pandas DataFrame
+"""
+import csv
+import json
+import pandas as pd
+
+
+class PageSink:
+    """
+    Base class of the page sinks. A sink receives exactly one table: open()
+    with its column titles, write_page() once per page and close() at the end.
+
+    Methods
+    -------
+    open (header_names_list) :
+        starts the table with its column titles
+    write_page (page, rows) :
+        writes the rows of one page, in page order
+    close () :
+        finishes the table
+    write_table (header_names_list, rows) :
+        writes a whole table at once, e.g. one read from the page cache
+    """
+
+    def open(self, header_names_list):
+        self.header_names_list = list(header_names_list)
+
+    def write_page(self, page, rows):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write_table(self, header_names_list, rows):
+        with self:
+            self.open(header_names_list)
+            self.write_page(1, rows)
+
+
+class CsvSink(PageSink):
+    """ Appends every page to a CSV file, flushing after each page """
+
+    def __init__(self, path):
+        """ path (str) : location of the CSV file """
+
+        self.path = path
+        self._file = None
+
+    def open(self, header_names_list):
+        super(CsvSink, self).open(header_names_list)
+        self._file = open(self.path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.header_names_list)
+
+    def write_page(self, page, rows):
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class JsonLinesSink(PageSink):
+    """ Appends every row to a JSON lines file, flushing after each page """
+
+    def __init__(self, path):
+        """ path (str) : location of the JSON lines file """
+
+        self.path = path
+        self._file = None
+
+    def open(self, header_names_list):
+        super(JsonLinesSink, self).open(header_names_list)
+        self._file = open(self.path, 'w', encoding='utf-8')
+
+    def write_page(self, page, rows):
+        for row in rows:
+            self._file.write(json.dumps(dict(zip(self.header_names_list, row))) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink(PageSink):
+    """ Writes every page as one row group of a Parquet file, all columns as strings """
+
+    def __init__(self, path):
+        """ path (str) : location of the Parquet file """
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("ParquetSink requires the pyarrow package") from None
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        self.path = path
+        self._writer = None
+
+    def open(self, header_names_list):
+        super(ParquetSink, self).open(header_names_list)
+        schema = self._pa.schema([(col_name, self._pa.string()) for col_name in self.header_names_list])
+        self._writer = self._pq.ParquetWriter(self.path, schema)
+
+    def write_page(self, page, rows):
+        columns = list(zip(*rows)) if rows else [()] * len(self.header_names_list)
+        table = self._pa.table({col_name: self._pa.array(col_vals, type=self._pa.string())
+                                for col_name, col_vals in zip(self.header_names_list, columns)})
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+
+class DataFrameSink(PageSink):
+    """ Collects the pages into a pandas DataFrame, see dataframe() """
+
+    def open(self, header_names_list):
+        super(DataFrameSink, self).open(header_names_list)
+        self._rows = []
+
+    def write_page(self, page, rows):
+        self._rows += rows
+
+    def dataframe(self):
+        """ Returns the collected rows as a DataFrame """
+
+        return pd.DataFrame(self._rows, columns=self.header_names_list)
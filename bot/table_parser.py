@@ -0,0 +1,184 @@
+"""
+table_parser
+
+Parses the markup of the sofascore player statistics table locally, so
+that a whole page of data can be pulled from the browser in a single
+WebDriver call instead of one call per cell.
+
+Functions:
+  parse_headers(thead_html) :
+        returns the column titles of the table, starting with 'Team' and 'Name'
+  parse_rows(tbody_html, header_names_list) :
+        returns the row values of the table as a list of lists, in header order
+  parse_table(thead_html, tbody_html) :
+        returns both the headers and the rows of the table
+"""
+from html.parser import HTMLParser
+
+
+TEAM_COL_IND = 2 # Team values are stored in the title of the 2nd table column
+STAT_COL_START = 4 # Stat values start in the 4th table column
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+             'link', 'meta', 'source', 'track', 'wbr'}
+
+
+class _TableMarkupParser(HTMLParser):
+    """
+    Collects the cells of each <tr> of a <thead> or <tbody> fragment.
+
+    Each cell is stored as a dict with its attributes, its raw inner markup
+    and the inner markup of its first <span> (used for the Rating column).
+    """
+
+    def __init__(self):
+        super(_TableMarkupParser, self).__init__(convert_charrefs=False)
+        self.rows = []
+        self._row = None
+        self._cell = None
+        self._depth = 0
+        self._span = None
+        self._span_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self._cell is not None:
+            self._cell['html'].append(self.get_starttag_text())
+            if self._span is not None:
+                self._span.append(self.get_starttag_text())
+                if tag not in VOID_TAGS:
+                    self._span_depth += 1
+            elif tag == 'span' and self._cell['span'] is None:
+                self._span = []
+                self._span_depth = 1
+            if tag not in VOID_TAGS:
+                self._depth += 1
+        elif tag == 'tr':
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = {'attrs': dict(attrs), 'html': [], 'span': None}
+            self._depth = 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self._cell is not None:
+            self._cell['html'].append(self.get_starttag_text())
+            if self._span is not None:
+                self._span.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self._cell is not None:
+            self._depth -= 1
+            if self._depth == 0:
+                self._row.append({
+                    'attrs': self._cell['attrs'],
+                    'html': ''.join(self._cell['html']),
+                    'span': self._cell['span']
+                })
+                self._cell = None
+                self._span = None
+                return
+            if self._span is not None:
+                self._span_depth -= 1
+                if self._span_depth == 0:
+                    self._cell['span'] = ''.join(self._span)
+                    self._span = None
+                else:
+                    self._span.append(f'</{tag}>')
+            self._cell['html'].append(f'</{tag}>')
+        elif tag == 'tr' and self._row is not None:
+            self.rows.append(self._row)
+            self._row = None
+
+    def _handle_text(self, text):
+        if self._cell is not None:
+            self._cell['html'].append(text)
+            if self._span is not None:
+                self._span.append(text)
+
+    def handle_data(self, data):
+        self._handle_text(data)
+
+    def handle_entityref(self, name):
+        self._handle_text(f'&{name};')
+
+    def handle_charref(self, name):
+        self._handle_text(f'&#{name};')
+
+
+def _parse_cells(markup):
+    parser = _TableMarkupParser()
+    parser.feed(markup)
+    parser.close()
+    return parser.rows
+
+
+def parse_headers(thead_html):
+    """
+    Pulls the column titles out of the table header markup.
+
+    Args:
+        thead_html (str) : innerHTML of the table's <thead> element
+    Returns:
+        list: column titles, starting with 'Team' and 'Name'
+    """
+
+    header_names_list = []
+    header_rows = _parse_cells(thead_html)
+    if header_rows:
+        for cell in header_rows[0][STAT_COL_START - 1:]:
+            header_name = cell['attrs'].get('title')
+            if header_name:
+                header_names_list.append(header_name)
+
+    return ['Team', 'Name'] + header_names_list
+
+
+def parse_rows(tbody_html, header_names_list):
+    """
+    Pulls the row values out of the table body markup.
+
+    Team and Name values are read from the cell 'title' attributes, Rating
+    values from the cell's <span>, and every other value is the cell's
+    innerHTML, matching what the per-cell WebDriver lookups returned. Rows
+    with fewer cells than the header has columns, such as a
+    '<td colspan="...">No results</td>' placeholder, are not player rows and
+    are skipped.
+
+    Args:
+        tbody_html (str) : innerHTML of the table's <tbody> element
+        header_names_list (list) : column titles as returned by parse_headers()
+    Returns:
+        list: one list of values per table row, in header order
+    """
+
+    rows = []
+    num_cells = len(header_names_list) + TEAM_COL_IND - 1
+    for cells in _parse_cells(tbody_html):
+        if len(cells) < num_cells:
+            continue
+        row = []
+        for col_ind, col_name in enumerate(header_names_list):
+            cell = cells[col_ind + TEAM_COL_IND - 1]
+            if col_ind < 2:
+                row.append(cell['attrs'].get('title'))
+            elif col_name == 'Rating':
+                row.append(cell['span'])
+            else:
+                row.append(cell['html'])
+        rows.append(row)
+
+    return rows
+
+
+def parse_table(thead_html, tbody_html):
+    """
+    Parses the headers and rows of one page of the table.
+
+    Args:
+        thead_html (str) : innerHTML of the table's <thead> element
+        tbody_html (str) : innerHTML of the table's <tbody> element
+    Returns:
+        tuple: (list of column titles, list of row value lists)
+    """
+
+    header_names_list = parse_headers(thead_html)
+    return header_names_list, parse_rows(tbody_html, header_names_list)
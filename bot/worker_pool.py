@@ -0,0 +1,188 @@
+"""
+worker_pool
+
+Runs many (league, season, filter) scrapes in parallel, each worker driving
+its own lean headless NavBot browser and pulling jobs from a shared queue.
+
+Classes:
+  ScrapeJob: a single (league, season, main_filter) scrape
+  WorkerPool: a pool of NavBot workers fed from a job queue
+
+Functions:
+  build_jobs(leagues, seasons, filters) :
+        returns the cross product of leagues, seasons and filters as ScrapeJobs
+  scrape_job(bot, job) :
+        runs one job on an open NavBot and returns its DataFrame
+"""
+import logging
+import queue
+import threading
+from collections import namedtuple
+import pandas as pd
+import bot.constants as c
+from bot.nav_bot import NavBot
+from bot.browser_profile import LEAN_PROFILE
+
+
+logger = logging.getLogger(__name__)
+
+ScrapeJob = namedtuple('ScrapeJob', ['league', 'season', 'main_filter'])
+
+
+def build_jobs(leagues=None, seasons=(c.CURRENT_SEASON,), filters=None):
+    """
+    Builds the job list for every combination of leagues, seasons and filters.
+
+    Args:
+        leagues (list of str) : leagues to scrape (default is None - every
+            league in c.LEAGUE_PAGE_URLS)
+        seasons (list of str) : seasons to scrape, format 'YY/YY'
+            (default is (c.CURRENT_SEASON,))
+        filters (list of str) : preset filters to scrape (default is None -
+            every filter in c.PRESET_FILTERS)
+    Returns:
+        list: ScrapeJob tuples
+    """
+
+    leagues = leagues or list(c.LEAGUE_PAGE_URLS)
+    filters = filters or c.PRESET_FILTERS
+    return [ScrapeJob(league, season, main_filter)
+            for league in leagues for season in seasons for main_filter in filters]
+
+
+def scrape_job(bot, job):
+    """
+    Runs a single preset-filter scrape on an already open NavBot.
+
+    Args:
+        bot (NavBot) : browser to run the scrape on
+        job (ScrapeJob) : league, season and filter to scrape
+    Returns:
+        pandas.DataFrame: the scraped table
+    """
+
+    return bot.scrape(job.league, job.season, job.main_filter)
+
+
+class WorkerPool:
+    """
+    A pool of NavBot workers, each with its own browser process, that
+    drains a queue of ScrapeJobs.
+
+    Attributes
+    ----------
+    workers : int
+        number of browsers running in parallel
+    retries : int
+        number of extra attempts for a job before it is marked as failed
+    bot_kwargs : dict
+        keyword arguments passed to every NavBot (default is profile=LEAN_PROFILE)
+    failed_jobs : list
+        (ScrapeJob, exception) tuples for jobs that ran out of attempts
+
+    Methods
+    -------
+    run (jobs) :
+        scrapes every job and returns the combined DataFrame, tagged with
+        the League, Season and Filter of each row
+        Args:
+            jobs (list of ScrapeJob) : jobs to scrape
+        Returns:
+            pandas.DataFrame: combined DataFrame of all successful jobs
+    """
+
+    def __init__(self, workers=4, retries=2, bot_factory=NavBot, **bot_kwargs):
+        """
+        workers (int) : number of browsers running in parallel (default is 4)
+        retries (int) : extra attempts per job (default is 2)
+        bot_factory (callable) : creates a NavBot for each worker (default is NavBot)
+        bot_kwargs : passed on to bot_factory (default is profile=LEAN_PROFILE)
+        """
+
+        self.workers = workers
+        self.retries = retries
+        self.bot_factory = bot_factory
+        self.bot_kwargs = {'profile': LEAN_PROFILE, **bot_kwargs}
+        self.failed_jobs = []
+        self._results = []
+        self._lock = threading.Lock()
+
+
+
+    def run(self, jobs):
+        """
+        Scrapes every job and returns the combined DataFrame, tagged with
+        the League, Season and Filter of each row.
+
+        Args:
+            jobs (list of ScrapeJob) : jobs to scrape
+        Returns:
+            pandas.DataFrame: combined DataFrame of all successful jobs
+        """
+
+        job_queue = queue.Queue()
+        for job_ind, job in enumerate(jobs):
+            job_queue.put((job_ind, ScrapeJob(*job), 0))
+        self.failed_jobs = []
+        self._results = []
+
+        threads = [threading.Thread(target=self._work, args=(job_queue,), daemon=True)
+                   for _ in range(min(self.workers, len(jobs)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        if not self._results:
+            return pd.DataFrame()
+        # Results are sorted back into job order so runs are reproducible
+        self._results.sort(key=lambda result: result[0])
+        return pd.concat([df for _, df in self._results], ignore_index=True)
+
+
+
+    def _work(self, job_queue):
+        """ Drains the job queue on one browser, restarting it after a failed job """
+
+        bot = None
+        try:
+            while True:
+                try:
+                    job_ind, job, attempt = job_queue.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    if bot is None:
+                        bot = self.bot_factory(**self.bot_kwargs)
+                    stats_df = scrape_job(bot, job)
+                except Exception as e:
+                    logger.warning("%s failed on attempt %d: %r", job, attempt + 1, e)
+                    if bot is not None:
+                        self._quit(bot)
+                        bot = None
+                    if attempt < self.retries:
+                        job_queue.put((job_ind, job, attempt + 1))
+                    else:
+                        with self._lock:
+                            self.failed_jobs.append((job, e))
+                    continue
+
+                stats_df.insert(0, 'Filter', job.main_filter)
+                stats_df.insert(0, 'Season', job.season)
+                stats_df.insert(0, 'League', job.league)
+                with self._lock:
+                    self._results.append((job_ind, stats_df))
+        finally:
+            if bot is not None:
+                self._quit(bot)
+
+
+
+    @staticmethod
+    def _quit(bot):
+        """ Quits a worker's browser, a driver that already died must not end the worker """
+
+        try:
+            bot.quit()
+        except Exception as e:
+            logger.warning("Quitting the browser failed: %r", e)
@@ -0,0 +1,344 @@
+"""
+aggregates
+
+Team and league stat tables derived from scraped player tables, instead of
+the hand-maintained team CSVs. Every player table is reduced to per-team
+sums of its components (goals, accurate passes, total passes, ...), stored
+per (league, season, filter) scrape. When a scrape changes, only its sums
+and the team table of its league and season are recomputed. Ratio columns
+such as acc_pass_perc are always derived from the summed components, never
+averaged over players or teams, and both components of a ratio are summed
+over the same players. Only scrapes of every player are aggregated: a
+Detailed table filtered by venue, age or position is not a team total.
+
+Classes:
+  TeamAggregates: incrementally maintained team tables of scraped player tables
+
+Functions:
+  component_sums(stats_df, components) :
+        returns the per-team sums of the components a player table supports
+  apply_ratios(totals_df, ratios) :
+        adds ratio columns computed from summed components
+  delta_teams(delta) :
+        returns the teams a data.delta.TableDelta touches
+
+Layout:
+  <root>/sums/<league>_<season>_<filter>.csv - component sums per team of one scrape, the
+      filter of a Detailed table is named after a hash of its filter signature
+  <root>/teams/<league>_<season>.csv - team table of one league and season
+  <root>/refreshes.json - the data.delta.DeltaStore refresh each sums file was last brought up to
+"""
+import json
+import os
+from urllib.parse import quote, unquote
+import numpy as np
+import pandas as pd
+from bot.page_cache import table_filter, filter_file_name
+from data.convert import convert_stats
+from data.analytics import combine
+
+
+def _total_passes(typed_df):
+    """ A player's total passes, from accurate passes and the accurate pass percentage """
+
+    passes = typed_df['Accurate passes'].astype('float64') / (typed_df['Accurate passes %'].astype('float64') / 100)
+    return passes.replace([np.inf, -np.inf], np.nan).round()
+
+
+# Team column to the player column summed for it, or a function of the typed
+# player table for components that are not scraped directly
+TEAM_COMPONENTS = {
+    'total_goals': 'Goals',
+    'total_acc_passes': 'Accurate passes',
+    'total_passes': (_total_passes, ['Accurate passes', 'Accurate passes %'])
+}
+
+# Ratio column to its (numerator, denominator) components
+TEAM_RATIOS = {
+    'acc_pass_perc': ('total_acc_passes', 'total_passes')
+}
+
+# Filter tables a component is taken from first, so a stat shown by several
+# tables (e.g. Goals in Summary and Attack) is only counted once
+FILTER_PRIORITY = ['Summary', 'Attack', 'Defence', 'Passing', 'Goalkeeper', 'Detailed']
+
+
+def _selects_every_player(detailed_filters):
+    """ Whether a Detailed table's venue, age and position filters leave every player in """
+
+    return (detailed_filters.get('home_away') == 'Overall' and detailed_filters.get('age_filter_type') == 'All'
+            and set(detailed_filters.get('player_position', [])) == {'G', 'D', 'M', 'F'})
+
+
+def component_sums(stats_df, components=TEAM_COMPONENTS, ratios=TEAM_RATIOS):
+    """
+    Sums the components a player table supports for every team. The two
+    components of a ratio are only summed over the players who have both,
+    e.g. a player whose 'Accurate passes %' is '-' counts towards neither
+    total_acc_passes nor total_passes.
+
+    Args:
+        stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+        components (dict) : team column to player column, or to a (function,
+            required player columns) pair (default is TEAM_COMPONENTS)
+        ratios (dict) : ratio column to (numerator, denominator) components
+            (default is TEAM_RATIOS)
+    Returns:
+        pandas.DataFrame: one row per team with a team and a players column,
+        and one column per supported component
+    """
+
+    typed_df, _ = convert_stats(stats_df.drop_duplicates(['Team', 'Name']))
+    player_values = {}
+    for team_col, source in components.items():
+        if isinstance(source, str):
+            if source in typed_df.columns:
+                player_values[team_col] = typed_df[source].astype('float64')
+        else:
+            derive, required = source
+            if all(col_name in typed_df.columns for col_name in required):
+                player_values[team_col] = derive(typed_df)
+
+    player_df = pd.DataFrame(player_values, index=typed_df.index)
+    for numerator, denominator in ratios.values():
+        if numerator in player_df.columns and denominator in player_df.columns:
+            missing = player_df[numerator].isna() | player_df[denominator].isna()
+            player_df.loc[missing, [numerator, denominator]] = np.nan
+    player_df['team'] = typed_df['Team'].astype(str)
+    player_df['players'] = 1
+    return player_df.groupby('team', sort=False).sum(min_count=1).reset_index()
+
+
+def apply_ratios(totals_df, ratios=TEAM_RATIOS, decimals=2):
+    """
+    Adds ratio columns computed from summed components.
+
+    Args:
+        totals_df (pandas.DataFrame) : summed components, e.g. from component_sums()
+        ratios (dict) : ratio column to (numerator, denominator) columns
+            (default is TEAM_RATIOS)
+        decimals (int) : rounding of the ratios (default is 2)
+    Returns:
+        pandas.DataFrame: totals_df with a column per ratio whose components it has
+    """
+
+    totals_df = totals_df.copy()
+    for ratio_col, (numerator, denominator) in ratios.items():
+        if numerator in totals_df.columns and denominator in totals_df.columns:
+            totals_df[ratio_col] = (totals_df[numerator] / totals_df[denominator].replace(0, np.nan)).round(decimals)
+    return totals_df
+
+
+def delta_teams(delta):
+    """ Returns the teams with inserted, updated or removed players in a data.delta.TableDelta """
+
+    return set(pd.concat([delta.inserted['Team'], delta.updated['Team'], delta.removed['Team']]).astype(str))
+
+
+class TeamAggregates:
+    """
+    Team tables derived from scraped player tables, kept up to date one
+    scrape at a time.
+
+    Attributes
+    ----------
+    root : str
+        directory the sums and team tables are stored in
+
+    Methods
+    -------
+    update (stats_df, league, season, main_filter, teams, detailed_filters, refresh) :
+        recomputes the sums of one scrape of every player, or only of the
+        teams changed in the next refresh, and the team table of its league
+        and season
+    scrapes () :
+        returns the (league, season, filter) keys of the aggregated scrapes
+    team_table (league, season) :
+        returns the team table of one league and season
+    team_tables (leagues) :
+        returns every team table in one frame keyed by League and Season,
+        like data.analytics.load_team_tables()
+    league_table () :
+        returns league totals and ratios per League and Season
+    """
+
+    def __init__(self, root='team_aggregates', components=TEAM_COMPONENTS, ratios=TEAM_RATIOS):
+        """
+        root (str) : directory of the sums and team tables (default is team_aggregates)
+        components (dict) : team columns and how they are summed (default is TEAM_COMPONENTS)
+        ratios (dict) : ratio columns and their components (default is TEAM_RATIOS)
+        """
+
+        self.root = root
+        self.components = components
+        self.ratios = ratios
+        self._sums = {}
+        self._team_tables = {}
+        sums_dir = os.path.join(root, 'sums')
+        if os.path.isdir(sums_dir):
+            for file_name in sorted(os.listdir(sums_dir)):
+                key = tuple(unquote(part) for part in file_name[:-len('.csv')].split('_'))
+                self._sums[key] = pd.read_csv(os.path.join(sums_dir, file_name))
+        # sums file name to the DeltaStore refresh its sums are up to date with
+        self._refreshes = {}
+        refreshes_path = os.path.join(root, 'refreshes.json')
+        if os.path.exists(refreshes_path):
+            with open(refreshes_path, encoding='utf-8') as f:
+                self._refreshes = json.load(f)
+
+
+
+    def _file_name(self, *key):
+        # '_' separates the parts, so it is escaped within them
+        return '_'.join(quote(str(part), safe='').replace('_', '%5F') for part in key) + '.csv'
+
+
+
+    def update(self, stats_df, league, season, main_filter, teams=None, detailed_filters=None, refresh=None):
+        """
+        Recomputes the team sums of one scrape, replacing the earlier scrape of
+        the same league, season and filter, and rewrites the team table of its
+        league and season. No other scrape is re-aggregated, and given the
+        teams that changed in a DeltaStore refresh (see delta_teams()), only
+        their sums are, as long as the stored sums are those of the refresh
+        before it. Otherwise, e.g. after a refresh that was not aggregated,
+        every team is recomputed. A Detailed table filtered by venue, age or
+        position holds only some of a team's players, so it is not aggregated.
+
+        Args:
+            stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+            league (str) : league the table was scraped for
+            season (str) : season the table was scraped for
+            main_filter (str) : filter the table was scraped with
+            teams (set of str) : teams whose players changed since the last
+                update (default is None - every team)
+            detailed_filters (dict) : keyword arguments of NavBot.set_detailed_filters()
+                the table was scraped with, instead of main_filter (default is None)
+            refresh (int) : number of the DeltaStore refresh the teams changed in
+                (default is None - unknown, every team is recomputed)
+        Returns:
+            pandas.DataFrame: the new team table of the league and season
+        """
+
+        if detailed_filters is not None and not _selects_every_player(detailed_filters):
+            return self.team_table(league, season)
+        # Detailed tables with different sub filters are kept apart
+        key = (league, season, filter_file_name(table_filter(main_filter, detailed_filters)))
+        file_name = self._file_name(*key)
+        # sums built from another refresh may miss changes of refreshes in between
+        up_to_date = (key in self._sums and refresh is not None
+                      and self._refreshes.get(file_name) == refresh - 1)
+        if teams is None or not up_to_date:
+            sums_df = component_sums(stats_df, self.components, self.ratios)
+        elif not teams:
+            self._save_refresh(file_name, refresh)
+            return self.team_table(league, season)
+        else:
+            team_rows = stats_df[stats_df['Team'].astype(str).isin(teams)]
+            kept_df = self._sums[key][~self._sums[key]['team'].isin(teams)]
+            sums_df = pd.concat([kept_df, component_sums(team_rows, self.components, self.ratios)], ignore_index=True)
+        os.makedirs(os.path.join(self.root, 'sums'), exist_ok=True)
+        sums_df.to_csv(os.path.join(self.root, 'sums', file_name), index=False)
+        self._sums[key] = sums_df
+        self._save_refresh(file_name, refresh)
+
+        self._team_tables.pop((league, season), None)
+        team_df = self.team_table(league, season)
+        os.makedirs(os.path.join(self.root, 'teams'), exist_ok=True)
+        team_df.to_csv(os.path.join(self.root, 'teams', self._file_name(league, season)), index=False)
+        return team_df
+
+
+
+    def _save_refresh(self, file_name, refresh):
+        """ Records the refresh a sums file is up to date with, None for a scrape outside DeltaStore """
+
+        if self._refreshes.get(file_name) == refresh:
+            return
+        if refresh is None:
+            del self._refreshes[file_name]
+        else:
+            self._refreshes[file_name] = refresh
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, 'refreshes.json'), 'w', encoding='utf-8') as f:
+            json.dump(self._refreshes, f)
+
+
+
+    def scrapes(self):
+        """ Returns the (league, season, filter) keys of the aggregated scrapes """
+
+        return list(self._sums)
+
+
+
+    def team_table(self, league, season):
+        """
+        Returns the team table of a league and season. Each component is taken
+        from the first scrape, in FILTER_PRIORITY order, that has it, and the
+        ratios are computed from the summed components.
+
+        Args:
+            league (str) : league of the table
+            season (str) : season of the table
+        Returns:
+            pandas.DataFrame: one row per team, a column per component and ratio
+        """
+
+        if (league, season) in self._team_tables:
+            return self._team_tables[(league, season)]
+
+        scrapes = sorted(((main_filter, sums_df) for (sums_league, sums_season, main_filter), sums_df
+                          in self._sums.items() if (sums_league, sums_season) == (league, season)),
+                         key=lambda item: FILTER_PRIORITY.index(item[0].split('-')[0])
+                         if item[0].split('-')[0] in FILTER_PRIORITY else len(FILTER_PRIORITY))
+        team_df = None
+        for _, sums_df in scrapes:
+            sums_df = sums_df.set_index('team')
+            if team_df is None:
+                team_df = sums_df
+                continue
+            new_cols = [col_name for col_name in sums_df.columns if col_name not in team_df.columns]
+            team_df = team_df.join(sums_df[new_cols], how='outer')
+        if team_df is None:
+            team_df = pd.DataFrame(columns=['players']).rename_axis('team')
+
+        team_cols = [team_col for team_col in self.components if team_col in team_df.columns]
+        team_df = apply_ratios(team_df[team_cols].reset_index(), self.ratios)
+        self._team_tables[(league, season)] = team_df
+        return team_df
+
+
+
+    def team_tables(self, leagues=None):
+        """
+        Returns the team table of every aggregated league and season in one
+        frame keyed by League and Season, the format of
+        data.analytics.load_team_tables().
+
+        Args:
+            leagues (list of str) : leagues to include, in order (default is None - every league)
+        Returns:
+            pandas.DataFrame: team rows keyed by League and Season
+        """
+
+        keys = list(dict.fromkeys((league, season) for league, season, _ in self._sums))
+        if leagues is not None:
+            keys = sorted((key for key in keys if key[0] in leagues), key=lambda key: leagues.index(key[0]))
+        return combine({key: self.team_table(*key) for key in keys})
+
+
+
+    def league_table(self):
+        """
+        Returns the league totals of every component per League and Season,
+        with the ratios recomputed from the league totals.
+
+        Returns:
+            pandas.DataFrame: one row per league and season
+        """
+
+        team_df = self.team_tables()
+        component_cols = [team_col for team_col in self.components if team_col in team_df.columns]
+        totals_df = team_df.groupby(['League', 'Season'], observed=True)[component_cols].sum(min_count=1)
+        return apply_ratios(totals_df.reset_index(), self.ratios)
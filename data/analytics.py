@@ -0,0 +1,186 @@
+"""
+analytics
+
+League-agnostic analysis of team stat tables. Any number of league/season
+tables are concatenated into one frame with League and Season keys, and
+every statistic is computed for all leagues in a single groupby pass.
+
+Functions:
+  load_team_tables(data_dir) :
+        reads the team stat CSVs next to this module into one frame
+  combine(frames) :
+        concatenates {league: DataFrame} or {(league, season): DataFrame} into one frame
+  per_game_rates(team_df, cols) :
+        league totals of cols divided by the league's matches per season
+  correlations(team_df, cols, method) :
+        pairwise correlations of cols within each league and season
+  rankings(team_df, cols) :
+        rank of each team within its league and season for each of cols
+  plot_league_grid(team_df, bar_cols, scatter_cols, path) :
+        renders per-league (and season) bar and scatter plots headless to an image file
+"""
+import os
+import matplotlib
+matplotlib.use('Agg') # renders to files, no display needed
+import matplotlib.pyplot as plt
+import pandas as pd
+
+
+# Matches per season for each league, from its number of teams (each pair plays twice)
+LEAGUE_METADATA = pd.DataFrame([
+    {'League': 'Premier League', 'teams': 20, 'matches_per_season': 380},
+    {'League': 'LaLiga', 'teams': 20, 'matches_per_season': 380},
+    {'League': 'Bundesliga', 'teams': 18, 'matches_per_season': 306},
+    {'League': 'Serie A', 'teams': 20, 'matches_per_season': 380},
+    {'League': 'UCL', 'teams': 32, 'matches_per_season': 125}
+]).set_index('League')
+
+TEAM_DATA_FILES = {
+    'Premier League': 'pl_data.csv',
+    'Bundesliga': 'bl_data.csv',
+    'LaLiga': 'laliga_data.csv',
+    'Serie A': 'seriea_data.csv'
+}
+
+KEY_COLS = ['League', 'Season']
+
+
+def combine(frames):
+    """
+    Concatenates league tables into one frame with League and Season keys.
+
+    Args:
+        frames (dict) : {league: DataFrame} or {(league, season): DataFrame}
+    Returns:
+        pandas.DataFrame: the rows of every table, keyed by League and Season
+    """
+
+    keyed_frames = []
+    for key, frame in frames.items():
+        league, season = key if isinstance(key, tuple) else (key, None)
+        keyed_frames.append(frame.assign(League=league, Season=season))
+    team_df = pd.concat(keyed_frames, ignore_index=True)
+    # categories keep the order the leagues were given in, for tables and plots
+    leagues = list(dict.fromkeys(key[0] if isinstance(key, tuple) else key for key in frames))
+    team_df['League'] = pd.Categorical(team_df['League'], categories=leagues)
+    return team_df
+
+
+def load_team_tables(data_dir=os.path.dirname(os.path.abspath(__file__)), files=TEAM_DATA_FILES):
+    """
+    Reads the team stat CSVs into one frame.
+
+    Args:
+        data_dir (str) : directory of the CSV files (default is this module's directory)
+        files (dict) : league to CSV file name mapping (default is TEAM_DATA_FILES)
+    Returns:
+        pandas.DataFrame: team rows of every league, keyed by League and Season
+    """
+
+    return combine({league: pd.read_csv(os.path.join(data_dir, file_name))
+                    for league, file_name in files.items()})
+
+
+def _group_keys(team_df):
+    """ Groups by League, and by Season too when the frame has seasons """
+
+    return KEY_COLS if team_df['Season'].notna().any() else ['League']
+
+
+def per_game_rates(team_df, cols, metadata=LEAGUE_METADATA, decimals=2):
+    """
+    Divides the league totals of cols by the league's matches per season.
+
+    Args:
+        team_df (pandas.DataFrame) : frame from combine() or load_team_tables()
+        cols (list of str) : columns to total, e.g. ['total_goals', 'total_passes']
+        metadata (pandas.DataFrame) : matches_per_season indexed by League
+            (default is LEAGUE_METADATA)
+        decimals (int) : rounding of the rates (default is 2)
+    Returns:
+        pandas.DataFrame: one row per league (and season), one rate per column
+    """
+
+    keys = _group_keys(team_df)
+    totals = team_df.groupby(keys, observed=True)[cols].sum()
+    matches = metadata['matches_per_season'].reindex(totals.index.get_level_values('League'))
+    return totals.div(matches.to_numpy(), axis=0).round(decimals)
+
+
+def correlations(team_df, cols, method='pearson'):
+    """
+    Computes the pairwise correlations of cols within each league and season.
+
+    Args:
+        team_df (pandas.DataFrame) : frame from combine() or load_team_tables()
+        cols (list of str) : columns to correlate
+        method (str) : 'pearson', 'spearman' or 'kendall' (default is 'pearson')
+    Returns:
+        pandas.DataFrame: correlation matrix of cols for each league (and season)
+    """
+
+    return team_df.groupby(_group_keys(team_df), observed=True)[cols].corr(method=method)
+
+
+def rankings(team_df, cols, ascending=False):
+    """
+    Ranks each team within its league and season for each of cols.
+
+    Args:
+        team_df (pandas.DataFrame) : frame from combine() or load_team_tables()
+        cols (list of str) : columns to rank on
+        ascending (bool) : rank 1 is the lowest value (default is False)
+    Returns:
+        pandas.DataFrame: rank columns aligned with team_df
+    """
+
+    ranks = team_df.groupby(_group_keys(team_df), observed=True)[cols].rank(ascending=ascending, method='min')
+    return ranks.add_suffix('_rank')
+
+
+def plot_league_grid(team_df, bar_cols, scatter_cols=None, path='league_grid.png',
+                     label_col='team', ylabels=None):
+    """
+    Renders one column of plots per league (and season, when the frame has
+    seasons): a bar chart of each of bar_cols, sorted by value, and
+    optionally a scatter of scatter_cols.
+
+    Args:
+        team_df (pandas.DataFrame) : frame from combine() or load_team_tables()
+        bar_cols (list of str) : columns to plot as bar charts, one row each
+        scatter_cols (tuple of str) : (x, y) columns for a scatter row (default is None)
+        path (str) : image file to save the figure to (default is league_grid.png)
+        label_col (str) : column of bar labels (default is 'team')
+        ylabels (dict) : axis label for each column (default is the column names)
+    Returns:
+        str: path of the saved figure
+    """
+
+    ylabels = ylabels or {}
+    groups = dict(tuple(team_df.groupby(_group_keys(team_df), observed=True)))
+    leagues = list(team_df['League'].cat.categories if hasattr(team_df['League'], 'cat')
+                   else team_df['League'].unique())
+    panels = sorted(groups, key=lambda key: (leagues.index(key[0]), str(key[1:])))
+    num_rows = len(bar_cols) + (1 if scatter_cols else 0)
+    fig, ax = plt.subplots(num_rows, len(panels), figsize=(4 * len(panels), 3 * num_rows), squeeze=False)
+
+    for row_ind, col in enumerate(bar_cols):
+        for col_ind, panel in enumerate(panels):
+            league_df = groups[panel].sort_values(col) # sorts one league's rows, not the full frame
+            ax[row_ind, col_ind].bar(league_df[label_col], league_df[col])
+            ax[row_ind, col_ind].axes.get_xaxis().set_visible(False)
+            if row_ind == 0:
+                ax[row_ind, col_ind].title.set_text(' '.join(str(part) for part in panel))
+        ax[row_ind, 0].set_ylabel(ylabels.get(col, col))
+
+    if scatter_cols:
+        x_col, y_col = scatter_cols
+        for col_ind, panel in enumerate(panels):
+            ax[-1, col_ind].scatter(groups[panel][x_col], groups[panel][y_col])
+            ax[-1, col_ind].set_xlabel(ylabels.get(x_col, x_col))
+            ax[-1, col_ind].set_ylabel(ylabels.get(y_col, y_col))
+
+    fig.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
@@ -0,0 +1,183 @@
+"""
+archive
+
+A columnar archive of scraped tables, stored as Arrow IPC files partitioned
+by league, season, filter and scrape date, with a small catalog so analysis
+code can load only the partitions and columns it needs. Files are memory
+mapped, so only the columns that are queried are ever read from disk. Every
+stat is written as float32 and every text column as a dictionary of strings,
+so the scrapes of a range always concatenate.
+
+Classes:
+  ScrapeArchive: writes scrapes to and loads them from the archive (requires pyarrow)
+
+Layout:
+  <root>/league=<league>/season=<season>/filter=<filter>/scrape_date=<YYYY-MM-DD>/<time>.arrow
+  <root>/catalog.jsonl - one line per archived file, with the Detailed filters a file was scraped with
+      Detailed tables are partitioned on filter=Detailed-<hash> of their bot.page_cache.filter_signature()
+"""
+import json
+import os
+import time
+from urllib.parse import quote
+from bot.page_cache import table_filter, filter_file_name
+from data.convert import convert_stats, stat_columns
+
+
+PARTITION_KEYS = ['league', 'season', 'filter', 'scrape_date']
+PARTITION_COLUMNS = {'league': 'League', 'season': 'Season', 'filter': 'Filter', 'scrape_date': 'Scrape date'}
+
+
+class ScrapeArchive:
+    """
+    A partitioned Arrow IPC archive of scraped tables.
+
+    Attributes
+    ----------
+    root : str
+        directory of the archive
+
+    Methods
+    -------
+    write (stats_df, league, season, main_filter, scrape_date, detailed_filters) :
+        converts a scraped table to typed columns and archives it
+        Returns:
+            str: path of the archived file
+
+    partitions (league, season, main_filter, scrape_date, detailed_filters) :
+        returns the catalog entries matching the given partition values
+        Returns:
+            list: dicts of partition values, detailed filters, path, rows and columns
+
+    load (columns, league, season, main_filter, scrape_date, as_dataframe, detailed_filters) :
+        loads the matching partitions, reading only the requested columns
+        Returns:
+            pandas.DataFrame or pyarrow.Table: the rows of the matching
+            partitions, tagged with their partition values
+    """
+
+    def __init__(self, root='archive'):
+        """ root (str) : directory of the archive (default is archive) """
+
+        try:
+            import pyarrow
+            import pyarrow.ipc
+        except ImportError:
+            raise ImportError("ScrapeArchive requires the pyarrow package") from None
+        self._pa = pyarrow
+        self.root = root
+        self.catalog_path = os.path.join(root, 'catalog.jsonl')
+        os.makedirs(root, exist_ok=True)
+
+
+
+    def write(self, stats_df, league, season, main_filter, scrape_date=None, detailed_filters=None):
+        """
+        Converts a scraped table to typed columns (see data.convert) and
+        archives it in its partition.
+
+        Args:
+            stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+            league (str) : league the table was scraped for
+            season (str) : season the table was scraped for, format 'YY/YY'
+            main_filter (str) : filter the table was scraped with
+            scrape_date (str) : date of the scrape, format 'YYYY-MM-DD' (default is today)
+            detailed_filters (dict) : keyword arguments of NavBot.set_detailed_filters()
+                the table was scraped with, kept apart from other Detailed tables (default is None)
+        Returns:
+            str: path of the archived file
+        """
+
+        partition = {
+            'league': league,
+            'season': season,
+            'filter': filter_file_name(table_filter(main_filter, detailed_filters)),
+            'scrape_date': scrape_date or time.strftime('%Y-%m-%d')
+        }
+        directory = os.path.join(self.root, *[f'{key}={quote(partition[key], safe="")}' for key in PARTITION_KEYS])
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f'{time.strftime("%H%M%S")}-{time.time_ns() % 10 ** 9:09d}.arrow')
+
+        # partition values are stored in the path, not repeated in every row
+        typed_df, _ = convert_stats(stats_df.drop(columns=list(PARTITION_COLUMNS.values()), errors='ignore'))
+        stat_cols = set(stat_columns(typed_df))
+        schema = self._pa.schema([(str(col_name), self._pa.float32() if col_name in stat_cols
+                                   else self._pa.dictionary(self._pa.int32(), self._pa.string()))
+                                  for col_name in typed_df.columns])
+        table = self._pa.Table.from_pandas(typed_df, schema=schema, preserve_index=False)
+        with self._pa.OSFile(path, 'wb') as sink:
+            with self._pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        entry = {**partition, 'detailed_filters': detailed_filters, 'path': os.path.relpath(path, self.root),
+                 'rows': table.num_rows, 'columns': table.column_names}
+        with open(self.catalog_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        return path
+
+
+
+    def partitions(self, league=None, season=None, main_filter=None, scrape_date=None, detailed_filters=None):
+        """
+        Returns the catalog entries matching the given partition values.
+
+        Args:
+            league, season, main_filter, scrape_date (str or list of str) :
+                partition values to match, None matches every value (default is None)
+            detailed_filters (dict) : Detailed filters to match instead of main_filter
+                (default is None)
+        Returns:
+            list: dicts of partition values, detailed filters, path, rows and columns
+        """
+
+        if detailed_filters is not None:
+            main_filter = filter_file_name(table_filter('Detailed', detailed_filters))
+        wanted = dict(zip(PARTITION_KEYS, [league, season, main_filter, scrape_date]))
+        wanted = {key: {value} if isinstance(value, str) else set(value)
+                  for key, value in wanted.items() if value is not None}
+        if not os.path.exists(self.catalog_path):
+            return []
+        with open(self.catalog_path, encoding='utf-8') as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return [entry for entry in entries
+                if all(entry[key] in values for key, values in wanted.items())]
+
+
+
+    def load(self, columns=None, league=None, season=None, main_filter=None, scrape_date=None,
+             as_dataframe=True, detailed_filters=None):
+        """
+        Loads the matching partitions, memory mapping each file and reading
+        only the requested columns.
+
+        Args:
+            columns (list of str) : stat columns to load, None for all (default is None)
+            league, season, main_filter, scrape_date (str or list of str) :
+                partition values to match, None matches every value (default is None)
+            as_dataframe (bool) : returns a DataFrame rather than a pyarrow Table
+                (default is True)
+            detailed_filters (dict) : Detailed filters to match instead of main_filter
+                (default is None)
+        Returns:
+            pandas.DataFrame or pyarrow.Table: the rows of the matching
+            partitions, tagged with their partition values
+        """
+
+        tables = []
+        for entry in self.partitions(league, season, main_filter, scrape_date, detailed_filters):
+            if columns is not None and not set(columns) & set(entry['columns']):
+                continue # the catalog shows the file has none of the requested columns
+            source = self._pa.memory_map(os.path.join(self.root, entry['path']), 'r')
+            table = self._pa.ipc.open_file(source).read_all() # zero-copy view of the mapped file
+            if columns is not None:
+                table = table.select([col_name for col_name in columns if col_name in table.column_names])
+            for key in PARTITION_KEYS:
+                table = table.append_column(PARTITION_COLUMNS[key],
+                                            self._pa.array([entry[key]] * table.num_rows, self._pa.string()))
+            tables.append(table)
+
+        if not tables:
+            return None
+        # permissive promotion fills the columns missing from a scrape with nulls
+        table = self._pa.concat_tables(tables, promote_options='permissive')
+        return table.to_pandas() if as_dataframe else table
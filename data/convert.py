@@ -0,0 +1,186 @@
+"""
+convert
+
+Converts the raw innerHTML strings of a scraped player statistics table into
+compact typed columns, driven by the column titles of the table.
+
+Functions:
+  column_kind(col_name) :
+        returns how a column is parsed ('category', 'rating', 'percentage' or 'numeric')
+  convert_stats(stats_df) :
+        returns a typed copy of a scraped DataFrame and the per-column parse failures
+  stat_columns(typed_df) :
+        returns the numeric stat columns of a converted DataFrame
+  benchmark_conversion(num_players, num_seasons) :
+        compares memory use and groupby speed of raw and typed synthetic data
+
+Run as a script to print the benchmark:
+    python -m data.convert
+"""
+import time
+import numpy as np
+import pandas as pd
+
+
+CATEGORY_COLUMNS = ['Team', 'Name', 'League', 'Season', 'Filter']
+
+# One dtype for every stat, whether or not a scrape has missing ('-') values,
+# so tables of different scrapes always concatenate and compare alike
+STAT_DTYPE = 'float32'
+
+
+def column_kind(col_name):
+    """
+    Returns how a column is parsed, based on its title.
+
+    Args:
+        col_name (str) : column title from the table header
+    Returns:
+        str: 'category', 'rating', 'percentage' or 'numeric'
+    """
+
+    if col_name in CATEGORY_COLUMNS:
+        return 'category'
+    if 'rating' in col_name.lower():
+        return 'rating'
+    if col_name.endswith('%') or 'percentage' in col_name.lower():
+        return 'percentage'
+    return 'numeric'
+
+
+def _parse_numeric(col_values):
+    """ Vectorized parse of a string column, returns (float64 values, failure mask) """
+
+    if pd.api.types.is_numeric_dtype(col_values):
+        values = col_values.astype('float64')
+        return values, pd.Series(False, index=col_values.index)
+
+    col_strings = col_values.astype('string').str.strip()
+    cleaned = (col_strings.str.replace(',', '', regex=False)
+                          .str.replace('%', '', regex=False)
+                          .str.strip())
+    values = pd.to_numeric(cleaned, errors='coerce').astype('float64')
+    missing = col_strings.isna() | col_strings.isin(['', '-'])
+    failures = values.isna() & ~missing
+    return values, failures.fillna(False).astype(bool)
+
+
+def convert_stats(stats_df):
+    """
+    Returns a typed copy of a scraped DataFrame. Team, Name and tagging columns
+    become categories, and numeric, percentage ("45%") and rating columns are
+    parsed with vectorized string operations into STAT_DTYPE columns.
+    Thousands separators are removed, and percentages are kept on a 0-100 scale.
+    A column none of whose values parse (e.g. a Position column) is text, and
+    becomes a category instead of counting as parse failures.
+
+    Args:
+        stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+    Returns:
+        tuple: (typed pandas.DataFrame, dict of column title to
+            {'count': number of values that failed to parse, 'examples': up to 5 of them})
+    """
+
+    typed_columns = {}
+    failures = {}
+    for col_name in stats_df.columns:
+        col_values = stats_df[col_name]
+        kind = column_kind(str(col_name))
+        if kind == 'category':
+            typed_columns[col_name] = col_values.astype('category')
+            continue
+
+        values, failed = _parse_numeric(col_values)
+        if failed.any() and values.isna().all():
+            # not a stat column, e.g. Position
+            typed_columns[col_name] = col_values.astype('category')
+            continue
+        if failed.any():
+            failures[col_name] = {
+                'count': int(failed.sum()),
+                'examples': col_values[failed].unique()[:5].tolist()
+            }
+        typed_columns[col_name] = values.astype(STAT_DTYPE)
+
+    return pd.DataFrame(typed_columns, index=stats_df.index), failures
+
+
+def stat_columns(typed_df):
+    """ Returns the numeric stat columns of a DataFrame from convert_stats(), in table order """
+
+    return [col_name for col_name in typed_df.columns if typed_df[col_name].dtype != 'category']
+
+
+def synthetic_stats(num_players=500, num_seasons=10, seed=0):
+    """
+    Builds a raw, all-string table like the scraper's output for several seasons.
+
+    Args:
+        num_players (int) : players per season (default is 500)
+        num_seasons (int) : number of seasons (default is 10)
+        seed (int) : random seed (default is 0)
+    Returns:
+        pandas.DataFrame: raw string table with Season, Team, Name and stat columns
+    """
+
+    rng = np.random.default_rng(seed)
+    num_rows = num_players * num_seasons
+    teams = np.array([f'Team {i}' for i in range(20)])
+    return pd.DataFrame({
+        'Season': np.repeat([f'{10 + i}/{11 + i}' for i in range(num_seasons)], num_players).astype(object),
+        'Team': teams[rng.integers(0, 20, num_rows)].astype(object),
+        'Name': np.array([f'Player {i}' for i in rng.integers(0, num_players * 2, num_rows)], dtype=object),
+        'Goals': rng.integers(0, 30, num_rows).astype(str).astype(object),
+        'Minutes played': np.array([f'{m:,}' for m in rng.integers(0, 3420, num_rows)], dtype=object),
+        'Accurate passes %': np.array([f'{p}%' for p in rng.integers(40, 95, num_rows)], dtype=object),
+        'Rating': np.char.mod('%.2f', rng.uniform(6, 8, num_rows)).astype(object)
+    })
+
+
+def benchmark_conversion(num_players=500, num_seasons=10, repeat=5):
+    """
+    Compares memory use and groupby speed of a raw synthetic table and its
+    typed conversion.
+
+    Args:
+        num_players (int) : players per season (default is 500)
+        num_seasons (int) : number of seasons (default is 10)
+        repeat (int) : timed groupby runs, the best is kept (default is 5)
+    Returns:
+        dict: memory in bytes, groupby seconds and conversion seconds
+    """
+
+    raw_df = synthetic_stats(num_players, num_seasons)
+    start = time.perf_counter()
+    typed_df, _ = convert_stats(raw_df)
+    convert_time = time.perf_counter() - start
+    stat_cols = ['Goals', 'Minutes played', 'Accurate passes %', 'Rating']
+
+    def best_groupby_time(stats_df, prepare):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            prepare(stats_df).groupby(['Season', 'Team'], observed=True)[stat_cols].mean()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    # the raw table has to be parsed before every aggregate
+    raw_groupby = best_groupby_time(raw_df, lambda stats_df: convert_stats(stats_df)[0])
+    typed_groupby = best_groupby_time(typed_df, lambda stats_df: stats_df)
+    return {
+        'rows': len(raw_df),
+        'raw_memory': int(raw_df.memory_usage(deep=True).sum()),
+        'typed_memory': int(typed_df.memory_usage(deep=True).sum()),
+        'convert_seconds': convert_time,
+        'raw_groupby_seconds': raw_groupby,
+        'typed_groupby_seconds': typed_groupby
+    }
+
+
+if __name__ == '__main__':
+    results = benchmark_conversion()
+    print(f"Rows: {results['rows']}")
+    print(f"Memory: {results['raw_memory'] / 1e6:.2f} MB raw, {results['typed_memory'] / 1e6:.2f} MB typed")
+    print(f"Conversion: {results['convert_seconds'] * 1000:.1f} ms")
+    print(f"Groupby: {results['raw_groupby_seconds'] * 1000:.1f} ms raw (parse + aggregate), "
+          f"{results['typed_groupby_seconds'] * 1000:.1f} ms typed")
@@ -0,0 +1,285 @@
+"""
+delta
+
+Incremental storage of repeated scrapes of the same table. A refresh is
+compared with the last stored snapshot through per-row content hashes keyed
+on (Team, Name), and only the inserted, updated and removed players are
+appended to a changelog. Any earlier snapshot can be rebuilt from its base
+and the deltas after it, so storage grows with what changed rather than with
+the table size times the refresh frequency.
+
+Classes:
+  TableDelta: the inserted, updated and removed rows between two snapshots
+  DeltaStore: stores refreshes of scraped tables as a base plus deltas
+
+Functions:
+  row_hashes(stats_df) :
+        returns a content hash of every row, indexed by (Team, Name)
+  diff_tables(old_df, new_df) :
+        returns the TableDelta turning old_df into new_df
+
+Layout:
+  <root>/<league>/<season>/<filter>/base-<refresh>.csv.gz - full snapshot a delta chain starts from
+  <root>/<league>/<season>/<filter>/changes.jsonl - one line per refresh
+  <root>/<league>/<season>/<filter>/latest.csv.gz - the latest snapshot, to diff the next refresh against
+  <root>/<league>/<season>/Detailed-<hash>/filter.json - the Detailed filters a table was scraped with,
+      its directory is named after a hash of their bot.page_cache.filter_signature()
+"""
+import json
+import os
+import time
+from collections import namedtuple
+from urllib.parse import quote
+import pandas as pd
+from bot.page_cache import table_filter, filter_file_name
+
+
+KEY_COLS = ['Team', 'Name']
+
+
+class TableDelta(namedtuple('TableDelta', ['inserted', 'updated', 'removed'])):
+    """
+    The rows that changed between two snapshots of a table.
+
+    Attributes
+    ----------
+    inserted : pandas.DataFrame
+        rows of players missing from the old snapshot
+    updated : pandas.DataFrame
+        new rows of players whose values changed
+    removed : pandas.DataFrame
+        Team and Name of players missing from the new snapshot
+    """
+
+    @property
+    def changed_rows(self):
+        return len(self.inserted) + len(self.updated) + len(self.removed)
+
+
+def _normalize(stats_df):
+    """ Returns the table as strings, one row per (Team, Name), so stored and scraped rows hash alike """
+
+    stats_df = stats_df.loc[:, ~stats_df.columns.astype(str).str.startswith('Unnamed')]
+    stats_df = stats_df.fillna('').astype(str)
+    return stats_df.drop_duplicates(KEY_COLS).reset_index(drop=True)
+
+
+def row_hashes(stats_df):
+    """
+    Returns a content hash of every row's values, indexed by (Team, Name).
+
+    Args:
+        stats_df (pandas.DataFrame) : table with Team and Name columns
+    Returns:
+        pandas.Series: uint64 hash per (Team, Name)
+    """
+
+    value_cols = [col_name for col_name in stats_df.columns if col_name not in KEY_COLS]
+    hashes = pd.util.hash_pandas_object(stats_df[value_cols], index=False)
+    hashes.index = pd.MultiIndex.from_frame(stats_df[KEY_COLS])
+    return hashes
+
+
+def diff_tables(old_df, new_df):
+    """
+    Compares two snapshots of a table with the same columns.
+
+    Args:
+        old_df (pandas.DataFrame) : the stored snapshot
+        new_df (pandas.DataFrame) : the new scrape
+    Returns:
+        TableDelta: inserted, updated and removed rows
+    """
+
+    old_df, new_df = _normalize(old_df), _normalize(new_df)
+    old_hashes, new_hashes = row_hashes(old_df), row_hashes(new_df)
+    in_old = new_hashes.index.isin(old_hashes.index)
+    in_new = old_hashes.index.isin(new_hashes.index)
+    # the rows of old_hashes matching each new row, for the players in both
+    unchanged = pd.Series(False, index=new_df.index)
+    unchanged[in_old] = (old_hashes.reindex(new_hashes.index[in_old]).to_numpy()
+                         == new_hashes[in_old].to_numpy())
+    return TableDelta(inserted=new_df[~in_old].reset_index(drop=True),
+                      updated=new_df[in_old & ~unchanged.to_numpy()].reset_index(drop=True),
+                      removed=old_df.loc[~in_new, KEY_COLS].reset_index(drop=True))
+
+
+def _apply(snapshot_df, entry):
+    """ Applies one changelog entry to a snapshot: drops removed rows, replaces updated ones, appends inserted """
+
+    columns = list(snapshot_df.columns)
+    removed = pd.MultiIndex.from_tuples([tuple(key) for key in entry['removed']], names=KEY_COLS)
+    updated = pd.DataFrame(entry['updated'], columns=columns, dtype=str)
+    keyed_df = snapshot_df.set_index(KEY_COLS, drop=False)
+    keyed_df = keyed_df[~keyed_df.index.isin(removed)]
+    if len(updated):
+        updated_keyed = updated.set_index(KEY_COLS, drop=False)
+        keyed_df.loc[updated_keyed.index, columns] = updated_keyed[columns]
+    inserted = pd.DataFrame(entry['inserted'], columns=columns, dtype=str)
+    return pd.concat([keyed_df.reset_index(drop=True), inserted], ignore_index=True)
+
+
+class DeltaStore:
+    """
+    Stores refreshes of scraped tables as a base snapshot plus deltas.
+
+    Attributes
+    ----------
+    root : str
+        directory of the store
+
+    Methods
+    -------
+    refresh (stats_df, league, season, main_filter, detailed_filters) :
+        diffs a new scrape against the latest snapshot and appends the changes
+        Returns:
+            TableDelta: the changes, every row inserted for the first refresh
+
+    snapshot (league, season, main_filter, refresh, detailed_filters) :
+        rebuilds the table as it was after a refresh
+        Returns:
+            pandas.DataFrame: the snapshot, None if nothing is stored
+
+    refreshes (league, season, main_filter, detailed_filters) :
+        returns the changelog entries without their rows
+        Returns:
+            list: dicts of refresh number, time, base file and change counts
+    """
+
+    def __init__(self, root='snapshots'):
+        """ root (str) : directory of the store (default is snapshots) """
+
+        self.root = root
+
+
+
+    def _table_dir(self, league, season, main_filter, detailed_filters=None):
+        filter_dir = filter_file_name(table_filter(main_filter, detailed_filters))
+        return os.path.join(self.root, *(quote(str(value), safe='') for value in (league, season, filter_dir)))
+
+
+
+    def _read_changes(self, table_dir):
+        changes_path = os.path.join(table_dir, 'changes.jsonl')
+        if not os.path.exists(changes_path):
+            return []
+        with open(changes_path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+
+    @staticmethod
+    def _read_csv(path):
+        return pd.read_csv(path, dtype=str, keep_default_na=False)
+
+
+
+    def refresh(self, stats_df, league, season, main_filter, detailed_filters=None):
+        """
+        Diffs a new scrape against the latest snapshot of its table and
+        appends the inserted, updated and removed rows to the changelog. The
+        first scrape of a table, or one with different columns, starts a new
+        base snapshot instead. Detailed tables are only diffed against
+        scrapes with the same detailed filters.
+
+        Args:
+            stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+            league (str) : league the table was scraped for
+            season (str) : season the table was scraped for
+            main_filter (str) : filter the table was scraped with
+            detailed_filters (dict) : keyword arguments of NavBot.set_detailed_filters()
+                the table was scraped with, instead of main_filter (default is None)
+        Returns:
+            TableDelta: the changes since the latest snapshot
+        """
+
+        table_dir = self._table_dir(league, season, main_filter, detailed_filters)
+        os.makedirs(table_dir, exist_ok=True)
+        if detailed_filters is not None:
+            with open(os.path.join(table_dir, 'filter.json'), 'w', encoding='utf-8') as f:
+                f.write(table_filter(main_filter, detailed_filters))
+        latest_path = os.path.join(table_dir, 'latest.csv.gz')
+        new_df = _normalize(stats_df)
+        refresh_num = len(self._read_changes(table_dir))
+        latest_df = self._read_csv(latest_path) if os.path.exists(latest_path) else None
+        entry = {'refresh': refresh_num, 'scraped_at': time.strftime('%Y-%m-%d %H:%M:%S')}
+
+        if latest_df is None or list(latest_df.columns) != list(new_df.columns):
+            base_name = f'base-{refresh_num}.csv.gz'
+            new_df.to_csv(os.path.join(table_dir, base_name), index=False)
+            delta = TableDelta(new_df, new_df.iloc[:0], new_df[KEY_COLS].iloc[:0])
+            entry.update(base=base_name, rows=len(new_df))
+            snapshot_df = new_df
+        else:
+            delta = diff_tables(latest_df, new_df)
+            entry.update(inserted=delta.inserted.values.tolist(), updated=delta.updated.values.tolist(),
+                         removed=delta.removed.values.tolist())
+            snapshot_df = _apply(latest_df, entry)
+
+        with open(os.path.join(table_dir, 'changes.jsonl'), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+        if 'base' in entry or delta.changed_rows:
+            snapshot_df.to_csv(latest_path, index=False)
+        return delta
+
+
+
+    def snapshot(self, league, season, main_filter, refresh=None, detailed_filters=None):
+        """
+        Rebuilds a table as it was after a refresh, from the last base
+        snapshot at or before it and the deltas that followed.
+
+        Args:
+            league (str) : league of the table
+            season (str) : season of the table
+            main_filter (str) : filter of the table
+            refresh (int) : refresh number, negative counts from the latest
+                (default is None - the latest)
+            detailed_filters (dict) : detailed filters of the table, instead of
+                main_filter (default is None)
+        Returns:
+            pandas.DataFrame: the snapshot, None if the table was never refreshed
+        Raises:
+            ValueError: if the table has no such refresh
+        """
+
+        table_dir = self._table_dir(league, season, main_filter, detailed_filters)
+        changes = self._read_changes(table_dir)
+        if not changes:
+            return None
+        refresh_num = len(changes) - 1 if refresh is None else refresh
+        if refresh_num < 0:
+            refresh_num += len(changes)
+        if not 0 <= refresh_num < len(changes):
+            raise ValueError(f"No refresh {refresh} of this table, it has refreshes 0 to {len(changes) - 1}")
+        changes = changes[:refresh_num + 1]
+        base_ind = max(ind for ind, entry in enumerate(changes) if 'base' in entry)
+        snapshot_df = self._read_csv(os.path.join(table_dir, changes[base_ind]['base']))
+        for entry in changes[base_ind + 1:]:
+            snapshot_df = _apply(snapshot_df, entry)
+        return snapshot_df
+
+
+
+    def refreshes(self, league, season, main_filter, detailed_filters=None):
+        """
+        Returns the changelog of a table without its rows.
+
+        Args:
+            league (str) : league of the table
+            season (str) : season of the table
+            main_filter (str) : filter of the table
+            detailed_filters (dict) : detailed filters of the table, instead of
+                main_filter (default is None)
+        Returns:
+            list: dicts of refresh number, scrape time, base file or change counts
+        """
+
+        summaries = []
+        for entry in self._read_changes(self._table_dir(league, season, main_filter, detailed_filters)):
+            summary = {key: entry[key] for key in ('refresh', 'scraped_at', 'base', 'rows') if key in entry}
+            for key in ('inserted', 'updated', 'removed'):
+                if key in entry:
+                    summary[key] = len(entry[key])
+            summaries.append(summary)
+        return summaries
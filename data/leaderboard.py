@@ -0,0 +1,499 @@
+"""
+leaderboard
+
+Persistent per-stat sorted indexes over scraped player tables, for fast
+top-N, value range and percentile rank queries across leagues and seasons.
+
+Each scraped table is a partition keyed by (league, season, filter), where
+the filter of a Detailed table is its bot.page_cache.filter_signature(). For
+every stat column, a partition holds numpy arrays of the values sorted
+ascending plus the team and name of each value, and a new scrape only
+rebuilds and rewrites its own partition. Tables carry no player position,
+so the position filter of each Detailed scrape is recorded with its
+partition and position queries match the partitions scraped for those
+positions.
+
+At query time every partition with a stat is merged once into one global
+array sorted by value, with integer partition and team codes for each row
+and the rows of every team in value order. A query then picks its
+partitions as a boolean array, and top-N scans down from the top of the
+global array, ranges and percentiles binary search it, and the result is
+built column by column. The merged arrays are rebuilt after the next add().
+
+Classes:
+  LeaderboardRow: one player's value of a stat in a query result
+  LeaderboardIndex: builds, persists and queries the sorted indexes
+
+Layout:
+  <root>/catalog.json - partition key to file name, filters and stats
+  <root>/<league>_<season>_<filter>.npz - sorted arrays of one partition, Detailed
+      partitions are named after a hash of their filter signature
+"""
+import json
+import os
+from collections import namedtuple
+from urllib.parse import quote
+import numpy as np
+import pandas as pd
+from bot.page_cache import table_filter, filter_file_name
+from data.convert import convert_stats, stat_columns
+
+
+KEY_COLS = ['Team', 'Name']
+POSITIONS = ['G', 'D', 'M', 'F']
+ALL_POSITIONS = 2 ** len(POSITIONS) - 1
+
+# Filter tables tried in this order when a query does not name one, so a
+# stat shown by several tables (e.g. Rating) is counted once per player
+FILTER_PRIORITY = ['Summary', 'Attack', 'Defence', 'Passing', 'Goalkeeper', 'Detailed']
+
+
+LeaderboardRow = namedtuple('LeaderboardRow', ['league', 'season', 'filter', 'team', 'name', 'position', 'value'])
+
+# Query-time arrays over the partitions, indexed by partition number
+PartitionTable = namedtuple('PartitionTable', ['keys', 'leagues', 'seasons', 'filters', 'main_filters',
+                                               'position_bits', 'position_labels', 'unfiltered',
+                                               'priorities', 'groups'])
+
+# Every partition's values of one stat merged and sorted, see LeaderboardIndex._stat_view()
+StatView = namedtuple('StatView', ['values', 'parts', 'teams', 'names', 'team_rows', 'part_keys', 'part_starts',
+                                   'part_sizes'])
+
+
+def _as_set(value):
+    """ None matches everything, a string one value, a list any of its values """
+
+    if value is None:
+        return None
+    return {value} if isinstance(value, str) else set(value)
+
+
+def _position_bits(positions):
+    """ Returns a bit per position in POSITIONS """
+
+    return sum(2 ** ind for ind, position in enumerate(POSITIONS) if position in positions)
+
+
+class LeaderboardIndex:
+    """
+    Per-stat sorted indexes of scraped player tables.
+
+    Attributes
+    ----------
+    root : str
+        directory the index is persisted to, None to keep it in memory
+
+    Methods
+    -------
+    add (stats_df, league, season, main_filter, detailed_filters) :
+        indexes a scraped table, replacing the stats it has in its partition
+    add_archive (archive) :
+        indexes the latest scrape of every partition of a ScrapeArchive
+    stats () :
+        returns the indexed stat names
+    top_n (stat, n, league, season, main_filter, team, position, ascending, as_dataframe) :
+        returns the n players with the highest (or lowest) values of a stat
+    value_range (stat, low, high, ...) :
+        returns the players whose value of a stat is within [low, high]
+    percentile_rank (stat, value, player, ...) :
+        returns the share of players with a value at or below a value
+    """
+
+    def __init__(self, root=None):
+        """ root (str) : directory to persist the index to and load it from (default is None) """
+
+        self.root = root
+        self._partitions = {} # (league, season, filter) -> {stat: (values, teams, names)}
+        self._meta = {} # (league, season, filter) -> main filter, positions and whether venue and age are unfiltered
+        self._files = {}
+        self._clear_views()
+        if root and os.path.exists(os.path.join(root, 'catalog.json')):
+            with open(os.path.join(root, 'catalog.json'), encoding='utf-8') as f:
+                catalog = json.load(f)
+            for entry in catalog:
+                key = (entry['league'], entry['season'], entry['filter'])
+                self._files[key] = entry['file']
+                self._meta[key] = {'main_filter': entry.get('main_filter', entry['filter']),
+                                   'positions': entry.get('positions', POSITIONS),
+                                   'unfiltered': entry.get('unfiltered', True)}
+                with np.load(os.path.join(root, entry['file'])) as arrays:
+                    self._partitions[key] = {
+                        stat: tuple(arrays[f'{ind}_{part}'] for part in ('values', 'teams', 'names'))
+                        for ind, stat in enumerate(entry['stats'])
+                    }
+
+
+
+    def _clear_views(self):
+        """ Drops the merged query-time arrays, rebuilt by the next query """
+
+        self._table = None
+        self._views = {}
+        self._selections = {}
+        self._team_codes = {}
+        self._team_names = None
+
+
+
+    def add(self, stats_df, league, season, main_filter, detailed_filters=None):
+        """
+        Indexes a scraped table. Stats already indexed for the same league,
+        season and filter are replaced, the partition's other stats are kept.
+
+        Args:
+            stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages(),
+                raw or converted with data.convert.convert_stats()
+            league (str) : league the table was scraped for
+            season (str) : season the table was scraped for
+            main_filter (str) : filter the table was scraped with
+            detailed_filters (dict) : keyword arguments of NavBot.set_detailed_filters()
+                the table was scraped with, which key the partition and give its
+                positions (default is None - a preset table of every player)
+        """
+
+        stats_df = stats_df.loc[:, ~stats_df.columns.astype(str).str.startswith('Unnamed')]
+        stats_df = stats_df.drop_duplicates(KEY_COLS).reset_index(drop=True)
+        typed_df, _ = convert_stats(stats_df)
+        teams = stats_df['Team'].astype(str).to_numpy(dtype=str)
+        names = stats_df['Name'].astype(str).to_numpy(dtype=str)
+
+        key = (league, season, table_filter(main_filter, detailed_filters))
+        detailed_filters = detailed_filters or {}
+        self._meta[key] = {
+            'main_filter': 'Detailed' if detailed_filters else main_filter,
+            'positions': [position for position in POSITIONS
+                          if position in detailed_filters.get('player_position', POSITIONS)],
+            'unfiltered': (detailed_filters.get('home_away', 'Overall') == 'Overall'
+                           and detailed_filters.get('age_filter_type', 'All') == 'All')
+        }
+        partition = self._partitions.setdefault(key, {})
+        for stat in stat_columns(typed_df):
+            values = typed_df[stat].to_numpy(dtype='float64')
+            present = ~np.isnan(values)
+            order = np.argsort(values[present], kind='stable')
+            partition[stat] = (np.round(values[present][order], 4), teams[present][order], names[present][order])
+        self._clear_views()
+        if self.root:
+            self._save_partition(key)
+
+
+
+    def _save_partition(self, key):
+        """ Writes one partition's arrays and the catalog """
+
+        os.makedirs(self.root, exist_ok=True)
+        if key not in self._files:
+            league, season, part_filter = key
+            self._files[key] = '_'.join(quote(str(part), safe='')
+                                        for part in (league, season, filter_file_name(part_filter))) + '.npz'
+        partition = self._partitions[key]
+        arrays = {}
+        for ind, stat in enumerate(partition):
+            for part, array in zip(('values', 'teams', 'names'), partition[stat]):
+                arrays[f'{ind}_{part}'] = array
+        np.savez(os.path.join(self.root, self._files[key]), **arrays)
+        catalog = [{'league': league, 'season': season, 'filter': part_filter, **self._meta[part_key],
+                    'file': self._files[part_key], 'stats': list(self._partitions[part_key])}
+                   for part_key in self._partitions for league, season, part_filter in [part_key]]
+        with open(os.path.join(self.root, 'catalog.json'), 'w', encoding='utf-8') as f:
+            json.dump(catalog, f)
+
+
+
+    def add_archive(self, archive):
+        """
+        Indexes the latest scrape of every league, season and filter of an
+        archive, keying Detailed scrapes on the filters they were archived with.
+
+        Args:
+            archive (data.archive.ScrapeArchive) : archive of scraped tables
+        """
+
+        latest = {}
+        for entry in archive.partitions():
+            # Detailed tables are archived apart per filters, under a filter name naming them
+            key = (entry['league'], entry['season'], entry['filter'])
+            if key not in latest or entry['scrape_date'] >= latest[key]['scrape_date']:
+                latest[key] = entry
+        for (league, season, stored_filter), entry in latest.items():
+            stats_df = archive.load(league=league, season=season, main_filter=stored_filter,
+                                    scrape_date=entry['scrape_date'])
+            stats_df = stats_df.drop(columns=['League', 'Season', 'Filter', 'Scrape date'])
+            detailed_filters = entry.get('detailed_filters')
+            main_filter = 'Detailed' if detailed_filters is not None else stored_filter
+            self.add(stats_df.drop_duplicates(KEY_COLS, keep='last'), league, season, main_filter, detailed_filters)
+
+
+
+    def stats(self):
+        """ Returns the names of every indexed stat """
+
+        return sorted({stat for partition in self._partitions.values() for stat in partition})
+
+
+
+    def _partition_table(self):
+        """ Returns the PartitionTable of the indexed partitions, built once per add() """
+
+        if self._table is None:
+            keys = list(self._partitions)
+            metas = [self._meta[key] for key in keys]
+            position_bits = np.array([_position_bits(meta['positions']) for meta in metas], dtype=np.int64)
+            leagues = np.array([key[0] for key in keys], dtype=object)
+            seasons = np.array([key[1] for key in keys], dtype=object)
+            # one table per league, season and position filter when no filter is named
+            groups = {}
+            self._table = PartitionTable(
+                keys=keys, leagues=leagues, seasons=seasons,
+                filters=np.array([key[2] for key in keys], dtype=object),
+                main_filters=np.array([meta['main_filter'] for meta in metas], dtype=object),
+                position_bits=position_bits,
+                position_labels=np.array([','.join(meta['positions']) for meta in metas], dtype=object),
+                unfiltered=np.array([meta['unfiltered'] for meta in metas], dtype=bool),
+                priorities=np.array([FILTER_PRIORITY.index(meta['main_filter']) if meta['main_filter'] in FILTER_PRIORITY
+                                     else len(FILTER_PRIORITY) for meta in metas], dtype=np.int64),
+                groups=np.array([groups.setdefault((key[0], key[1], bits), len(groups))
+                                 for key, bits in zip(keys, position_bits)], dtype=np.int64))
+        return self._table
+
+
+
+    def _stat_view(self, stat):
+        """
+        Returns the StatView of a stat: the values of every partition merged
+        and sorted ascending, with the partition number, team code and name of
+        each row, and the rows of each team code in value order. part_keys
+        holds partition * rows + row for every row, sorted, so the rows of a
+        partition before a row number are counted with one binary search.
+        """
+
+        if stat in self._views:
+            return self._views[stat]
+        table = self._partition_table()
+        part_values, part_teams, part_names, part_ids = [], [], [], []
+        for part, key in enumerate(table.keys):
+            if stat not in self._partitions[key]:
+                continue
+            values, teams, names = self._partitions[key][stat]
+            unique_teams, team_inds = np.unique(teams, return_inverse=True)
+            codes = np.array([self._team_codes.setdefault(str(team), len(self._team_codes)) for team in unique_teams],
+                             dtype=np.int64)
+            part_values.append(values)
+            part_teams.append(codes[team_inds])
+            part_names.append(names)
+            part_ids.append(np.full(len(values), part, dtype=np.int64))
+        if part_values:
+            values, teams = np.concatenate(part_values), np.concatenate(part_teams)
+            names, parts = np.concatenate(part_names), np.concatenate(part_ids)
+        else:
+            values, teams, parts = np.empty(0), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            names = np.empty(0, dtype=str)
+        order = np.argsort(values, kind='stable')
+        values, teams, names, parts = values[order], teams[order], names[order], parts[order]
+        self._team_names = np.array(list(self._team_codes), dtype=object)
+
+        # row numbers grouped by team, and by partition, each in value order
+        team_order = np.argsort(teams, kind='stable')
+        team_starts = np.searchsorted(teams[team_order], np.arange(len(self._team_codes) + 1))
+        team_rows = {code: team_order[team_starts[code]:team_starts[code + 1]] for code in range(len(self._team_codes))}
+        part_rows = np.argsort(parts, kind='stable')
+        part_keys = parts[part_rows] * len(values) + part_rows
+        part_sizes = np.bincount(parts, minlength=len(table.keys))
+        part_starts = np.concatenate([[0], np.cumsum(part_sizes)[:-1]]).astype(np.int64)
+        self._views[stat] = StatView(values, parts, teams, names, team_rows, part_keys, part_starts, part_sizes)
+        return self._views[stat]
+
+
+
+    def _selection(self, stat, league=None, season=None, main_filter=None, position=None):
+        """
+        Returns a boolean array of the partitions a query reads, or None for
+        every partition with the stat. Preset tables and Detailed tables over
+        every game and age are read unless a filter signature is named. With no
+        filter named, each league, season and position filter uses its first
+        table in FILTER_PRIORITY, and only tables of every position are read
+        unless a position is given. With a position, only Detailed tables
+        scraped for a subset of the positions are read.
+        """
+
+        query = (stat,) + tuple(None if value is None else tuple(sorted(_as_set(value)))
+                                for value in (league, season, main_filter, position))
+        if query in self._selections:
+            return self._selections[query]
+        table = self._partition_table()
+        view = self._stat_view(stat)
+        leagues, seasons, filters, positions = (_as_set(value) for value in (league, season, main_filter, position))
+
+        selected = view.part_sizes > 0
+        if leagues:
+            selected &= np.isin(table.leagues, list(leagues))
+        if seasons:
+            selected &= np.isin(table.seasons, list(seasons))
+        if filters:
+            selected &= np.isin(table.filters, list(filters)) | (np.isin(table.main_filters, list(filters))
+                                                                 & table.unfiltered)
+        else:
+            selected &= table.unfiltered
+        if positions:
+            wanted_bits = _position_bits(positions)
+            selected &= (table.position_bits > 0) & (table.position_bits & ~wanted_bits == 0)
+        elif not filters:
+            selected &= table.position_bits == ALL_POSITIONS
+        if not filters:
+            candidates = np.flatnonzero(selected)
+            order = np.lexsort((table.priorities[candidates], table.groups[candidates]))
+            candidates = candidates[order]
+            first = np.concatenate([[True], np.diff(table.groups[candidates]) != 0])
+            selected = np.zeros(len(table.keys), dtype=bool)
+            selected[candidates[first]] = True
+
+        # a query over every partition with the stat needs no row masks
+        selection = None if np.array_equal(selected, view.part_sizes > 0) else selected
+        self._selections[query] = selection
+        return selection
+
+
+
+    def _team_rows(self, view, team):
+        """ Returns the rows of the teams in value order, or None if no team is named """
+
+        teams = _as_set(team)
+        if not teams:
+            return None
+        rows = [view.team_rows[self._team_codes[name]] for name in teams
+                if self._team_codes.get(name) in view.team_rows]
+        if not rows:
+            return np.empty(0, dtype=np.int64)
+        return rows[0] if len(rows) == 1 else np.sort(np.concatenate(rows))
+
+
+
+    def _result(self, stat, view, rows, as_dataframe):
+        """ Builds the result rows column by column """
+
+        table = self._partition_table()
+        parts = view.parts[rows]
+        columns = [table.leagues[parts], table.seasons[parts], table.filters[parts],
+                   self._team_names[view.teams[rows]], view.names[rows].astype(object),
+                   table.position_labels[parts], view.values[rows]]
+        if not as_dataframe:
+            return list(map(LeaderboardRow._make, zip(*[column.tolist() for column in columns])))
+        return pd.DataFrame(dict(zip(['League', 'Season', 'Filter', 'Team', 'Name', 'Position', stat], columns)))
+
+
+
+    def top_n(self, stat, n=20, league=None, season=None, main_filter=None, team=None, position=None,
+              ascending=False, as_dataframe=True):
+        """
+        Returns the n players with the highest values of a stat.
+
+        Args:
+            stat (str) : stat column, e.g. 'Successful dribbles %'
+            n (int) : number of players (default is 20)
+            league, season, main_filter, team, position (str or list of str) :
+                values to match, None matches every value (default is None)
+            ascending (bool) : returns the lowest values instead (default is False)
+            as_dataframe (bool) : returns a DataFrame rather than a list of
+                LeaderboardRow (default is True)
+        Returns:
+            pandas.DataFrame: League, Season, Filter, Team, Name, Position and the stat
+        """
+
+        view = self._stat_view(stat)
+        selection = self._selection(stat, league, season, main_filter, position)
+        team_rows = self._team_rows(view, team)
+        if team_rows is not None:
+            if selection is not None:
+                team_rows = team_rows[selection[view.parts[team_rows]]]
+            rows = team_rows[:n] if ascending else team_rows[::-1][:n]
+        elif selection is None:
+            top = min(n, len(view.values))
+            rows = np.arange(top) if ascending else np.arange(len(view.values) - 1, len(view.values) - 1 - top, -1)
+        else:
+            # scans down from the top of the merged array, sized on the share of rows selected
+            selected_rows = int(view.part_sizes[selection].sum())
+            scan = min(len(view.values), 2 * n * len(view.values) // max(selected_rows, 1) + 64)
+            while True:
+                scanned = np.arange(scan) if ascending else np.arange(len(view.values) - 1, len(view.values) - 1 - scan, -1)
+                rows = scanned[selection[view.parts[scanned]]][:n]
+                if len(rows) == min(n, selected_rows) or scan == len(view.values):
+                    break
+                scan = min(len(view.values), scan * 4)
+        return self._result(stat, view, rows, as_dataframe)
+
+
+
+    def value_range(self, stat, low=None, high=None, league=None, season=None, main_filter=None,
+                    team=None, position=None, as_dataframe=True):
+        """
+        Returns the players whose value of a stat is within [low, high], highest first.
+
+        Args:
+            stat (str) : stat column
+            low (float) : lowest value, None for no lower bound (default is None)
+            high (float) : highest value, None for no upper bound (default is None)
+            league, season, main_filter, team, position (str or list of str) :
+                values to match, None matches every value (default is None)
+            as_dataframe (bool) : returns a DataFrame rather than a list of
+                LeaderboardRow (default is True)
+        Returns:
+            pandas.DataFrame: League, Season, Filter, Team, Name, Position and the stat
+        """
+
+        view = self._stat_view(stat)
+        selection = self._selection(stat, league, season, main_filter, position)
+        start = 0 if low is None else np.searchsorted(view.values, low, side='left')
+        end = len(view.values) if high is None else np.searchsorted(view.values, high, side='right')
+        team_rows = self._team_rows(view, team)
+        if team_rows is not None:
+            rows = team_rows[np.searchsorted(team_rows, start):np.searchsorted(team_rows, end)]
+        else:
+            rows = np.arange(start, end)
+        if selection is not None:
+            rows = rows[selection[view.parts[rows]]]
+        return self._result(stat, view, rows[::-1], as_dataframe)
+
+
+
+    def percentile_rank(self, stat, value=None, player=None, league=None, season=None, main_filter=None,
+                        team=None, position=None):
+        """
+        Returns the percentage of the matching players with a value of a stat
+        at or below a value, or at or below a player's own value.
+
+        Args:
+            stat (str) : stat column
+            value (float) : value to rank (default is None)
+            player (tuple) : (team, name) of a player among the matching ones,
+                ranked on their value instead (default is None)
+            league, season, main_filter, team, position (str or list of str) :
+                values to match, None matches every value (default is None)
+        Returns:
+            float: percentile rank from 0 to 100, None if no player matches
+        """
+
+        view = self._stat_view(stat)
+        selection = self._selection(stat, league, season, main_filter, position)
+        if player is not None:
+            player_rows = self._team_rows(view, player[0])
+            player_rows = player_rows[view.names[player_rows] == player[1]]
+            if selection is not None:
+                player_rows = player_rows[selection[view.parts[player_rows]]]
+            if not len(player_rows):
+                raise KeyError(f"{player} has no {stat} value in the matching tables")
+            value = float(view.values[player_rows[0]])
+
+        below = np.searchsorted(view.values, value, side='right') # rows at or below the value
+        team_rows = self._team_rows(view, team)
+        if team_rows is not None:
+            if selection is not None:
+                team_rows = team_rows[selection[view.parts[team_rows]]]
+            at_or_below, total = np.searchsorted(team_rows, below), len(team_rows)
+        elif selection is None:
+            at_or_below, total = below, len(view.values)
+        else:
+            # the rows of every selected partition before row number below, in one binary search
+            parts = np.flatnonzero(selection)
+            counts = np.searchsorted(view.part_keys, parts * len(view.values) + below) - view.part_starts[parts]
+            at_or_below, total = int(counts.sum()), int(view.part_sizes[parts].sum())
+        return 100 * int(at_or_below) / total if total else None
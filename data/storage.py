@@ -0,0 +1,320 @@
+"""
+storage
+
+Stores scraped tables in a normalized database schema: teams, players,
+league/season/filter snapshots and long-format stat values. Scrapes are
+streamed in bulk, and loading a table again replaces the rows of its
+(league, season, filter) snapshot rather than duplicating them. Detailed
+tables are keyed on their full filter signature (venue, age, positions and
+sub filters), so differently filtered Detailed scrapes never mix.
+
+Classes:
+  StatsStore: the common interface of the storage backends
+  PostgresStore: loads with COPY FROM STDIN into a staging table (requires psycopg2)
+  SQLiteStore: an embedded backend with the same interface, for use without a server
+
+Functions:
+  open_store(url) :
+        returns a PostgresStore for postgresql:// urls, otherwise an SQLiteStore
+"""
+import csv
+import io
+import sqlite3
+import time
+import pandas as pd
+from bot.page_cache import table_filter
+from data.convert import convert_stats, stat_columns
+
+
+POSTGRES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    team_id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS players (
+    player_id SERIAL PRIMARY KEY,
+    name TEXT NOT NULL,
+    team_id INTEGER NOT NULL REFERENCES teams,
+    UNIQUE (name, team_id)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id SERIAL PRIMARY KEY,
+    league TEXT NOT NULL,
+    season TEXT NOT NULL,
+    filter TEXT NOT NULL,
+    scraped_at DOUBLE PRECISION NOT NULL,
+    UNIQUE (league, season, filter)
+);
+CREATE TABLE IF NOT EXISTS stat_values (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots,
+    player_id INTEGER NOT NULL REFERENCES players,
+    stat TEXT NOT NULL,
+    value DOUBLE PRECISION,
+    PRIMARY KEY (snapshot_id, player_id, stat)
+);
+"""
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS teams (
+    team_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS players (
+    player_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    team_id INTEGER NOT NULL REFERENCES teams,
+    UNIQUE (name, team_id)
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    league TEXT NOT NULL,
+    season TEXT NOT NULL,
+    filter TEXT NOT NULL,
+    scraped_at REAL NOT NULL,
+    UNIQUE (league, season, filter)
+);
+CREATE TABLE IF NOT EXISTS stat_values (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots,
+    player_id INTEGER NOT NULL REFERENCES players,
+    stat TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (snapshot_id, player_id, stat)
+);
+"""
+
+# Statements shared by both backends once the scrape is in the staging table
+UPSERT_TEAMS = """
+INSERT INTO teams (name) SELECT DISTINCT team FROM staging WHERE true
+ON CONFLICT (name) DO NOTHING"""
+UPSERT_PLAYERS = """
+INSERT INTO players (name, team_id)
+SELECT DISTINCT s.name, t.team_id FROM staging s JOIN teams t ON t.name = s.team WHERE true
+ON CONFLICT (name, team_id) DO NOTHING"""
+READ_SNAPSHOT = """
+SELECT t.name AS team, p.name AS name, v.stat, v.value
+FROM stat_values v
+JOIN snapshots s ON s.snapshot_id = v.snapshot_id
+JOIN players p ON p.player_id = v.player_id
+JOIN teams t ON t.team_id = p.team_id
+WHERE s.league = {ph} AND s.season = {ph} AND s.filter = {ph}"""
+
+
+def long_rows(stats_df):
+    """
+    Yields the (team, name, stat, value) rows of a scraped table one at a time,
+    with the stat columns parsed to numbers (unparseable values become None).
+
+    Args:
+        stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+    """
+
+    typed_df, _ = convert_stats(stats_df)
+    stat_cols = stat_columns(typed_df)
+    # float32 values are rounded back to the precision shown on the webpage
+    stat_values = typed_df[stat_cols].astype('float64').round(4)
+    stat_values.insert(0, 'Name', typed_df['Name'].astype(object))
+    stat_values.insert(0, 'Team', typed_df['Team'].astype(object))
+    for team, name, *values in stat_values.itertuples(index=False, name=None):
+        for stat, value in zip(stat_cols, values):
+            yield team, name, stat, None if pd.isna(value) else float(value)
+
+
+class _CsvStream(io.RawIOBase):
+    """ A read-only file object producing CSV text from rows on demand, for COPY FROM STDIN """
+
+    def __init__(self, rows):
+        self._rows = iter(rows)
+        self._buffer = b''
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while size < 0 or len(self._buffer) < size:
+            text = io.StringIO()
+            writer = csv.writer(text)
+            for row in self._rows:
+                writer.writerow(['' if val is None else val for val in row])
+                if text.tell() > 65536:
+                    break
+            chunk = text.getvalue().encode('utf-8')
+            if not chunk:
+                break
+            self._buffer += chunk
+        if size < 0:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
+
+
+class StatsStore:
+    """
+    The common interface of the storage backends.
+
+    Methods
+    -------
+    load (stats_df, league, season, main_filter, detailed_filters) :
+        bulk loads a scraped table, replacing the rows of its snapshot
+        Args:
+            stats_df (pandas.DataFrame) : DataFrame from NavBot.scan_remaining_pages()
+            league (str) : league the table was scraped for
+            season (str) : season the table was scraped for, format 'YY/YY'
+            main_filter (str) : filter the table was scraped with
+            detailed_filters (dict) : arguments of NavBot.set_detailed_filters()
+                for a Detailed table (default is None)
+        Returns:
+            int: id of the snapshot
+
+    read_snapshot (league, season, main_filter, detailed_filters) :
+        returns a stored table in wide format
+        Returns:
+            pandas.DataFrame: Team, Name and one column per stat
+    """
+
+    placeholder = '?'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def load(self, stats_df, league, season, main_filter, detailed_filters=None):
+        raise NotImplementedError
+
+    def read_snapshot(self, league, season, main_filter, detailed_filters=None):
+        """
+        Returns a stored table in wide format.
+
+        Args:
+            league (str) : league the table was scraped for
+            season (str) : season the table was scraped for, format 'YY/YY'
+            main_filter (str) : filter the table was scraped with
+            detailed_filters (dict) : arguments of NavBot.set_detailed_filters()
+                for a Detailed table (default is None)
+        Returns:
+            pandas.DataFrame: Team, Name and one column per stat
+        """
+
+        cur = self.conn.cursor()
+        cur.execute(READ_SNAPSHOT.format(ph=self.placeholder),
+                    (league, season, str(table_filter(main_filter, detailed_filters))))
+        long_df = pd.DataFrame(cur.fetchall(), columns=['Team', 'Name', 'stat', 'value'])
+        cur.close()
+        wide_df = long_df.pivot(index=['Team', 'Name'], columns='stat', values='value')
+        wide_df.columns.name = None
+        return wide_df.reset_index()
+
+
+class PostgresStore(StatsStore):
+    """
+    A PostgreSQL backend. Each scrape is streamed into a temporary staging
+    table with COPY FROM STDIN, and upserted into the normalized tables with
+    set-based INSERT ... ON CONFLICT statements.
+    """
+
+    placeholder = '%s'
+
+    def __init__(self, dsn):
+        """ dsn (str) : libpq connection string or postgresql:// url """
+
+        try:
+            import psycopg2
+        except ImportError:
+            raise ImportError("PostgresStore requires the psycopg2 package") from None
+        self.conn = psycopg2.connect(dsn)
+        with self.conn.cursor() as cur:
+            cur.execute(POSTGRES_SCHEMA)
+        self.conn.commit()
+
+
+
+    def load(self, stats_df, league, season, main_filter, detailed_filters=None):
+        snapshot_filter = str(table_filter(main_filter, detailed_filters))
+        with self.conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE staging (team TEXT, name TEXT, stat TEXT, value DOUBLE PRECISION) ON COMMIT DROP")
+            cur.copy_expert("COPY staging FROM STDIN WITH (FORMAT csv)", _CsvStream(long_rows(stats_df)))
+            cur.execute(UPSERT_TEAMS)
+            cur.execute(UPSERT_PLAYERS)
+            cur.execute("""
+                INSERT INTO snapshots (league, season, filter, scraped_at) VALUES (%s, %s, %s, %s)
+                ON CONFLICT (league, season, filter) DO UPDATE SET scraped_at = EXCLUDED.scraped_at
+                RETURNING snapshot_id""", (league, season, snapshot_filter, time.time()))
+            snapshot_id = cur.fetchone()[0]
+            # the new scrape replaces the snapshot, players no longer in it are dropped
+            cur.execute("DELETE FROM stat_values WHERE snapshot_id = %s", (snapshot_id,))
+            cur.execute("""
+                INSERT INTO stat_values (snapshot_id, player_id, stat, value)
+                SELECT DISTINCT ON (p.player_id, s.stat) %s, p.player_id, s.stat, s.value
+                FROM staging s
+                JOIN teams t ON t.name = s.team
+                JOIN players p ON p.name = s.name AND p.team_id = t.team_id
+                ORDER BY p.player_id, s.stat""",
+                (snapshot_id,))
+        self.conn.commit()
+        return snapshot_id
+
+
+class SQLiteStore(StatsStore):
+    """
+    An embedded SQLite backend with the same schema and interface as
+    PostgresStore, streaming each scrape into a staging table with executemany.
+    """
+
+    def __init__(self, path='stats.sqlite'):
+        """ path (str) : location of the SQLite database file (default is stats.sqlite) """
+
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SQLITE_SCHEMA)
+        self.conn.commit()
+
+
+
+    def load(self, stats_df, league, season, main_filter, detailed_filters=None):
+        snapshot_filter = str(table_filter(main_filter, detailed_filters))
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS staging (team TEXT, name TEXT, stat TEXT, value REAL)")
+            self.conn.execute("DELETE FROM staging")
+            self.conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?)", long_rows(stats_df))
+            self.conn.execute(UPSERT_TEAMS)
+            self.conn.execute(UPSERT_PLAYERS)
+            self.conn.execute("""
+                INSERT INTO snapshots (league, season, filter, scraped_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT (league, season, filter) DO UPDATE SET scraped_at = excluded.scraped_at""",
+                (league, season, snapshot_filter, time.time()))
+            snapshot_id = self.conn.execute(
+                "SELECT snapshot_id FROM snapshots WHERE league = ? AND season = ? AND filter = ?",
+                (league, season, snapshot_filter)).fetchone()[0]
+            # the new scrape replaces the snapshot, players no longer in it are dropped
+            self.conn.execute("DELETE FROM stat_values WHERE snapshot_id = ?", (snapshot_id,))
+            self.conn.execute("""
+                INSERT INTO stat_values (snapshot_id, player_id, stat, value)
+                SELECT ?, p.player_id, s.stat, s.value
+                FROM staging s
+                JOIN teams t ON t.name = s.team
+                JOIN players p ON p.name = s.name AND p.team_id = t.team_id
+                WHERE true
+                ON CONFLICT (snapshot_id, player_id, stat) DO UPDATE SET value = excluded.value""",
+                (snapshot_id,))
+            self.conn.execute("DELETE FROM staging")
+        return snapshot_id
+
+
+def open_store(url='stats.sqlite'):
+    """
+    Opens the storage backend for a url.
+
+    Args:
+        url (str) : postgresql:// url or libpq connection string for PostgreSQL,
+            otherwise the path of an SQLite database file (default is stats.sqlite)
+    Returns:
+        StatsStore: PostgresStore or SQLiteStore
+    """
+
+    if url.startswith(('postgresql://', 'postgres://')) or 'dbname=' in url:
+        return PostgresStore(url)
+    return SQLiteStore(url)
@@ -1,61 +1,171 @@
-"""
-This script is intended to be run from a command line.
-
-First, the script collects input data from the user on desire filters,
-and then calls the relevant methods for pulling the data in __main__.
-"""
-from bot.nav_bot import NavBot
-import time
-
-# Console input for filters
-print("Please specify the desired parameters for the search:")
-league = input("Select a league.\nOptions: (Premier League, LaLiga, Bundesliga, Serie A, UCL)\n")
-season = input("For which season would you like to pull data?\nFormat: ('YY/YY')\n")
-print("Select a data filter.")
-print("Options: ('Detailed', 'Summary', 'Defence', 'Passing', 'Goalkeeper')" )
-main_filter = input()
-if main_filter == 'Detailed':
-    print("Select venue.")
-    home_away = input("Options: ('Overall', 'Home', 'Away')\n")
-    print("Select age filter type.")
-    age_filter_type = input("Options: ('All', 'More than', 'Equals', 'Less than')\n")
-    if age_filter_type != 'All':
-        player_age = int(input("Type in player age for age filter.\n"))
-    else:
-        player_age = None
-    print("Select player positions. Type in as a comma-seperated list.")
-    player_positions_input = input("Options: ('G','D','M','F')\n")
-    player_position = player_positions_input.split(",")
-    player_position = [position.strip() for position in player_position]
-    print("Select a filter category.")
-    filter_cat = input("Options: ('Attack', 'Defence', 'Passing', 'Goalkeeper', 'Other')\n")
-    print("Select up to 5 subfilters. Type in as a comma-seperated list.")
-    print("For options by filter category, see README.")
-    sub_filter_list_input = input()
-    sub_filter_list = sub_filter_list_input.split(",")
-    sub_filter_list = [sub_filter.strip() for sub_filter in sub_filter_list]
-
-
-
-def run():
-    with NavBot() as bot:
-        bot.open_page(league, season)
-        if main_filter == 'Detailed':
-            bot.set_detailed_filters(home_away=home_away, age_filter_type=age_filter_type,
-                                     player_age=player_age, player_position=player_position,
-                                     filter_cat=filter_cat, sub_filter_list=sub_filter_list)
-            stat_dict = bot.establish_schema()
-            stats_df = bot.scan_remaining_pages(stat_dict)
-        else:
-            stat_dict = bot.establish_schema(main_filter)
-            stats_df = bot.scan_remaining_pages(stat_dict)
-            
-        save_time = time.strftime("%m-%d_%H%M")
-        stats_df.to_csv(f"{league} - player_stats - {save_time}.csv")
-        time.sleep(5)
-
-
-
-
-if __name__ == '__main__':
+"""
+This script is intended to be run from a command line.
+
+First, the script collects input data from the user on desire filters,
+and then calls the relevant methods for pulling the data in __main__.
+
+Pass --api to pull preset filter tables from the JSON API instead of
+driving the browser, --db <url> to also load the results into a
+PostgreSQL (postgresql://...) or SQLite (file path) database, and
+--archive <dir> to also add them to a partitioned columnar archive, and
+--lean to run a headless browser that skips images, fonts, ads and trackers,
+--reuse to attach to a browser kept running between runs instead of launching
+one, --offline to only use a cached or local chromedriver, and --tabs <n>
+to scan the pages of a table in n browser tabs at once. --instrument prints
+where the browser time went at the end of the run and saves it as JSON and
+Prometheus text files. --refresh <dir> stores only the players that changed
+since the last refresh of the same table, instead of writing a full CSV, and
+--leaderboard <dir> adds the scrape to the cross-league leaderboard index.
+--teams <dir> updates the team tables aggregated from player scrapes, which
+data/analysis.py reads from team_aggregates.
+"""
+from bot.nav_bot import NavBot, scrape_from_cache
+from bot.api_client import ApiClient
+from bot.page_cache import PageCache
+from bot.sinks import CsvSink
+from data.storage import open_store
+from data.archive import ScrapeArchive
+from data.delta import DeltaStore
+from data.leaderboard import LeaderboardIndex
+from data.aggregates import TeamAggregates, delta_teams
+from bot.planner import plan_stats, run_plan, cached_plan
+from bot.browser_profile import LEAN_PROFILE
+import bot.constants as c
+import sys
+import time
+
+use_api = '--api' in sys.argv
+db_url = sys.argv[sys.argv.index('--db') + 1] if '--db' in sys.argv else None
+archive_dir = sys.argv[sys.argv.index('--archive') + 1] if '--archive' in sys.argv else None
+bot_profile = LEAN_PROFILE if '--lean' in sys.argv else None
+bot_startup = dict(reuse_session='--reuse' in sys.argv, offline='--offline' in sys.argv,
+                   tabs=int(sys.argv[sys.argv.index('--tabs') + 1]) if '--tabs' in sys.argv else 1,
+                   instrument='--instrument' in sys.argv)
+refresh_dir = sys.argv[sys.argv.index('--refresh') + 1] if '--refresh' in sys.argv else None
+leaderboard_dir = sys.argv[sys.argv.index('--leaderboard') + 1] if '--leaderboard' in sys.argv else None
+teams_dir = sys.argv[sys.argv.index('--teams') + 1] if '--teams' in sys.argv else None
+keep_dataframe = any(arg is not None for arg in (db_url, archive_dir, refresh_dir, leaderboard_dir, teams_dir))
+
+# Console input for filters
+print("Please specify the desired parameters for the search:")
+league = input("Select a league.\nOptions: (Premier League, LaLiga, Bundesliga, Serie A, UCL)\n")
+season = input("For which season would you like to pull data?\nFormat: ('YY/YY')\n")
+print("Select a data filter.")
+print("Options: ('Detailed', 'Summary', 'Defence', 'Passing', 'Goalkeeper')" )
+main_filter = input()
+detailed_filters = None
+if main_filter == 'Detailed':
+    print("Select venue.")
+    home_away = input("Options: ('Overall', 'Home', 'Away')\n")
+    print("Select age filter type.")
+    age_filter_type = input("Options: ('All', 'More than', 'Equals', 'Less than')\n")
+    if age_filter_type != 'All':
+        player_age = int(input("Type in player age for age filter.\n"))
+    else:
+        player_age = None
+    print("Select player positions. Type in as a comma-seperated list.")
+    player_positions_input = input("Options: ('G','D','M','F')\n")
+    player_position = player_positions_input.split(",")
+    player_position = [position.strip() for position in player_position]
+    print("Select a filter category.")
+    filter_cat = input("Options: ('Attack', 'Defence', 'Passing', 'Goalkeeper', 'Other')\n")
+    print("Select subfilters. Type in as a comma-seperated list.")
+    print("More than 5 are scraped as several tables and joined, ignoring the filter category.")
+    print("For options by filter category, see README.")
+    sub_filter_list_input = input()
+    sub_filter_list = sub_filter_list_input.split(",")
+    sub_filter_list = [sub_filter.strip() for sub_filter in sub_filter_list]
+    detailed_filters = dict(home_away=home_away, age_filter_type=age_filter_type, player_age=player_age,
+                            player_position=player_position, filter_cat=filter_cat, sub_filter_list=sub_filter_list)
+
+
+
+def run():
+    save_time = time.strftime("%m-%d_%H%M")
+    instrumentation = None
+    if use_api and main_filter != 'Detailed':
+        with ApiClient() as client:
+            stats_df = client.fetch_table(league, season, main_filter)
+        if not refresh_dir:
+            # written like a page by page scrape, without the DataFrame index
+            csv_sink = CsvSink(f"{league} - player_stats - {save_time}.csv")
+            csv_sink.write_table(stats_df.columns, stats_df.values.tolist())
+    elif main_filter == 'Detailed' and len(sub_filter_list) > c.DETAILED_FILTER_LIMIT:
+        # more sub filters than one table shows, split into passes joined on (Team, Name)
+        shared_filters = dict(home_away=home_away, age_filter_type=age_filter_type,
+                              player_age=player_age, player_position=player_position)
+        # preset tables are only used when the filters select every player
+        plan = plan_stats(sub_filter_list, shared_filters)
+        page_cache = PageCache()
+        if plan.unknown_stats:
+            print(f"Unknown subfilters skipped: {plan.unknown_stats}")
+        # a fully cached plan never starts the browser
+        stats_df = cached_plan(page_cache, plan, league, season, shared_filters)
+        if stats_df is not None:
+            print(f"All {len(plan.passes)} tables read from the page cache, no browser started")
+        else:
+            print(f"Scraping {len(plan.passes)} tables in one browser session "
+                  f"({plan.passes_saved} passes and {plan.launches_saved} browser launches saved)")
+            with NavBot(cache=page_cache, checkpoint_dir=".stats_checkpoints", profile=bot_profile,
+                        **bot_startup) as bot:
+                print(f"Browser ready in {bot.startup_seconds:.1f} s ({bot.startup_mode} start)")
+                instrumentation = bot.instrumentation
+                stats_df = run_plan(bot, plan, league, season, shared_filters)
+        if not refresh_dir:
+            # written like a page by page scrape, without the DataFrame index
+            csv_sink = CsvSink(f"{league} - player_stats - {save_time}.csv")
+            csv_sink.write_table(stats_df.columns, stats_df.values.tolist())
+    else:
+        # written page by page, unless only the changes are kept
+        sink = None if refresh_dir else CsvSink(f"{league} - player_stats - {save_time}.csv")
+        if detailed_filters is not None:
+            filter_args = dict(detailed_filters=detailed_filters)
+        else:
+            filter_args = dict(main_filter=main_filter)
+        # a fully cached table never starts the browser
+        page_cache = PageCache()
+        cached, stats_df = scrape_from_cache(page_cache, league, season, sink=sink,
+                                             as_dataframe=keep_dataframe, **filter_args)
+        if cached:
+            print("Table read from the page cache, no browser started")
+        else:
+            with NavBot(cache=page_cache, checkpoint_dir=".stats_checkpoints", profile=bot_profile,
+                        **bot_startup) as bot:
+                print(f"Browser ready in {bot.startup_seconds:.1f} s ({bot.startup_mode} start)")
+                instrumentation = bot.instrumentation
+                stats_df = bot.scrape(league, season, sink=sink, as_dataframe=keep_dataframe, **filter_args)
+                print(f"Page cache: {bot.cache.stats}")
+                if bot.profile.count_blocked:
+                    bot.update_blocked_requests()
+                    print(f"Blocked requests: {dict(bot.blocked_requests)}")
+
+    if db_url:
+        with open_store(db_url) as store:
+            store.load(stats_df, league, season, main_filter, detailed_filters)
+    if archive_dir:
+        ScrapeArchive(archive_dir).write(stats_df, league, season, main_filter,
+                                        detailed_filters=detailed_filters)
+    delta, refresh_num = None, None
+    if refresh_dir:
+        delta_store = DeltaStore(refresh_dir)
+        delta = delta_store.refresh(stats_df, league, season, main_filter, detailed_filters)
+        refresh_num = delta_store.refreshes(league, season, main_filter, detailed_filters)[-1]['refresh']
+        print(f"Refresh: {len(delta.inserted)} players inserted, {len(delta.updated)} updated, "
+              f"{len(delta.removed)} removed")
+    if leaderboard_dir:
+        LeaderboardIndex(leaderboard_dir).add(stats_df, league, season, main_filter, detailed_filters)
+    if teams_dir:
+        # only the teams with changed players are re-aggregated after a refresh
+        TeamAggregates(teams_dir).update(stats_df, league, season, main_filter,
+                                         teams=delta_teams(delta) if delta else None,
+                                         detailed_filters=detailed_filters, refresh=refresh_num)
+    if instrumentation:
+        print(instrumentation.summary())
+        instrumentation.write_json(f"{league} - instrumentation - {save_time}.json")
+        instrumentation.write_prometheus(f"{league} - instrumentation - {save_time}.prom")
+
+
+
+
+if __name__ == '__main__':
     run()
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""
+Tests of data.aggregates team tables.
+"""
+import pandas as pd
+import pytest
+from data.aggregates import TeamAggregates, component_sums, delta_teams
+from data.delta import DeltaStore
+
+
+EVERY_PLAYER = {'home_away': 'Overall', 'age_filter_type': 'All', 'player_age': None,
+                'player_position': ['G', 'D', 'M', 'F'], 'filter_cat': 'Attack', 'sub_filter_list': ['Goals']}
+FORWARDS = {**EVERY_PLAYER, 'player_position': ['F']}
+
+
+def passing_table():
+    return pd.DataFrame({'Team': ['A', 'A', 'A'], 'Name': ['a', 'b', 'c'],
+                         'Accurate passes': ['80', '300', '50'], 'Accurate passes %': ['80%', '-', '0%'],
+                         'Goals': ['1', '2', '3']})
+
+
+def test_pass_components_summed_over_the_same_players():
+    sums_df = component_sums(passing_table())
+    assert sums_df.loc[0, 'total_acc_passes'] == 80
+    assert sums_df.loc[0, 'total_passes'] == 100
+    assert sums_df.loc[0, 'total_goals'] == 6
+
+
+def test_ratio_within_bounds(tmp_path):
+    team_df = TeamAggregates(str(tmp_path)).update(passing_table(), 'Premier League', '21/22', 'Passing')
+    assert team_df.loc[0, 'acc_pass_perc'] == pytest.approx(0.8)
+
+
+def test_filtered_detailed_scrapes_are_not_team_totals(tmp_path):
+    aggregates = TeamAggregates(str(tmp_path))
+    every_player_df = pd.DataFrame({'Team': ['A', 'A'], 'Name': ['a', 'b'], 'Goals': ['1', '2']})
+    aggregates.update(every_player_df, 'Premier League', '21/22', 'Detailed', detailed_filters=EVERY_PLAYER)
+    team_df = aggregates.update(every_player_df.iloc[:1], 'Premier League', '21/22', 'Detailed',
+                                detailed_filters=FORWARDS)
+    assert team_df.loc[0, 'total_goals'] == 3
+    assert len(aggregates.scrapes()) == 1
+    # the Detailed scrape's sums are found again after a restart
+    assert TeamAggregates(str(tmp_path)).team_table('Premier League', '21/22').loc[0, 'total_goals'] == 3
+
+
+def test_teams_recomputed_after_a_refresh_that_was_not_aggregated(tmp_path):
+    store = DeltaStore(str(tmp_path / 'snapshots'))
+    scrapes = [pd.DataFrame({'Team': ['A', 'B'], 'Name': ['a', 'b'], 'Goals': goals})
+               for goals in (['1', '2'], ['5', '2'], ['5', '4'], ['6', '4'])]
+
+    def refresh(stats_df, aggregates, aggregated_df=None):
+        delta = store.refresh(stats_df, 'Premier League', '21/22', 'Summary')
+        refresh_num = store.refreshes('Premier League', '21/22', 'Summary')[-1]['refresh']
+        if aggregates is None:
+            return None
+        team_df = aggregates.update(stats_df if aggregated_df is None else aggregated_df,
+                                    'Premier League', '21/22', 'Summary', teams=delta_teams(delta), refresh=refresh_num)
+        return team_df.set_index('team')['total_goals'].to_dict()
+
+    assert refresh(scrapes[0], TeamAggregates(str(tmp_path / 'teams'))) == {'A': 1, 'B': 2}
+    # team A changed in a refresh run without the team tables
+    refresh(scrapes[1], None)
+    assert refresh(scrapes[2], TeamAggregates(str(tmp_path / 'teams'))) == {'A': 5, 'B': 4}
+    # the next refresh follows the aggregated one, so only the changed team A is summed again
+    assert refresh(scrapes[3], TeamAggregates(str(tmp_path / 'teams')),
+                   aggregated_df=scrapes[3].assign(Goals=['6', '100'])) == {'A': 6, 'B': 4}
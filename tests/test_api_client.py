@@ -0,0 +1,120 @@
+"""
+Tests of bot.api_client against statistics API responses replayed from
+saved JSON by a local server.
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pandas as pd
+import pytest
+import bot.constants as c
+from bot.api_client import ApiClient, display_value
+from bot.table_parser import parse_table
+from data.convert import convert_stats
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'api')
+TABLE_FIXTURE_DIR = os.path.dirname(FIXTURE_DIR)
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """ Answers seasons and statistics requests with the saved responses """
+
+    requests = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        ReplayHandler.requests.append((url.path, query))
+        if url.path.endswith('/seasons'):
+            file_name = 'seasons.json'
+        else:
+            page = int(query['offset'][0]) // int(query['limit'][0]) + 1
+            file_name = f"statistics_{query['group'][0]}_{page}.json"
+        with open(os.path.join(FIXTURE_DIR, file_name), 'rb') as f:
+            body = f.read()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def replay_client():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ReplayHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    ReplayHandler.requests = []
+    with ApiClient(base_url=f'http://127.0.0.1:{server.server_address[1]}/api/v1',
+                   requests_per_second=None) as client:
+        yield client
+    server.shutdown()
+    server.server_close()
+
+
+def test_columns_titled_like_the_table(replay_client):
+    stats_df = replay_client.fetch_table('Premier League', '21/22', 'Summary')
+    assert list(stats_df.columns) == ['Team', 'Name'] + [title for _, title in c.API_FILTER_FIELDS['Summary']]
+
+
+def test_request_uses_tournament_and_season_ids(replay_client):
+    replay_client.fetch_table('Premier League', '21/22', 'Summary')
+    statistics_paths = [path for path, _ in ReplayHandler.requests if path.endswith('/statistics')]
+    assert set(statistics_paths) == {'/api/v1/unique-tournament/17/season/37036/statistics'}
+    _, query = ReplayHandler.requests[-1]
+    assert query['fields'][0].split(',') == [field for field, _ in c.API_FILTER_FIELDS['Summary']]
+
+
+def test_every_page_in_order(replay_client):
+    stats_df = replay_client.fetch_table('Premier League', '21/22', 'Summary')
+    assert list(stats_df['Name']) == ['Erling Haaland', 'Pascal Groß', 'Martin Ødegaard']
+    assert list(stats_df['Team']) == ['Manchester City', 'Brighton & Hove Albion', 'Arsenal']
+
+
+def test_values_formatted_like_the_table(replay_client):
+    stats_df = replay_client.fetch_table('Premier League', '21/22', 'Summary')
+    assert stats_df.iloc[0]['Goals'] == '36'
+    assert stats_df.iloc[0]['Expected goals (xG)'] == '28.41'
+    assert stats_df.iloc[0]['Accurate passes %'] == '76%'
+    assert stats_df.iloc[0]['Rating'] == '7.69'
+    assert stats_df.iloc[1]['Expected goals (xG)'] == '-'
+    assert stats_df.iloc[1]['Accurate passes %'] == '81%'
+
+
+def test_converts_like_a_browser_scrape(replay_client):
+    typed_df, failures = convert_stats(replay_client.fetch_table('Premier League', '21/22', 'Summary'))
+    assert not any(failures.values())
+    assert typed_df['Accurate passes %'].tolist() == [76, 81, 86]
+    assert typed_df['Expected goals (xG)'].isna().tolist() == [False, True, False]
+
+
+def test_api_and_browser_rows_of_a_player_are_equal(replay_client):
+    table_html = []
+    for file_name in ('summary_thead.html', 'summary_tbody.html'):
+        with open(os.path.join(TABLE_FIXTURE_DIR, file_name), encoding='utf-8') as f:
+            table_html.append(f.read())
+    header_names_list, rows = parse_table(*table_html)
+    browser_df = pd.DataFrame(rows, columns=header_names_list)
+    api_df = replay_client.fetch_table('Premier League', '21/22', 'Summary')[header_names_list]
+
+    pd.testing.assert_frame_equal(api_df, browser_df)
+    pd.testing.assert_frame_equal(convert_stats(api_df)[0], convert_stats(browser_df)[0])
+
+
+def test_unknown_season(replay_client):
+    with pytest.raises(ValueError):
+        replay_client.fetch_table('Premier League', '10/11', 'Summary')
+
+
+def test_display_value():
+    assert display_value(None, 'Goals') == '-'
+    assert display_value(3, 'Goals') == '3'
+    assert display_value(12.0, 'Tackles') == '12'
+    assert display_value(0.456, 'Expected goals (xG)') == '0.46'
+    assert display_value(7, 'Rating') == '7.00'
+    assert display_value(64.5, 'Successful dribbles %') == '65%'
+    assert display_value(64.4367, 'Successful dribbles %') == '64%'
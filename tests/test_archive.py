@@ -0,0 +1,58 @@
+"""
+Tests of data.archive loading several scrapes at once.
+"""
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+from data.archive import ScrapeArchive
+
+
+HOME = {'home_away': 'Home', 'age_filter_type': 'All', 'player_age': None, 'player_position': ['F'],
+        'filter_cat': 'Attack', 'sub_filter_list': ['Goals']}
+AWAY = {**HOME, 'home_away': 'Away'}
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return ScrapeArchive(str(tmp_path / 'archive'))
+
+
+def test_scrapes_with_and_without_missing_values_load_together(archive):
+    archive.write(pd.DataFrame({'Team': ['A', 'B'], 'Name': ['a', 'b'], 'Goals': ['3', '-']}),
+                  'Premier League', '21/22', 'Summary', '2023-01-01')
+    archive.write(pd.DataFrame({'Team': ['A', 'B'], 'Name': ['a', 'b'], 'Goals': ['4', '1']}),
+                  'Premier League', '21/22', 'Summary', '2023-01-08')
+    archive.write(pd.DataFrame({'Team': ['C'], 'Name': ['c'], 'Goals': ['7'], 'Rating': ['7.05']}),
+                  'LaLiga', '21/22', 'Summary', '2023-01-08')
+
+    stats_df = archive.load()
+    assert len(stats_df) == 5
+    assert str(stats_df['Goals'].dtype) == 'float32'
+    assert stats_df['Goals'].isna().sum() == 1
+    assert stats_df['Rating'].notna().sum() == 1
+    assert sorted(stats_df['Scrape date'].unique()) == ['2023-01-01', '2023-01-08']
+
+
+def test_load_selected_columns_and_partitions(archive):
+    for scrape_date, goals in [('2023-01-01', '-'), ('2023-01-08', '2')]:
+        archive.write(pd.DataFrame({'Team': ['A'], 'Name': ['a'], 'Goals': [goals], 'Tackles': ['5']}),
+                      'Premier League', '21/22', 'Summary', scrape_date)
+
+    table = archive.load(['Goals'], league='Premier League', as_dataframe=False)
+    assert table.num_rows == 2
+    assert table.schema.field('Goals').type == pa.float32()
+    assert 'Tackles' not in table.column_names
+
+
+
+def test_detailed_tables_with_different_filters_archived_apart(archive):
+    for detailed_filters, goals in [(HOME, '1'), (AWAY, '2')]:
+        archive.write(pd.DataFrame({'Team': ['A'], 'Name': ['a'], 'Goals': [goals]}),
+                      'Premier League', '21/22', 'Detailed', '2023-01-01', detailed_filters)
+
+    entries = archive.partitions()
+    assert len({entry['filter'] for entry in entries}) == 2
+    assert [entry['detailed_filters'] for entry in entries] == [HOME, AWAY]
+    assert archive.load(detailed_filters=AWAY)['Goals'].tolist() == [2]
+    assert archive.load(main_filter=entries[0]['filter'])['Goals'].tolist() == [1]
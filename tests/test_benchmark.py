@@ -0,0 +1,27 @@
+"""
+Tests of bot.benchmark baselines, through the mock statistics API.
+"""
+import json
+from bot.benchmark import BASELINE_PATH, compare, counts, run_api_benchmarks, timings
+
+
+def test_api_counts_match_the_committed_baseline():
+    with open(BASELINE_PATH, encoding='utf-8') as f:
+        baseline = json.load(f)
+    api_results = run_api_benchmarks(latency=0)
+    for name, api_result in api_results.items():
+        assert {metric: api_result[metric] for metric in ('rows', 'pages', 'api_requests')} == baseline[name]
+
+
+def test_counts_gated_exactly_and_timings_with_tolerance():
+    results = {'summary': {'rows': 400, 'pages': 20, 'api_requests': 21,
+                           'phases': {'open_page': {'seconds': 1.0, 'commands': 12}}}}
+    assert compare(results, counts(results)) == []
+    assert compare(results, timings(results)) == []
+
+    slower = {'summary': {**results['summary'], 'api_requests': 22,
+                          'phases': {'open_page': {'seconds': 1.2, 'commands': 13}}}}
+    assert compare(slower, counts(results)) == ['summary: 22 API requests, baseline 21',
+                                                'summary.open_page: 13 commands, baseline 12']
+    assert compare(slower, timings(results)) == []
+    assert compare(slower, timings(results), tolerance=0.1) == ['summary.open_page: 1.200 s, baseline 1.000 s']
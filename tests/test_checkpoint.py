@@ -0,0 +1,61 @@
+"""
+Tests of bot.checkpoint recovery from an interrupted scrape.
+"""
+import os
+import pytest
+from bot.checkpoint import ScrapeCheckpoint
+
+
+URL = 'https://www.sofascore.com/tournament/football/england/premier-league/17'
+HEADERS = ['Team', 'Name', 'Goals']
+
+
+def rows(page):
+    return [['A', f'player {page}-{ind}', str(ind)] for ind in range(3)]
+
+
+@pytest.fixture
+def checkpoint(tmp_path):
+    checkpoint = ScrapeCheckpoint(str(tmp_path), URL, '21/22', 'Summary')
+    checkpoint.load(HEADERS)
+    for page in (1, 2, 3):
+        checkpoint.save_page(page, rows(page))
+    return checkpoint
+
+
+def resume(checkpoint, total_page_count):
+    """ Scrapes the pages a restarted scrape is missing, returning the pages scraped and every page's rows """
+
+    pages = checkpoint.load(HEADERS)
+    scraped = [page for page in range(1, total_page_count + 1) if page not in pages]
+    for page in scraped:
+        pages[page] = rows(page)
+        checkpoint.save_page(page, pages[page])
+    return scraped, pages
+
+
+def test_half_written_page_discarded(checkpoint):
+    with open(checkpoint.path, encoding='utf-8') as f:
+        content = f.read()
+    # the browser crashed while page 3 was being written
+    with open(checkpoint.path, 'w', encoding='utf-8') as f:
+        f.write(content[:content.rindex('player 3-1')])
+
+    pages = ScrapeCheckpoint(os.path.dirname(checkpoint.path), URL, '21/22', 'Summary').load(HEADERS)
+    assert pages == {1: rows(1), 2: rows(2)}
+
+
+def test_resumed_scrape_skips_checkpointed_pages(checkpoint):
+    with open(checkpoint.path, 'rb+') as f:
+        f.truncate(f.seek(0, 2) - 10)
+
+    scraped, pages = resume(checkpoint, 4)
+    assert scraped == [3, 4]
+    assert pages == {page: rows(page) for page in (1, 2, 3, 4)}
+    # the appended pages follow the complete lines, so a second restart scrapes nothing
+    assert resume(checkpoint, 4) == ([], pages)
+
+
+def test_checkpoint_of_other_columns_discarded(checkpoint):
+    assert checkpoint.load(HEADERS + ['Rating']) == {}
+    assert resume(checkpoint, 2)[0] == [1, 2]
@@ -0,0 +1,41 @@
+"""
+Tests of data.convert on raw scraped tables.
+"""
+import pandas as pd
+from data.convert import STAT_DTYPE, convert_stats, stat_columns
+
+
+def raw_table(goals):
+    return pd.DataFrame({'Team': ['A', 'B', 'C'], 'Name': ['a', 'b', 'c'], 'Position': ['F', 'M', 'D'],
+                         'Goals': goals, 'Accurate passes %': ['85%', '-', '90.5%'],
+                         'Minutes played': ['1,234', '90', '0'], 'Rating': ['7.10', '6.85', '-']})
+
+
+def test_one_dtype_per_stat_with_or_without_missing_values():
+    complete_df, _ = convert_stats(raw_table(['3', '0', '12']))
+    missing_df, _ = convert_stats(raw_table(['3', '-', '12']))
+    for col_name in ['Goals', 'Accurate passes %', 'Minutes played', 'Rating']:
+        assert complete_df[col_name].dtype == STAT_DTYPE
+        assert missing_df[col_name].dtype == complete_df[col_name].dtype
+
+
+def test_values_parsed():
+    typed_df, failures = convert_stats(raw_table(['3', '-', '12']))
+    assert failures == {}
+    assert typed_df['Minutes played'].tolist() == [1234, 90, 0]
+    assert typed_df['Goals'].isna().tolist() == [False, True, False]
+    assert typed_df['Accurate passes %'].iloc[2] == 90.5
+
+
+def test_text_column_becomes_category():
+    typed_df, failures = convert_stats(raw_table(['3', '0', '12']))
+    assert 'Position' not in failures
+    assert typed_df['Position'].dtype == 'category'
+    assert stat_columns(typed_df) == ['Goals', 'Accurate passes %', 'Minutes played', 'Rating']
+
+
+def test_partial_parse_failures_are_reported():
+    typed_df, failures = convert_stats(raw_table(['3', 'n/a', '12']))
+    assert failures['Goals']['count'] == 1
+    assert failures['Goals']['examples'] == ['n/a']
+    assert typed_df['Goals'].dtype == STAT_DTYPE
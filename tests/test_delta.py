@@ -0,0 +1,61 @@
+"""
+Tests of data.delta refreshes and snapshots.
+"""
+import pandas as pd
+import pytest
+from data.delta import DeltaStore
+
+
+HOME = {'home_away': 'Home', 'age_filter_type': 'All', 'player_age': None, 'player_position': ['F'],
+        'filter_cat': 'Attack', 'sub_filter_list': ['Goals']}
+AWAY = {**HOME, 'home_away': 'Away'}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DeltaStore(str(tmp_path / 'snapshots'))
+
+
+def test_refreshes_diffed_and_every_snapshot_rebuilt(store):
+    base_df = pd.DataFrame({'Team': ['A', 'A', 'B'], 'Name': ['a', 'b', 'c'], 'Goals': ['1', '2', '3']})
+    inserted_df = pd.concat([base_df, pd.DataFrame({'Team': ['B'], 'Name': ['d'], 'Goals': ['0']})],
+                            ignore_index=True)
+    updated_df = inserted_df.assign(Goals=['1', '5', '3', '0'])
+    removed_df = updated_df[updated_df['Name'] != 'c'].reset_index(drop=True)
+    scrapes = [base_df, inserted_df, updated_df, removed_df]
+
+    deltas = [store.refresh(stats_df, 'Premier League', '21/22', 'Summary') for stats_df in scrapes]
+    assert deltas[0].inserted.equals(base_df) and deltas[0].changed_rows == 3
+    assert deltas[1].inserted.values.tolist() == [['B', 'd', '0']] and deltas[1].changed_rows == 1
+    assert deltas[2].updated.values.tolist() == [['A', 'b', '5']] and deltas[2].changed_rows == 1
+    assert deltas[3].removed.values.tolist() == [['B', 'c']] and deltas[3].changed_rows == 1
+
+    for refresh, stats_df in enumerate(scrapes):
+        pd.testing.assert_frame_equal(store.snapshot('Premier League', '21/22', 'Summary', refresh=refresh),
+                                      stats_df)
+
+
+def test_detailed_tables_with_different_filters_are_diffed_apart(store):
+    home_df = pd.DataFrame({'Team': ['A', 'B'], 'Name': ['a', 'b'], 'Goals': ['1', '2']})
+    away_df = pd.DataFrame({'Team': ['C'], 'Name': ['c'], 'Goals': ['3']})
+    for _ in range(2):
+        store.refresh(home_df, 'Premier League', '21/22', 'Detailed', HOME)
+        delta = store.refresh(away_df, 'Premier League', '21/22', 'Detailed', AWAY)
+
+    # the second refresh of each table only finds the players unchanged
+    assert delta.changed_rows == 0
+    assert [entry.get('base') for entry in store.refreshes('Premier League', '21/22', 'Detailed', HOME)] \
+        == ['base-0.csv.gz', None]
+    home_snapshot = store.snapshot('Premier League', '21/22', 'Detailed', detailed_filters=HOME)
+    assert home_snapshot['Name'].tolist() == ['a', 'b']
+
+
+def test_snapshot_of_a_refresh_out_of_range(store):
+    stats_df = pd.DataFrame({'Team': ['A'], 'Name': ['a'], 'Goals': ['1']})
+    store.refresh(stats_df, 'Premier League', '21/22', 'Summary')
+    store.refresh(stats_df.assign(Goals='2'), 'Premier League', '21/22', 'Summary')
+
+    assert store.snapshot('Premier League', '21/22', 'Summary', refresh=-2)['Goals'].tolist() == ['1']
+    for refresh in (-3, 2):
+        with pytest.raises(ValueError):
+            store.snapshot('Premier League', '21/22', 'Summary', refresh=refresh)
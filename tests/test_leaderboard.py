@@ -0,0 +1,119 @@
+"""
+Tests of data.leaderboard queries against a brute force over the scraped tables.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from bot.page_cache import table_filter
+from data.leaderboard import LeaderboardIndex
+
+
+FORWARDS = {'home_away': 'Overall', 'age_filter_type': 'All', 'player_age': None, 'player_position': ['F'],
+            'filter_cat': 'Attack', 'sub_filter_list': ['Goals']}
+HOME_FORWARDS = {**FORWARDS, 'home_away': 'Home'}
+
+
+def summary_table(seed, teams=('A', 'B', 'C'), players=30):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Team': [teams[ind % len(teams)] for ind in range(players)],
+                         'Name': [f'p{seed}-{ind}' for ind in range(players)],
+                         'Goals': [str(goals) for goals in rng.integers(0, 30, players)],
+                         'Rating': [f'{rating:.2f}' for rating in rng.uniform(6, 8, players)]})
+
+
+@pytest.fixture
+def tables():
+    return {(league, season): summary_table(seed, teams=(f'{league}-1', f'{league}-2', 'Shared'))
+            for seed, (league, season) in enumerate([(league, season) for league in ('L1', 'L2')
+                                                     for season in ('20/21', '21/22', '22/23')])}
+
+
+@pytest.fixture
+def index(tables):
+    index = LeaderboardIndex()
+    for (league, season), stats_df in tables.items():
+        index.add(stats_df, league, season, 'Summary')
+    return index
+
+
+def brute_force(tables, league=None, team=None):
+    rows = pd.concat([stats_df.assign(League=key[0]) for key, stats_df in tables.items()])
+    if league:
+        rows = rows[rows['League'] == league]
+    if team:
+        rows = rows[rows['Team'] == team]
+    return rows.assign(Goals=rows['Goals'].astype(float))
+
+
+def test_top_n_matches_brute_force(index, tables):
+    for league, team in [(None, None), ('L1', None), (None, 'Shared'), ('L2', 'L2-1')]:
+        expected = brute_force(tables, league, team)['Goals'].sort_values(ascending=False).head(10).tolist()
+        assert index.top_n('Goals', 10, league=league, team=team)['Goals'].tolist() == expected
+        lowest = index.top_n('Goals', 5, league=league, team=team, ascending=True, as_dataframe=False)
+        assert [row.value for row in lowest] == sorted(brute_force(tables, league, team)['Goals'])[:5]
+
+
+def test_value_range_and_percentile_match_brute_force(index, tables):
+    for league, team in [(None, None), ('L1', None), (None, 'Shared')]:
+        goals = brute_force(tables, league, team)['Goals']
+        in_range = index.value_range('Goals', 10, 20, league=league, team=team)
+        assert in_range['Goals'].tolist() == sorted(goals[(goals >= 10) & (goals <= 20)], reverse=True)
+        assert index.percentile_rank('Goals', 15, league=league, team=team) == \
+            pytest.approx(100 * (goals <= 15).mean())
+
+
+def test_percentile_of_a_player(index, tables):
+    stats_df = tables[('L1', '21/22')]
+    player = tuple(stats_df.loc[0, ['Team', 'Name']])
+    goals = brute_force(tables, 'L1')['Goals']
+    expected = 100 * (goals <= float(stats_df.loc[0, 'Goals'])).mean()
+    assert index.percentile_rank('Goals', player=player, league='L1') == pytest.approx(expected)
+    with pytest.raises(KeyError):
+        index.percentile_rank('Goals', player=('A', 'nobody'))
+
+
+def test_positions_come_from_the_detailed_filters(index):
+    forwards_df = summary_table(99, players=10)[['Team', 'Name', 'Goals']]
+    index.add(forwards_df, 'L1', '22/23', 'Detailed', FORWARDS)
+    index.add(forwards_df.assign(Goals='99'), 'L1', '22/23', 'Detailed', HOME_FORWARDS)
+
+    forwards = index.top_n('Goals', 100, position='F')
+    assert len(forwards) == 10
+    assert set(forwards['Position']) == {'F'}
+    # presets show every position and are not position filtered
+    assert len(index.top_n('Goals', 1000, position=['D', 'F'])) == 10
+    # tables of every player leave the forwards-only table out
+    assert len(index.top_n('Goals', 1000)) == 180
+    # a venue filtered table is only read when named
+    assert index.top_n('Goals', 1, position='F')['Goals'].tolist()[0] < 99
+    home_forwards = index.top_n('Goals', 100, main_filter=table_filter('Detailed', HOME_FORWARDS))
+    assert home_forwards['Goals'].tolist() == [99] * 10
+
+
+def test_archived_detailed_scrapes_indexed_on_their_filters(tmp_path):
+    pytest.importorskip('pyarrow')
+    from data.archive import ScrapeArchive
+    archive = ScrapeArchive(str(tmp_path / 'archive'))
+    forwards_df = summary_table(99, players=10)[['Team', 'Name', 'Goals']]
+    archive.write(forwards_df, 'L1', '22/23', 'Detailed', '2023-01-01', FORWARDS)
+    archive.write(forwards_df.assign(Goals='99'), 'L1', '22/23', 'Detailed', '2023-01-08', HOME_FORWARDS)
+
+    index = LeaderboardIndex()
+    index.add_archive(archive)
+    forwards = index.top_n('Goals', 100, position='F')
+    assert len(forwards) == 10
+    assert forwards['Goals'].max() < 99
+    home_forwards = index.top_n('Goals', 100, main_filter=table_filter('Detailed', HOME_FORWARDS))
+    assert home_forwards['Goals'].tolist() == [99] * 10
+
+
+def test_index_persisted(tmp_path, tables):
+    index = LeaderboardIndex(str(tmp_path))
+    for (league, season), stats_df in tables.items():
+        index.add(stats_df, league, season, 'Summary')
+    index.add(summary_table(99, players=10), 'L1', '22/23', 'Detailed', FORWARDS)
+
+    reloaded = LeaderboardIndex(str(tmp_path))
+    assert reloaded.stats() == ['Goals', 'Rating']
+    pd.testing.assert_frame_equal(reloaded.top_n('Rating', 15), index.top_n('Rating', 15))
+    pd.testing.assert_frame_equal(reloaded.top_n('Goals', 5, position='F'), index.top_n('Goals', 5, position='F'))
@@ -0,0 +1,79 @@
+"""
+Tests of bot.page_cache expiry, eviction and hit counts.
+"""
+import pytest
+import bot.constants as c
+import bot.page_cache as page_cache
+from bot.page_cache import PageCache, filter_signature
+
+
+URL = 'https://www.sofascore.com/tournament/football/england/premier-league/17'
+SUMMARY = filter_signature('Summary')
+HEADERS = ['Team', 'Name', 'Goals']
+
+
+class Clock:
+    """ Replaces the time module of bot.page_cache with a clock moved by hand """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(page_cache, 'time', clock)
+    return clock
+
+
+def rows(page):
+    return [['A', f'player {page}-{ind}', str(ind)] for ind in range(5)]
+
+
+def test_current_season_expires_and_historical_seasons_do_not(tmp_path, clock):
+    cache = PageCache(str(tmp_path / 'pages.sqlite'), current_ttl=60, historical_ttl=None)
+    for season in (c.CURRENT_SEASON, '20/21'):
+        cache.put_page(URL, season, SUMMARY, 1, HEADERS, rows(1))
+
+    clock.now += 30
+    assert cache.get_page(URL, c.CURRENT_SEASON, SUMMARY, 1) == (HEADERS, rows(1))
+    clock.now += 60
+    assert cache.get_page(URL, c.CURRENT_SEASON, SUMMARY, 1) is None
+    assert cache.get_page(URL, '20/21', SUMMARY, 1) == (HEADERS, rows(1))
+    assert cache.stats == {'hits': 2, 'misses': 1, 'expired': 1, 'evictions': 0}
+
+
+def test_least_recently_used_pages_evicted(tmp_path, clock):
+    cache = PageCache(str(tmp_path / 'pages.sqlite'))
+    for page in (1, 2, 3):
+        clock.now += 1
+        cache.put_page(URL, '20/21', SUMMARY, page, HEADERS, rows(page))
+    clock.now += 1
+    cache.get_page(URL, '20/21', SUMMARY, 1)
+
+    # room for two pages, the page read last is kept
+    cache.max_bytes = 2 * cache._total_size // 3
+    clock.now += 1
+    cache.put_page(URL, '20/21', SUMMARY, 4, HEADERS, rows(4))
+    kept_pages = [page for page in (1, 2, 3, 4) if cache.get_page(URL, '20/21', SUMMARY, page) is not None]
+    assert kept_pages == [1, 4]
+    assert cache.stats['evictions'] == 2
+
+
+def test_size_kept_across_replaced_pages_and_restarts(tmp_path, clock):
+    path = str(tmp_path / 'pages.sqlite')
+    cache = PageCache(path)
+    cache.put_page(URL, '20/21', SUMMARY, 1, HEADERS, rows(1))
+    cache.put_page(URL, '20/21', SUMMARY, 1, HEADERS, rows(1)[:2])
+    cache.complete_table(URL, '20/21', SUMMARY, 1)
+    size = cache._total_size
+    cache.close()
+
+    reopened = PageCache(path)
+    assert reopened._total_size == size
+    assert reopened.get_table(URL, '20/21', SUMMARY) == (HEADERS, rows(1)[:2])
+    reopened.clear()
+    assert reopened._total_size == 0
@@ -0,0 +1,73 @@
+"""
+Tests of bot.planner plans and joins.
+"""
+import pandas as pd
+import pytest
+from bot.planner import ScrapePass, plan_stats, run_plan
+
+
+HOME_FORWARDS = {'home_away': 'Home', 'age_filter_type': 'All', 'player_age': None, 'player_position': ['F']}
+EVERY_PLAYER = {'home_away': 'Overall', 'age_filter_type': 'All', 'player_age': None,
+                'player_position': ['G', 'D', 'M', 'F']}
+WANTED = ['Goals', 'Expected goals (xG)', 'Big chances missed', 'Successful dribbles',
+          'Successful dribbles %', 'Total shots', 'Goal conversion %']
+
+
+class FakeBot:
+    """ Returns a table per scrape() call from a dict of (main_filter or filter_cat) to DataFrame """
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.calls = []
+
+    def scrape(self, league, season, main_filter=None, detailed_filters=None):
+        self.calls.append(main_filter or detailed_filters)
+        return self.tables[main_filter or detailed_filters['filter_cat']]
+
+
+def test_presets_used_for_unfiltered_scrapes():
+    for detailed_filters in (None, EVERY_PLAYER):
+        plan = plan_stats(WANTED, detailed_filters)
+        assert plan.passes == [ScrapePass('Attack', None, None)]
+        assert plan.naive_passes == 2 # seven Attack sub filters
+
+
+def test_filtered_scrapes_only_use_detailed_passes():
+    plan = plan_stats(WANTED, HOME_FORWARDS)
+    assert [scrape_pass.main_filter for scrape_pass in plan.passes] == ['Detailed', 'Detailed']
+    assert 'Succ. dribbles' in plan.passes[0].sub_filter_list
+    assert plan.passes_saved == 0
+
+
+def test_preset_dribbles_title_is_scraped_as_its_sub_filter():
+    plan = plan_stats(['Successful dribbles', 'Succ. dribbles', 'Offsides'], HOME_FORWARDS)
+    assert plan.unknown_stats == []
+    assert plan.passes == [ScrapePass('Detailed', 'Attack', ['Succ. dribbles', 'Offsides'])]
+
+
+def test_stat_in_two_categories_joins_the_pass_with_room():
+    keeper_stats = ['Saves', 'Penalties saved', 'Saves from inside box', 'Runs out', 'Clean sheets']
+    defence_stats = ['Tackles', 'Interceptions', 'Clearances', 'Error led to goal', 'Error led to shot']
+    plan = plan_stats(keeper_stats + defence_stats, HOME_FORWARDS)
+    assert plan.passes == [ScrapePass('Detailed', 'Goalkeeper', keeper_stats),
+                           ScrapePass('Detailed', 'Defence', defence_stats)]
+    assert plan_stats(['Clean sheets'] + defence_stats[:4], HOME_FORWARDS).passes == \
+        [ScrapePass('Detailed', 'Defence', ['Clean sheets'] + defence_stats[:4])]
+
+
+def test_join_keeps_players_in_every_table_and_one_dribbles_column():
+    bot = FakeBot({
+        'Attack': pd.DataFrame({'Team': ['A', 'A'], 'Name': ['a', 'b'], 'Succ. dribbles': ['1', '2']}),
+        'Defence': pd.DataFrame({'Team': ['A'], 'Name': ['a'], 'Tackles': ['3']})
+    })
+    plan = plan_stats(['Successful dribbles', 'Tackles'], HOME_FORWARDS)
+    wide_df = run_plan(bot, plan, detailed_filters=HOME_FORWARDS)
+    assert list(wide_df.columns) == ['Team', 'Name', 'Successful dribbles', 'Tackles']
+    assert wide_df['Name'].tolist() == ['a']
+    assert all(call['home_away'] == 'Home' for call in bot.calls)
+
+
+def test_preset_pass_with_filters_rejected():
+    plan = plan_stats(WANTED)
+    with pytest.raises(ValueError):
+        run_plan(FakeBot({}), plan, detailed_filters=HOME_FORWARDS)
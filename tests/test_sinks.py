@@ -0,0 +1,54 @@
+"""
+Tests of bot.sinks writing a table page by page and reading it back.
+"""
+import json
+import pandas as pd
+import pytest
+from bot.sinks import CsvSink, DataFrameSink, JsonLinesSink, ParquetSink
+
+
+HEADERS = ['Team', 'Name', 'Goals', 'Accurate passes %']
+PAGES = [[['Manchester City', 'Erling Haaland', '36', '76%'], ['Brighton & Hove Albion', 'Pascal Groß', '9', '-']],
+         [],
+         [['Arsenal', 'Martin Ødegaard, "Martin"', '15', '86%']]]
+TABLE_DF = pd.DataFrame([row for rows in PAGES for row in rows], columns=HEADERS)
+
+
+def write_pages(sink):
+    with sink:
+        sink.open(HEADERS)
+        for page, rows in enumerate(PAGES, start=1):
+            sink.write_page(page, rows)
+
+
+def test_csv_round_trip(tmp_path):
+    path = str(tmp_path / 'stats.csv')
+    write_pages(CsvSink(path))
+    pd.testing.assert_frame_equal(pd.read_csv(path, dtype=str, keep_default_na=False), TABLE_DF)
+
+
+def test_json_lines_round_trip(tmp_path):
+    path = str(tmp_path / 'stats.jsonl')
+    write_pages(JsonLinesSink(path))
+    with open(path, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    pd.testing.assert_frame_equal(pd.DataFrame(records), TABLE_DF)
+
+
+def test_parquet_round_trip(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    path = str(tmp_path / 'stats.parquet')
+    write_pages(ParquetSink(path))
+    assert pq.ParquetFile(path).num_row_groups == len(PAGES)
+    pd.testing.assert_frame_equal(pq.read_table(path).to_pandas().astype(object), TABLE_DF.astype(object))
+
+
+def test_whole_table_written_like_its_pages(tmp_path):
+    paged_path, table_path = str(tmp_path / 'paged.csv'), str(tmp_path / 'table.csv')
+    write_pages(CsvSink(paged_path))
+    CsvSink(table_path).write_table(TABLE_DF.columns, TABLE_DF.values.tolist())
+    with open(paged_path, encoding='utf-8') as paged, open(table_path, encoding='utf-8') as table:
+        assert paged.read() == table.read()
+    sink = DataFrameSink()
+    sink.write_table(HEADERS, TABLE_DF.values.tolist())
+    pd.testing.assert_frame_equal(sink.dataframe(), TABLE_DF)
@@ -0,0 +1,42 @@
+"""
+Tests of data.storage on the SQLite backend.
+"""
+import pandas as pd
+import pytest
+from data.storage import SQLiteStore
+
+
+HOME_FORWARDS = {'home_away': 'Home', 'age_filter_type': 'All', 'player_age': None, 'player_position': ['F'],
+                 'filter_cat': 'Attack', 'sub_filter_list': ['Goals']}
+AWAY_DEFENDERS = {'home_away': 'Away', 'age_filter_type': 'All', 'player_age': None, 'player_position': ['D'],
+                  'filter_cat': 'Defence', 'sub_filter_list': ['Tackles']}
+
+
+@pytest.fixture
+def store(tmp_path):
+    with SQLiteStore(str(tmp_path / 'stats.sqlite')) as store:
+        yield store
+
+
+def test_detailed_scrapes_with_different_filters_are_kept_apart(store):
+    store.load(pd.DataFrame({'Team': ['A', 'B'], 'Name': ['a', 'b'], 'Goals': ['1', '2']}),
+               'Premier League', '21/22', 'Detailed', HOME_FORWARDS)
+    store.load(pd.DataFrame({'Team': ['C'], 'Name': ['c'], 'Tackles': ['5']}),
+               'Premier League', '21/22', 'Detailed', AWAY_DEFENDERS)
+
+    forwards_df = store.read_snapshot('Premier League', '21/22', 'Detailed', HOME_FORWARDS)
+    assert list(forwards_df.columns) == ['Team', 'Name', 'Goals']
+    assert forwards_df['Name'].tolist() == ['a', 'b']
+    defenders_df = store.read_snapshot('Premier League', '21/22', 'Detailed', AWAY_DEFENDERS)
+    assert list(defenders_df.columns) == ['Team', 'Name', 'Tackles']
+
+
+def test_reload_replaces_the_snapshot(store):
+    store.load(pd.DataFrame({'Team': ['A', 'B'], 'Name': ['a', 'b'], 'Goals': ['1', '2']}),
+               'Premier League', '21/22', 'Summary')
+    store.load(pd.DataFrame({'Team': ['A'], 'Name': ['a'], 'Goals': ['3']}),
+               'Premier League', '21/22', 'Summary')
+
+    summary_df = store.read_snapshot('Premier League', '21/22', 'Summary')
+    assert summary_df['Name'].tolist() == ['a']
+    assert summary_df['Goals'].tolist() == [3.0]
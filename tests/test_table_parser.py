@@ -0,0 +1,48 @@
+"""
+Tests of bot.table_parser against table markup saved from sofascore.
+"""
+import os
+from bot.table_parser import parse_headers, parse_rows, parse_table
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def read_fixture(file_name):
+    with open(os.path.join(FIXTURE_DIR, file_name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_headers_start_with_team_and_name():
+    assert parse_headers(read_fixture('summary_thead.html')) == [
+        'Team', 'Name', 'Goals', 'Expected goals (xG)', 'Accurate passes %', 'Rating']
+
+
+def test_rows_in_header_order():
+    header_names_list, rows = parse_table(read_fixture('summary_thead.html'), read_fixture('summary_tbody.html'))
+    assert len(rows) == 3
+    assert all(len(row) == len(header_names_list) for row in rows)
+    assert rows[0] == ['Manchester City', 'Erling Haaland', '36', '28.41', '76%', '7.69']
+
+
+def test_entities_in_titles_are_unescaped():
+    _, rows = parse_table(read_fixture('summary_thead.html'), read_fixture('summary_tbody.html'))
+    assert rows[1][:2] == ['Brighton & Hove Albion', 'Pascal Groß']
+    assert rows[2][1] == 'Martin Ødegaard'
+
+
+def test_missing_values_and_rating_span():
+    _, rows = parse_table(read_fixture('summary_thead.html'), read_fixture('summary_tbody.html'))
+    assert rows[1][3] == '-'
+    assert [row[-1] for row in rows] == ['7.69', '7.34', '7.51']
+
+
+def test_placeholder_row_is_skipped():
+    header_names_list = parse_headers(read_fixture('summary_thead.html'))
+    assert parse_rows(read_fixture('no_results_tbody.html'), header_names_list) == []
+
+
+def test_placeholder_row_among_player_rows():
+    header_names_list = parse_headers(read_fixture('summary_thead.html'))
+    tbody_html = read_fixture('summary_tbody.html') + read_fixture('no_results_tbody.html')
+    assert len(parse_rows(tbody_html, header_names_list)) == 3
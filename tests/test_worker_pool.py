@@ -0,0 +1,79 @@
+"""
+Tests of bot.worker_pool with bots that read the mock site's statistics API,
+so no browser is needed.
+"""
+import threading
+import pytest
+from bot.api_client import ApiClient
+from bot.mock_site import MockSofascore
+from bot.worker_pool import ScrapeJob, WorkerPool, build_jobs
+
+
+@pytest.fixture(scope='module')
+def site():
+    with MockSofascore(players={'Premier League': 45, 'LaLiga': 30}, latency=0) as site:
+        yield site
+
+
+class ApiBot:
+    """ Stands in for NavBot, scraping the mock API and failing the first attempts of some jobs """
+
+    failures = {}
+    lock = threading.Lock()
+    quit_error = None
+
+    def __init__(self, site, **bot_kwargs):
+        self.client = ApiClient(base_url=site.api_url, league_urls=site.league_urls, requests_per_second=None)
+
+    def scrape(self, league, season, main_filter):
+        with ApiBot.lock:
+            failures_left = ApiBot.failures.get((league, season, main_filter), 0)
+            ApiBot.failures[(league, season, main_filter)] = failures_left - 1
+        if failures_left > 0:
+            raise RuntimeError("page did not load")
+        return self.client.fetch_table(league, season, main_filter)
+
+    def quit(self):
+        self.client.close()
+        if ApiBot.quit_error:
+            raise ApiBot.quit_error
+
+
+@pytest.fixture
+def pool(site):
+    ApiBot.failures, ApiBot.quit_error = {}, None
+    return WorkerPool(workers=2, retries=2, bot_factory=lambda **bot_kwargs: ApiBot(site, **bot_kwargs))
+
+
+def test_rows_tagged_and_in_job_order(pool):
+    jobs = build_jobs(['LaLiga', 'Premier League'], ['21/22'], ['Summary', 'Defence'])
+    stats_df = pool.run(jobs)
+    assert len(stats_df) == 2 * 30 + 2 * 45
+    tags = stats_df[['League', 'Season', 'Filter']].drop_duplicates().itertuples(index=False)
+    assert [ScrapeJob(*tag) for tag in tags] == jobs
+    assert pool.failed_jobs == []
+
+
+def test_failed_job_retried_until_it_succeeds(pool):
+    job = ScrapeJob('LaLiga', '21/22', 'Summary')
+    ApiBot.failures = {job: 2}
+    stats_df = pool.run([job])
+    assert len(stats_df) == 30
+    assert pool.failed_jobs == []
+
+
+def test_job_failed_after_its_retries(pool):
+    failing_job, job = ScrapeJob('LaLiga', '21/22', 'Summary'), ScrapeJob('Premier League', '21/22', 'Summary')
+    ApiBot.failures = {failing_job: 3}
+    stats_df = pool.run([failing_job, job])
+    assert set(stats_df['League']) == {'Premier League'}
+    assert [failed_job for failed_job, _ in pool.failed_jobs] == [failing_job]
+
+
+def test_worker_survives_a_browser_that_fails_to_quit(pool):
+    pool.workers = 1
+    ApiBot.quit_error = RuntimeError("driver already gone")
+    failing_job, job = ScrapeJob('LaLiga', '21/22', 'Summary'), ScrapeJob('Premier League', '21/22', 'Summary')
+    ApiBot.failures = {failing_job: 1}
+    stats_df = pool.run([failing_job, job])
+    assert len(stats_df) == 30 + 45